@@ -1,14 +1,24 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, RedirectResponse, Response
+from pydantic import BaseModel, ValidationError
 from typing import List, Dict, Optional, Union, Any
-import pandas as pd
-import numpy as np
-import json
 import os
-import joblib
-from app.models.risk_prediction import RiskModel, load_or_create_model, train_model
+import time
+import tempfile
+import asyncio
+from app.models.list_items import normalise_items
+from app.models.model_store import ModelStore
+from app.utils.compute_pool import COMPUTE_EXECUTOR, ComputePool, ComputePoolFull
+from app.utils.fast_json import prediction_response
+from app.utils.http_cache import canonical_query, etag_matches, parse_query, strong_etag
+from app.utils.metrics import MetricsMiddleware, collect_stages, metrics_response, record_stages
+from app.utils.micro_batcher import MicroBatcher
 from app.utils.nlp_processor import extract_keywords, analyze_text, extract_features_from_text
+from app.utils.training_jobs import TrainingJobManager
+
+# The model code (numpy, pandas, joblib) is only imported by the warm-up, which runs once
+# the server is listening, so a cold start accepts connections (and /health) right away
 
 # Create the FastAPI app
 app = FastAPI(title="Agricultural Health Risk Prediction API")
@@ -22,25 +32,145 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load the model or create one if it doesn't exist
-risk_model = load_or_create_model()
+# Request counts, errors and latency per route, exported by /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Served model, loaded by the warm-up (handlers read model_store.current once per request,
+# so a retrained model only affects requests that start after the swap)
+model_store = ModelStore(None)
+
+# Seconds between checks of the registry's current version (changed by training jobs or other workers)
+MODEL_REFRESH_INTERVAL = float(os.environ.get("MODEL_REFRESH_INTERVAL", 2))
+
+# Sorted overall risk scores of the surveyed cohort as scored by the served model (written
+# by score_cohort.py and loaded by reload_model, None if absent)
+cohort_scores = None
+
+def reload_model():
+    """Load the registry's current version and its cohort scores, swap it in and return its version id"""
+    global cohort_scores
+    from app.models.risk_prediction import load_model_version, load_or_create_model, model_registry
+    from app.models.cohort import cohort_key, load_cohort_scores
+    
+    version = model_registry.current_version()
+    model = load_model_version(version) if version is not None else load_or_create_model()
+    
+    # Percentiles are only meaningful against the cohort as scored by the same model
+    key = cohort_key(model)
+    if cohort_scores is None or cohort_scores.key != key:
+        cohort_scores = load_cohort_scores(key)
+    model_store.swap(model, version)
+    return version
+
+def cohort_for(risk_model):
+    """Cohort scores computed with risk_model, or None (no percentile) if there are none"""
+    from app.models.cohort import cohort_key
+    
+    scores = cohort_scores
+    return scores if scores is not None and scores.key == cohort_key(risk_model) else None
+
+# Training runs as background jobs in separate processes
+training_jobs = TrainingJobManager(on_success=reload_model)
+
+# CPU-bound handler work runs on bounded pools instead of the event loop: model scoring on
+# threads (the model lives in this process), text analysis on threads or processes (COMPUTE_EXECUTOR)
+model_pool = ComputePool("model")
+text_pool = ComputePool("text", kind=COMPUTE_EXECUTOR)
+
+async def offload(pool: ComputePool, fn, *args, **kwargs):
+    """Run CPU-bound work on a compute pool; 503 with Retry-After when its queue is full"""
+    try:
+        return await pool.run(fn, *args, **kwargs)
+    except ComputePoolFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+async def predict_coalesced(risk_model, features_list):
+    """Score a batch of concurrent /predict_risk requests with one predict_many call"""
+    return await offload(model_pool, risk_model.predict_many, features_list)
+
+# Concurrent /predict_risk requests arriving within a few milliseconds are scored together
+# (batches are keyed by the model each request started with)
+predict_batcher = MicroBatcher(predict_coalesced)
+
+# Seconds browsers and proxies may reuse a GET /risk response before revalidating it
+# (a retrained model is picked up by caches within this delay)
+RISK_CACHE_MAX_AGE = int(os.environ.get("RISK_CACHE_MAX_AGE", 60))
+
+# Bytes copied at a time when saving a training upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Profile scored by the warm-up, so the first real request finds every code path initialised
+WARM_UP_PROFILE = {
+    "age": 40,
+    "work_experience": 10,
+    "work_hours_per_day": 8,
+    "work_days_per_week": 5,
+    "protective_equipment": "gants",
+    "chemical_exposure": "pesticides",
+    "has_respiratory_conditions": 0,
+}
+
+# Warm-up state reported by /health
+warm_up_state = {"status": "starting", "warm_up_seconds": None, "model_version": None, "error": None}
+
+def warm_up():
+    """Import the model code, load the served model and run one dummy prediction"""
+    start = time.perf_counter()
+    reload_model()
+    risk_model = model_store.current
+    risk_model.predict(WARM_UP_PROFILE)
+    
+    # The dummy result should not be served from the cache
+    risk_model.cache.clear()
+    
+    warm_up_state.update(
+        status="healthy",
+        warm_up_seconds=time.perf_counter() - start,
+        model_version=risk_model.version
+    )
+
+async def run_warm_up():
+    try:
+        await asyncio.to_thread(warm_up)
+    except Exception as e:
+        warm_up_state.update(status="unhealthy", error=f"Warm-up error: {str(e)}")
+
+def warm_up_task() -> asyncio.Task:
+    """The warm-up task, started on first use if the startup event has not run"""
+    if getattr(app.state, "warm_up", None) is None:
+        app.state.warm_up = asyncio.create_task(run_warm_up())
+    return app.state.warm_up
+
+async def served_model():
+    """Model serving this request, waiting for the warm-up on a cold start"""
+    await asyncio.shield(warm_up_task())
+    risk_model = model_store.current
+    if risk_model is None:
+        raise HTTPException(status_code=503, detail=warm_up_state["error"] or "Model unavailable")
+    return risk_model
 
 # Define input schemas
+# Fields with a default may be omitted but not null: the model has no encoding for a missing value
 class StructuredInput(BaseModel):
     age: int
     work_experience: int
     work_hours_per_day: int
-    work_days_per_week: Optional[int] = 5
+    work_days_per_week: int = 5
     protective_equipment: List[str]
     chemical_exposure: List[str]
-    tasks: Optional[List[str]] = []
+    tasks: List[str] = []
     has_respiratory_conditions: bool
-    has_skin_conditions: Optional[bool] = False
-    has_chronic_exposure: Optional[bool] = False
-    marital_status: Optional[str] = "mariée"
-    number_of_children: Optional[int] = 0
-    socio_economic_status: Optional[str] = "moyen"
-    employment_status: Optional[str] = "permanente"
+    has_skin_conditions: bool = False
+    has_neurological_conditions: bool = False
+    has_chronic_exposure: bool = False
+    marital_status: str = "mariée"
+    number_of_children: int = 0
+    socio_economic_status: str = "moyen"
+    employment_status: str = "permanente"
 
 class FreeTextInput(BaseModel):
     general_description: str
@@ -49,6 +179,39 @@ class FreeTextInput(BaseModel):
     health_text: str
     protection_text: str
 
+class BatchStructuredInput(BaseModel):
+    profiles: List[StructuredInput]
+
+class RiskScores(BaseModel):
+    overall_risk: float
+    respiratory_risk: float
+    skin_risk: float
+    neurological_risk: float
+    confidence_interval: List[float]
+    risk_factors: List[str]
+    recommendations: List[str]
+
+class BatchRiskScoreResponse(BaseModel):
+    results: List[RiskScores]
+
+class WhatIfGridInput(BaseModel):
+    profile: StructuredInput
+    work_hours_per_day: Optional[List[float]] = None  # defaults to 4-12
+    work_days_per_week: Optional[List[float]] = None  # defaults to 3-7
+    equipment_subsets: Optional[List[List[str]]] = None  # defaults to every subset
+
+class WhatIfGridResponse(BaseModel):
+    work_hours_per_day: List[float]
+    work_days_per_week: List[float]
+    equipment_subsets: List[List[str]]
+    overall_risk: List[List[List[float]]]
+    respiratory_risk: List[List[List[float]]]
+    skin_risk: List[List[List[float]]]
+    neurological_risk: List[List[List[float]]]
+
+# Largest what-if grid (hours x days x equipment subsets) scored per request
+MAX_WHAT_IF_GRID_SIZE = 100_000
+
 class RiskScoreResponse(BaseModel):
     overall_risk: float
     respiratory_risk: float
@@ -59,64 +222,221 @@ class RiskScoreResponse(BaseModel):
     feature_importance: List[Dict[str, Union[str, float]]]
     confidence_interval: List[float]
     what_if_scenarios: List[Dict[str, Union[str, float]]]
+    percentile_in_cohort: Optional[float] = None
 
 # Root endpoint
 @app.get("/")
 async def root():
     return {"message": "Agricultural Health Risk Prediction API"}
 
-# Health check endpoint
+# Health check endpoint: ready (200) once the warm-up has loaded the model, 503 until then
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    warm_up_task()
+    if warm_up_state["status"] != "healthy":
+        return JSONResponse(status_code=503, content=warm_up_state)
+    return warm_up_state
+
+def structured_input_to_features(data: StructuredInput) -> Dict[str, Any]:
+    """Convert a structured input into the feature dict expected by the model"""
+    # Counted on the normalised items, as the encoder scores them (repeats count once)
+    protective_equipment = normalise_items(data.protective_equipment)
+    chemical_exposure = normalise_items(data.chemical_exposure)
+    return {
+        "age": data.age,
+        "work_experience": data.work_experience,
+        "work_hours_per_day": data.work_hours_per_day,
+        "work_days_per_week": data.work_days_per_week,
+        "protective_equipment_count": len(protective_equipment),
+        "protective_equipment": ",".join(protective_equipment),
+        "chemical_exposure_count": len(chemical_exposure),
+        "chemical_exposure": ",".join(chemical_exposure),
+        "has_respiratory_conditions": 1 if data.has_respiratory_conditions else 0,
+        "has_skin_conditions": 1 if data.has_skin_conditions else 0,
+        "has_neurological_conditions": 1 if data.has_neurological_conditions else 0,
+        "has_chronic_exposure": 1 if data.has_chronic_exposure else 0,
+        "marital_status": data.marital_status,
+        "number_of_children": data.number_of_children,
+        "socio_economic_status": data.socio_economic_status,
+        "employment_status": data.employment_status
+    }
+
+# Prediction cache statistics (the cache is only used while scoring is deterministic)
+@app.get("/cache_stats")
+async def cache_stats():
+    risk_model = await served_model()
+    return {
+        "deterministic": risk_model.deterministic,
+        "model_version": risk_model.version,
+        **risk_model.cache.stats()
+    }
+
+# Queue depth, wait and service times of the compute pools, and /predict_risk batch sizes
+@app.get("/compute_stats")
+async def compute_stats():
+    return {"model": model_pool.stats(), "text": text_pool.stats(), "predict_batching": predict_batcher.stats()}
+
+# Runtime metrics in the Prometheus text format (this worker process only)
+@app.get("/metrics")
+async def metrics():
+    return metrics_response()
 
 # Endpoint for structured input prediction
 @app.post("/predict_risk", response_model=RiskScoreResponse)
 async def predict_risk(data: StructuredInput):
+    risk_model = await served_model()
     try:
         # Convert input data to features
-        features = {
-            "age": data.age,
-            "work_experience": data.work_experience,
-            "work_hours_per_day": data.work_hours_per_day,
-            "work_days_per_week": data.work_days_per_week,
-            "protective_equipment_count": len(data.protective_equipment),
-            "protective_equipment": ",".join(data.protective_equipment),
-            "chemical_exposure_count": len(data.chemical_exposure),
-            "chemical_exposure": ",".join(data.chemical_exposure),
-            "has_respiratory_conditions": 1 if data.has_respiratory_conditions else 0,
-            "has_skin_conditions": 1 if data.has_skin_conditions else 0,
-            "has_chronic_exposure": 1 if data.has_chronic_exposure else 0,
-            "marital_status": data.marital_status,
-            "number_of_children": data.number_of_children,
-            "socio_economic_status": data.socio_economic_status,
-            "employment_status": data.employment_status
-        }
+        features = structured_input_to_features(data)
 
         # Get prediction from model
-        result = risk_model.predict(features)
+        result = await predict_batcher.submit(risk_model, features)
+
+        # Rank against the surveyed cohort
+        cohort = cohort_for(risk_model)
+        percentile = cohort.percentile(result["overall_risk"]) if cohort is not None else None
+
+        # Trusted model output: serialised directly, without re-validating it against RiskScoreResponse
+        return prediction_response(result, percentile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+# StructuredInput fields given as lists in GET /risk query strings
+RISK_QUERY_LIST_FIELDS = ("protective_equipment", "chemical_exposure", "tasks")
+
+# Cacheable variant of /predict_risk, with the profile in the query string
+@app.get("/risk", response_model=RiskScoreResponse)
+async def risk(request: Request):
+    try:
+        data = parse_query(StructuredInput, request.query_params, RISK_QUERY_LIST_FIELDS)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    
+    # One URL per input, so a cache in front of the API stores each profile once
+    query = canonical_query(data, RISK_QUERY_LIST_FIELDS)
+    cache_control = f"public, max-age={RISK_CACHE_MAX_AGE}"
+    if request.url.query != query:
+        return RedirectResponse(f"{request.url.path}?{query}", status_code=308, headers={"Cache-Control": cache_control})
+    
+    risk_model = await served_model()
+    try:
+        features = structured_input_to_features(data)
+        
+        # The encoded features, the model version and the cohort determine the response,
+        # so a matching If-None-Match is answered without scoring
+        cohort = cohort_for(risk_model)
+        if risk_model.deterministic:
+            etag = strong_etag(
+                risk_model.encoder.encode(features).tobytes(),
+                str(risk_model.version).encode(),
+                (cohort.fingerprint if cohort is not None else "").encode()
+            )
+            headers = {"ETag": etag, "Cache-Control": cache_control}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+        else:
+            # Random variation makes every answer different: nothing may be cached
+            headers = {"Cache-Control": "no-store"}
         
-        return result
+        result = await predict_batcher.submit(risk_model, features)
+        percentile = cohort.percentile(result["overall_risk"]) if cohort is not None else None
+        response = prediction_response(result, percentile)
+        response.headers.update(headers)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+def score_batch(risk_model, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Score feature dicts in one vectorized pass and build the per-row results (runs on model_pool)"""
+    columns = {key: [row[key] for row in rows] for key in rows[0]} if rows else {}
+
+    scores = risk_model.predict_batch(columns) if rows else {}
+    rule_matches = scores.pop("rule_matches", None)
+
+    # Results are returned in input order, with the rule texts built per row
+    results = [
+        {
+            **{name: values[i].tolist() for name, values in scores.items()},
+            **risk_model.rules.materialise(rule_matches, i)
+        }
+        for i in range(len(rows))
+    ]
+    return {"results": results}
+
+# Endpoint for scoring many structured inputs in one vectorized pass
+@app.post("/predict_risk_batch", response_model=BatchRiskScoreResponse)
+async def predict_risk_batch(data: BatchStructuredInput):
+    risk_model = await served_model()
+    try:
+        # Build one column per feature (struct of arrays) so the model scores all rows at once
+        rows = [structured_input_to_features(profile) for profile in data.profiles]
+        return await offload(model_pool, score_batch, risk_model, rows)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+
+# Endpoint for sweeping a dense what-if risk surface for one profile
+@app.post("/what_if_grid", response_model=WhatIfGridResponse)
+async def what_if_grid(data: WhatIfGridInput):
+    from app.models.counterfactual import DEFAULT_WORK_HOURS, DEFAULT_WORK_DAYS
+    
+    risk_model = await served_model()
+    grid_size = (
+        (len(data.work_hours_per_day) if data.work_hours_per_day is not None else len(DEFAULT_WORK_HOURS)) *
+        (len(data.work_days_per_week) if data.work_days_per_week is not None else len(DEFAULT_WORK_DAYS)) *
+        (len(data.equipment_subsets) if data.equipment_subsets is not None else 2 ** len(risk_model.protection_effectiveness))
+    )
+    if grid_size > MAX_WHAT_IF_GRID_SIZE:
+        raise HTTPException(status_code=400, detail=f"What-if grid too large ({grid_size} > {MAX_WHAT_IF_GRID_SIZE} scenarios)")
+
+    try:
+        grid = await offload(
+            model_pool,
+            risk_model.what_if_grid,
+            structured_input_to_features(data.profile),
+            work_hours=data.work_hours_per_day,
+            work_days=data.work_days_per_week,
+            subsets=data.equipment_subsets
+        )
+        return {
+            name: values.tolist() if hasattr(values, "tolist") else values
+            for name, values in grid.items()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"What-if grid error: {str(e)}")
+
 # Endpoint for free text input prediction
 @app.post("/predict_risk_from_text", response_model=RiskScoreResponse)
 async def predict_risk_from_text(data: FreeTextInput):
+    risk_model = await served_model()
     try:
-        # Extract features from text
-        extracted_features = extract_features_from_text(
+        # Extract features from text (its stage timings are recorded here, as the
+        # text pool may run it in another process)
+        extracted_features, stages = await offload(
+            text_pool,
+            collect_stages,
+            extract_features_from_text,
             general_description=data.general_description,
             chemicals_text=data.chemicals_text,
             tasks_text=data.tasks_text,
             health_text=data.health_text,
             protection_text=data.protection_text
         )
+        record_stages(stages)
         
         # Get prediction from model
-        result = risk_model.predict(extracted_features)
+        result = await offload(model_pool, risk_model.predict, extracted_features)
         
-        return result
+        return prediction_response(result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Text prediction error: {str(e)}")
 
@@ -128,8 +448,10 @@ async def analyze_text_endpoint(text_data: Dict[str, str]):
         if not text:
             raise HTTPException(status_code=400, detail="Text field is required")
         
-        analysis_result = analyze_text(text)
+        analysis_result = await offload(text_pool, analyze_text, text)
         return analysis_result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Text analysis error: {str(e)}")
 
@@ -144,42 +466,119 @@ async def extract_keywords_endpoint(
         if not text:
             raise HTTPException(status_code=400, detail="Text field is required")
         
-        keywords = extract_keywords(text, type)
+        keywords = await offload(text_pool, extract_keywords, text, type)
         return {"keywords": keywords}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Keyword extraction error: {str(e)}")
 
-# Endpoint to train/retrain the model with new data
-@app.post("/train_model")
-async def train_model_endpoint(file: UploadFile = File(...)):
+# Endpoint to train/retrain the model with new data (runs as a background job).
+# Accepts Excel, CSV, Parquet (.parquet) and Arrow IPC (.arrow/.feather) files;
+# with incremental=true, trees trained on the new batch are added to the current model;
+# with multi_output=true, one forest predicts the overall, respiratory, skin and neurological risks
+@app.post("/train_model", status_code=202)
+async def train_model_endpoint(file: UploadFile = File(...), incremental: bool = False, multi_output: bool = False):
     try:
-        # Save the uploaded file
-        file_location = f"temp_{file.filename}"
-        with open(file_location, "wb+") as file_object:
-            file_object.write(await file.read())
-        
-        # Train model with the new data
-        if file_location.endswith('.xlsx') or file_location.endswith('.xls'):
-            df = pd.read_excel(file_location)
-        else:
-            df = pd.read_csv(file_location)
+        # Stream the upload to a file with a unique name; the training job deletes it once read
+        suffix = os.path.splitext(file.filename or "")[1].lower()
+        with tempfile.NamedTemporaryFile(prefix="train_", suffix=suffix, delete=False) as file_object:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_object.write(chunk)
         
-        success = train_model(df)
-        
-        # Clean up
-        if os.path.exists(file_location):
-            os.remove(file_location)
-        
-        if success:
-            # Reload the model
-            global risk_model
-            risk_model = load_or_create_model()
-            return {"message": "Model trained successfully"}
-        else:
-            raise HTTPException(status_code=500, detail="Model training failed")
+        try:
+            return training_jobs.submit(file_object.name, incremental=incremental, multi_output=multi_output)
+        except Exception:
+            os.remove(file_object.name)
+            raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Training error: {str(e)}")
 
+# Status of every tracked training job
+@app.get("/train_jobs")
+async def list_train_jobs():
+    return {"jobs": training_jobs.list()}
+
+# Status, progress, duration and peak memory of one training job
+@app.get("/train_jobs/{job_id}")
+async def get_train_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job: {job_id}")
+    return job
+
+# Registered model versions, oldest first, with their metadata
+@app.get("/models")
+async def list_models():
+    from app.models.risk_prediction import model_registry
+    
+    try:
+        return {"current": model_store.version, "versions": model_registry.versions()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model registry error: {str(e)}")
+
+# Roll back to the previously served version
+@app.post("/models/rollback")
+async def rollback_model():
+    from app.models.risk_prediction import load_model_version, model_registry
+    
+    version = model_registry.previous_version()
+    if version is None:
+        raise HTTPException(status_code=409, detail="No previous model version to roll back to")
+    try:
+        # Load (and verify) before switching, so a broken version is never served
+        model = load_model_version(version)
+        model_registry.rollback()
+        model_store.swap(model, version)
+        return model_registry.metadata(version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model rollback error: {str(e)}")
+
+# Serve a specific registered version
+@app.post("/models/{version}/pin")
+async def pin_model(version: str):
+    from app.models.risk_prediction import load_model_version, model_registry
+    
+    try:
+        model_registry.metadata(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+    try:
+        model = load_model_version(version)
+        model_registry.set_current(version)
+        model_store.swap(model, version)
+        return model_registry.metadata(version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model pin error: {str(e)}")
+
+async def follow_current_version():
+    """Swap in the registry's current version whenever it changes (e.g. pinned by another worker)"""
+    await asyncio.shield(warm_up_task())
+    from app.models.risk_prediction import model_registry
+    
+    while True:
+        await asyncio.sleep(MODEL_REFRESH_INTERVAL)
+        try:
+            if model_registry.current_version() != model_store.version:
+                await asyncio.to_thread(reload_model)
+        except Exception as e:
+            print(f"Error reloading model: {e}")
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Keep references so the tasks are not garbage collected
+    warm_up_task()
+    app.state.version_follower = asyncio.create_task(follow_current_version())
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    training_jobs.shutdown()
+    model_pool.shutdown()
+    text_pool.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from app.models.risk_prediction import MODEL_PATH
+from app.models.survey_features import survey_to_features
+from app.utils.prediction_cache import feature_key
+
+# Surveyed cohort used as the reference population
+SURVEY_DATA_FILE = os.path.normpath(
+    os.path.join(os.path.dirname(MODEL_PATH), os.pardir, "data", "fixed_female_farmers_data.xlsx")
+)
+
+# Sorted overall risk scores of the surveyed cohort, one file per model (see cohort_key)
+COHORT_SCORES_DIR = os.path.join(MODEL_PATH, "cohort_scores")
+
+
+def cohort_key(model) -> str:
+    """
+    Which cohort scores file belongs to model
+
+    A trained forest's version is its fingerprint, so retrained, rolled-back
+    and pinned models each get their own scores. Synthetic models share one
+    file: the seed only changes the random variation, not the formula.
+    """
+    return "synthetic" if model.forest is None else model.version
+
+
+def cohort_scores_file(key: str) -> str:
+    """Path of the cohort scores computed with the model identified by key"""
+    return os.path.join(COHORT_SCORES_DIR, f"{key}.npy")
+
+
+class CohortScores:
+    """Sorted cohort scores with O(log n) percentile-rank lookups"""
+
+    def __init__(self, sorted_scores: np.ndarray, key: Optional[str] = None):
+        self.sorted_scores = np.asarray(sorted_scores)
+        # cohort_key of the model that scored the cohort
+        self.key = key
+        # Identifies the cohort in HTTP validators, as the percentile ranks depend on it
+        self.fingerprint = feature_key(self.sorted_scores.tobytes()).hex()
+
+    def __len__(self):
+        return len(self.sorted_scores)
+
+    def percentile(self, score: float) -> Optional[float]:
+        """Percentage of the cohort scoring at or below score (None for an empty cohort)"""
+        if len(self.sorted_scores) == 0:
+            return None
+        rank = np.searchsorted(self.sorted_scores, score, side="right")
+        return 100.0 * rank / len(self.sorted_scores)
+
+
+def score_cohort(model, data: pd.DataFrame) -> np.ndarray:
+    """Score every survey respondent in one vectorized pass and return the sorted overall risks"""
+    scores = model.predict_batch(survey_to_features(data))["overall_risk"]
+    return np.sort(scores).astype(np.float32)
+
+
+def save_cohort_scores(sorted_scores: np.ndarray, key: str, path: Optional[str] = None) -> str:
+    """Write the sorted score distribution of the model identified by key as a compact .npy file and return its path"""
+    path = path or cohort_scores_file(key)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.save(path, np.asarray(sorted_scores, dtype=np.float32))
+    return path
+
+
+def load_cohort_scores(key: str) -> Optional[CohortScores]:
+    """Load the cohort scores of the model identified by key, or None if they have not been computed"""
+    path = cohort_scores_file(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        return CohortScores(np.load(path), key)
+    except Exception as e:
+        print(f"Error loading cohort scores: {e}")
+        return None
@@ -0,0 +1,75 @@
+import itertools
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from app.models.feature_encoder import EQUIPMENT_USAGE, EQUIPMENT_USAGE_INPUTS
+
+# Default sweep used by the what-if grid
+DEFAULT_WORK_HOURS = list(range(4, 13))
+DEFAULT_WORK_DAYS = list(range(3, 8))
+
+
+def equipment_subsets(protection_effectiveness: Dict[str, float]) -> List[Tuple[str, ...]]:
+    """Every subset of the known protective equipment, from none to all"""
+    items = list(protection_effectiveness)
+    return [
+        subset
+        for size in range(len(items) + 1)
+        for subset in itertools.combinations(items, size)
+    ]
+
+
+def repeat_base(base_row: np.ndarray, n_rows: int) -> np.ndarray:
+    """Scenario matrix with n_rows copies of an encoded base vector"""
+    return np.repeat(base_row.reshape(1, -1), n_rows, axis=0)
+
+
+def encode_equipment_subsets(encoder, subsets: Sequence[Sequence[str]]) -> Dict[str, np.ndarray]:
+    """
+    Encode equipment subsets into the equipment-dependent feature columns
+
+    Returns:
+        Dict mapping protection_score, protective_equipment_count and each
+        equipment usage column (1 if in the subset, else 0) to an array with
+        one value per subset
+    """
+    items = list(encoder.protection_effectiveness)
+    membership = np.zeros((len(subsets), len(items)), dtype=np.float32)
+    chosen_sets = [{item.strip().lower() for item in subset} for subset in subsets]
+    for i, chosen in enumerate(chosen_sets):
+        membership[i] = [item in chosen for item in items]
+
+    effectiveness = np.array([encoder.protection_effectiveness[item] for item in items], dtype=np.float32)
+    columns = {
+        "protection_score": membership @ effectiveness * encoder.protection_scale,
+        "protective_equipment_count": np.array([len(subset) for subset in subsets], dtype=np.float32),
+    }
+    for name in EQUIPMENT_USAGE:
+        columns[name] = np.array([EQUIPMENT_USAGE_INPUTS[name] in chosen for chosen in chosen_sets], dtype=np.float32)
+    return columns
+
+
+def build_grid(encoder, base_row: np.ndarray, work_hours: Sequence[float],
+               work_days: Sequence[float], subsets: Sequence[Sequence[str]]) -> np.ndarray:
+    """
+    Build the full counterfactual matrix for a base profile
+
+    Rows enumerate every (work hours, work days, equipment subset) combination
+    in C order, so the scores reshape directly to
+    (len(work_hours), len(work_days), len(subsets)).
+    """
+    hours_grid, days_grid, subset_grid = np.meshgrid(
+        np.asarray(work_hours, dtype=np.float32),
+        np.asarray(work_days, dtype=np.float32),
+        np.arange(len(subsets)),
+        indexing="ij"
+    )
+
+    X = repeat_base(base_row, hours_grid.size)
+    index = encoder.index
+    X[:, index["work_hours_per_day"]] = hours_grid.ravel()
+    X[:, index["work_days_per_week"]] = days_grid.ravel()
+
+    subset_index = subset_grid.ravel()
+    for name, values in encode_equipment_subsets(encoder, subsets).items():
+        X[:, index[name]] = values[subset_index]
+    return X
@@ -0,0 +1,290 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional
+from app.models.list_items import normalise_items
+
+# Numeric input features and their default values
+NUMERIC_FEATURES = [
+    "age", "work_experience", "work_hours_per_day",
+    "work_days_per_week", "protective_equipment_count",
+    "chemical_exposure_count", "number_of_children"
+]
+NUMERIC_DEFAULTS = {
+    "age": 40,
+    "work_experience": 10,
+    "work_hours_per_day": 8,
+    "work_days_per_week": 5,
+    "protective_equipment_count": 0,
+    "chemical_exposure_count": 0,
+    "number_of_children": 2
+}
+
+# Binary input features and the values accepted as "true"
+BINARY_FEATURES = [
+    "has_respiratory_conditions", "has_skin_conditions", "has_chronic_exposure",
+    "has_neurological_conditions"
+]
+TRUE_VALUES = [True, 1, "1", "true", "True", "yes", "Yes"]
+
+# Equipment usage frequencies (codebook ordinal_equipment levels) as the share of the time it is worn
+USAGE_LEVELS = {"jamais": 0.0, "parfois": 1 / 3, "souvent": 2 / 3, "toujours": 1.0}
+
+# Equipment usage inputs (a USAGE_LEVELS key or a share) and the equipment item each one describes;
+# items listed in protective_equipment count as always worn
+EQUIPMENT_USAGE_INPUTS = {
+    "mask_usage": "masque",
+    "gloves_usage": "gants",
+    "boots_usage": "bottes",
+    "cap_usage": "casquette",
+    "coat_usage": "manteau",
+}
+
+# Equipment usage kept as encoded columns
+EQUIPMENT_USAGE = ["mask_usage", "gloves_usage", "boots_usage"]
+
+# Features derived from the equipment usage and the chemical list
+DERIVED_FEATURES = ["protection_score", "chemical_risk_score"] + EQUIPMENT_USAGE
+
+
+class FeatureEncoder:
+    """
+    Feature schema compiled once into fixed column offsets and precomputed
+    normalisation constants.
+
+    Every request is encoded into a contiguous float32 vector (or one row of
+    a 2-D buffer in batch mode) with the layout given by `columns`, which is
+    also the layout the trained estimator can consume directly.
+    """
+
+    def __init__(self, categorical_mappings, protection_effectiveness, chemical_severity):
+        self.columns = NUMERIC_FEATURES + BINARY_FEATURES + list(categorical_mappings) + DERIVED_FEATURES
+        self.index = {name: offset for offset, name in enumerate(self.columns)}
+        self.n_features = len(self.columns)
+
+        # (name, offset, default) for the numeric features
+        self._numeric = [(name, self.index[name], float(NUMERIC_DEFAULTS[name])) for name in NUMERIC_FEATURES]
+        self._binary = [(name, self.index[name]) for name in BINARY_FEATURES]
+        self._true_values = frozenset(TRUE_VALUES)
+
+        # (name, offset, mapping, default code) - invalid or missing values get the first category
+        self.categorical_mappings = categorical_mappings
+        self._categorical = [
+            (name, self.index[name], mapping, float(next(iter(mapping.values()))))
+            for name, mapping in categorical_mappings.items()
+        ]
+
+        # Protection score is normalised by the sum of all effectiveness ratings
+        self.protection_effectiveness = protection_effectiveness
+        max_protection = sum(protection_effectiveness.values())
+        self.protection_scale = 10 / max_protection if max_protection > 0 else 0.0
+        self._item_index = {item: j for j, item in enumerate(protection_effectiveness)}
+        self._effectiveness = np.array(list(protection_effectiveness.values()), dtype=float)
+        self._usage_inputs = [
+            (name, item) for name, item in EQUIPMENT_USAGE_INPUTS.items() if item in protection_effectiveness
+        ]
+
+        # Chemical score is normalised by the severities of as many chemicals as were listed:
+        # scale[k] = 10 / (sum of the first k severities), 0 when there is nothing to normalise by
+        self.chemical_severity = chemical_severity
+        severity_prefix = np.concatenate([[0.0], np.cumsum(list(chemical_severity.values()))])
+        self._chemical_scale = np.zeros(len(severity_prefix))
+        np.divide(10.0, severity_prefix, out=self._chemical_scale, where=severity_prefix > 0)
+
+        # Default row, copied into the buffer before the supplied values are written
+        self._defaults = np.zeros(self.n_features, dtype=np.float32)
+        for name, offset, default in self._numeric:
+            self._defaults[offset] = default
+        for name, offset, mapping, default in self._categorical:
+            self._defaults[offset] = default
+
+        self._local = threading.local()
+
+    def _row_buffer(self):
+        """Preallocated per-thread row, reused by every encode() call on that thread"""
+        buffer = getattr(self._local, "row", None)
+        if buffer is None:
+            buffer = self._local.row = np.empty(self.n_features, dtype=np.float32)
+        return buffer
+
+    def encode(self, features: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode a single request into a float32 feature vector
+
+        Args:
+            features: Dict with raw feature values (same keys as RiskModel.predict)
+            out: Optional 1-D float32 buffer (e.g. a row of a batch buffer) to write into;
+                 defaults to a per-thread buffer that is overwritten by the next call
+
+        Returns:
+            The filled float32 vector
+        """
+        row = self._row_buffer() if out is None else out
+        row[:] = self._defaults
+
+        for name, offset, default in self._numeric:
+            if name in features:
+                row[offset] = float(features[name])
+
+        for name, offset in self._binary:
+            if name in features:
+                row[offset] = 1.0 if features[name] in self._true_values else 0.0
+
+        for name, offset, mapping, default in self._categorical:
+            if name in features:
+                row[offset] = mapping.get(features[name], default)
+
+        index = self.index
+        usage = dict.fromkeys(self.protection_effectiveness, 0.0)
+        if "protective_equipment" in features:
+            for item in normalise_items(features["protective_equipment"]):
+                if item in usage:
+                    usage[item] = 1.0
+        for name, item in self._usage_inputs:
+            if name in features:
+                usage[item] = max(usage[item], _usage_share(features[name]))
+        protection_score = sum(self.protection_effectiveness[item] * share for item, share in usage.items())
+        row[index["protection_score"]] = protection_score * self.protection_scale
+        for name in EQUIPMENT_USAGE:
+            row[index[name]] = usage[EQUIPMENT_USAGE_INPUTS[name]]
+
+        if "chemical_exposure" in features:
+            chemical_list = normalise_items(features["chemical_exposure"])
+            chemical_risk = sum(self.chemical_severity.get(item, 0.0) for item in chemical_list)
+            scale = self._chemical_scale[min(len(chemical_list), len(self._chemical_scale) - 1)]
+            row[index["chemical_risk_score"]] = chemical_risk * scale
+
+        return row
+
+    def encode_batch(self, records: List[Dict[str, Any]], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode a list of request dicts into the rows of a 2-D float32 buffer"""
+        if out is None:
+            out = np.empty((len(records), self.n_features), dtype=np.float32)
+        for i, features in enumerate(records):
+            self.encode(features, out=out[i])
+        return out
+
+    def encode_frame(self, data, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode a table of requests column by column into a 2-D float32 buffer
+
+        Args:
+            data: DataFrame or dict of equal-length arrays, one entry per raw feature
+            out: Optional preallocated (n_rows, n_features) float32 buffer
+
+        Returns:
+            The filled float32 matrix
+        """
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(data)
+        n_rows = len(data)
+        if out is None:
+            out = np.empty((n_rows, self.n_features), dtype=np.float32)
+        out[:] = self._defaults
+
+        # Numeric features (missing or unparseable cells, e.g. "non spécifié", fall back to the defaults)
+        for name, offset, default in self._numeric:
+            if name in data:
+                out[:, offset] = pd.to_numeric(data[name], errors="coerce").fillna(default).to_numpy()
+
+        for name, offset in self._binary:
+            if name in data:
+                out[:, offset] = data[name].isin(TRUE_VALUES).to_numpy()
+
+        for name, offset, mapping, default in self._categorical:
+            if name in data:
+                out[:, offset] = data[name].map(mapping).fillna(default).to_numpy(dtype=float)
+
+        index = self.index
+        usage = self._usage_matrix(data, n_rows)
+        out[:, index["protection_score"]] = usage @ self._effectiveness * self.protection_scale
+        for name in EQUIPMENT_USAGE:
+            out[:, index[name]] = usage[:, self._item_index[EQUIPMENT_USAGE_INPUTS[name]]]
+
+        if "chemical_exposure" in data:
+            # Scored once per distinct cell, then gathered onto the rows (missing cells score 0)
+            codes, cells = _factorize_items(data["chemical_exposure"])
+            chemical_score = np.zeros(len(cells) + 1)
+            for k, chemical_list in enumerate(cells):
+                chemical_risk = sum(self.chemical_severity.get(item, 0.0) for item in chemical_list)
+                chemical_score[k] = chemical_risk * self._chemical_scale[min(len(chemical_list), len(self._chemical_scale) - 1)]
+            out[:, index["chemical_risk_score"]] = chemical_score[codes]
+
+        return out
+
+    def _usage_matrix(self, data: pd.DataFrame, n_rows: int) -> np.ndarray:
+        """Share of the time each known equipment item is worn, shape (n_rows, n_items)"""
+        usage = np.zeros((n_rows, len(self._item_index)))
+        if "protective_equipment" in data:
+            codes, cells = _factorize_items(data["protective_equipment"])
+            worn = np.zeros((len(cells) + 1, len(self._item_index)))
+            for k, equipment_list in enumerate(cells):
+                for item in equipment_list:
+                    if item in self._item_index:
+                        worn[k, self._item_index[item]] = 1.0
+            usage[:] = worn[codes]
+        for name, item in self._usage_inputs:
+            if name in data:
+                j = self._item_index[item]
+                usage[:, j] = np.maximum(usage[:, j], _usage_shares(data[name]))
+        return usage
+
+    def column_view(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Map feature names onto the columns of a 2-D encoded buffer (views, no copies)"""
+        return {name: X[:, offset] for offset, name in enumerate(self.columns)}
+
+    def to_dict(self, row: np.ndarray) -> Dict[str, float]:
+        """Convert an encoded vector back into a feature dict"""
+        return dict(zip(self.columns, row.tolist()))
+
+
+def _usage_share(value):
+    """Share of the time an item is worn, from a usage level or a number (missing = never)"""
+    if isinstance(value, str):
+        return USAGE_LEVELS.get(value.strip().lower(), 0.0)
+    return 0.0 if pd.isna(value) else float(value)
+
+
+def _usage_shares(values):
+    """Vectorized _usage_share: usage levels through a categorical map, numbers as they are"""
+    values = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0).to_numpy(dtype=float)
+    codes, uniques = pd.factorize(values)
+    # Code -1 (missing value) picks the trailing 0
+    shares = np.array([_usage_share(value) for value in uniques] + [0.0])
+    return shares[codes]
+
+
+def _factorize_items(values):
+    """
+    Factorize list or comma-separated cells so each distinct cell is split only once
+
+    Returns:
+        (codes, cells): the distinct cell of every row (-1 for missing cells)
+        and the normalised item list of every distinct cell
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:
+        # List cells are not hashable; join them like the API does
+        codes, uniques = pd.factorize(values.map(lambda cell: ",".join(cell) if isinstance(cell, (list, tuple)) else cell))
+    return codes, [normalise_items(cell) for cell in uniques]
+
+
+def _splitmix64(state):
+    """SplitMix64 mixing step on an array of uint64 states"""
+    state = state + np.uint64(0x9E3779B97F4A7C15)
+    state = (state ^ (state >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    state = (state ^ (state >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return state ^ (state >> np.uint64(31))
+
+
+def row_uniforms(X, seed):
+    """Deterministic pseudo-random number in [0, 1) per encoded row, derived from its float32 bits and a seed"""
+    words = np.ascontiguousarray(X, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    state = np.full(len(words), np.uint64(seed & 0xFFFFFFFFFFFFFFFF))
+    for column in words.T:
+        state = _splitmix64(state ^ column)
+    return (state >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
@@ -0,0 +1,208 @@
+import hashlib
+import numpy as np
+from typing import NamedTuple, Optional, Tuple
+
+# Rows evaluated per traversal chunk (bounds the (rows x trees) working arrays)
+DEFAULT_CHUNK_SIZE = 4096
+
+# Share of the tree predictions covered by the prediction interval
+DEFAULT_COVERAGE = 0.9
+
+
+class ForestOutput(NamedTuple):
+    mean: np.ndarray
+    lower: Optional[np.ndarray]
+    upper: Optional[np.ndarray]
+    contributions: Optional[np.ndarray]
+
+
+class FlatForest:
+    """
+    A fitted RandomForestRegressor (plus its StandardScaler) flattened into
+    contiguous node arrays for low-overhead inference.
+
+    All trees share one set of arrays (feature, threshold, left, right, value)
+    with global node indices. Leaves point to themselves, so every row walks
+    every tree for exactly `max_depth` vectorized steps without branching.
+    Inputs are scaled in float64 and cast to float32 before the threshold
+    comparisons, exactly as sklearn does, so results match `model.predict`.
+    """
+
+    def __init__(self, model, scaler=None):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+
+        self.n_trees = len(trees)
+        self.n_features = model.n_features_in_
+        self.n_outputs = trees[0].value.shape[1]
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.roots = offsets.astype(np.intp)
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            own_index = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+            values.append(tree.value[:, :, 0])
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+
+        self._compile_path_tables()
+
+        # Impurity-based importances, kept so serving does not need the sklearn model
+        self.feature_importances = np.asarray(model.feature_importances_, dtype=np.float64)
+
+        # Content hash of the flattened forest, identifying this model version
+        digest = hashlib.blake2b(digest_size=8)
+        for array in (self.feature, self.threshold, self.left, self.right, self.value):
+            digest.update(array.tobytes())
+
+        # StandardScaler parameters (identity when the model was fitted on raw inputs)
+        self.mean = None
+        self.scale = None
+        if scaler is not None:
+            if getattr(scaler, "with_mean", True) and getattr(scaler, "mean_", None) is not None:
+                self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, "with_std", True) and getattr(scaler, "scale_", None) is not None:
+                self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        for array in (self.mean, self.scale):
+            if array is not None:
+                digest.update(array.tobytes())
+        self.fingerprint = digest.hexdigest()
+
+    def _compile_path_tables(self):
+        """
+        Precompute, for every leaf, the per-feature contributions along its
+        decision path: each split adds value[child] - value[parent] to the
+        feature it splits on, so prediction = bias + sum of contributions.
+        """
+        n_nodes = len(self.value)
+        is_leaf = self.left == np.arange(n_nodes)
+
+        path = np.zeros((n_nodes, self.n_features, self.n_outputs))
+        frontier = self.roots
+        while len(frontier):
+            parents = frontier[~is_leaf[frontier]]
+            for children in (self.left[parents], self.right[parents]):
+                path[children] = path[parents]
+                path[children, self.feature[parents]] += self.value[children] - self.value[parents]
+            frontier = np.concatenate([self.left[parents], self.right[parents]])
+
+        leaves = np.flatnonzero(is_leaf)
+        self.leaf_index = np.full(n_nodes, -1, dtype=np.intp)
+        self.leaf_index[leaves] = np.arange(len(leaves))
+        self.leaf_contributions = path[leaves]
+        self.bias = self.value[self.roots].mean(axis=0)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Scale raw inputs like StandardScaler.transform and cast to the tree dtype"""
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X.astype(np.float32)
+
+    def leaves(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Global leaf index reached by every row in every tree, shape (n_rows, n_trees)"""
+        node = np.broadcast_to(self.roots, (len(X_scaled), self.n_trees)).copy()
+        rows = np.arange(len(X_scaled))[:, None]
+        for _ in range(self.max_depth):
+            go_left = X_scaled[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict(self, X: np.ndarray, chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Predict like RandomForestRegressor.predict (mean of the tree predictions)
+
+        Args:
+            X: Raw (unscaled) inputs, shape (n_rows, n_features) or (n_features,)
+            chunk_size: Rows traversed at once, to bound memory on large batches
+
+        Returns:
+            Array of shape (n_rows,) for single-output forests, else (n_rows, n_outputs)
+        """
+        return self.evaluate(X, coverage=None, chunk_size=chunk_size).mean
+
+    def predict_with_interval(self, X: np.ndarray, coverage: Optional[float] = DEFAULT_COVERAGE,
+                              chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Predict the mean and an interval from the spread of the tree predictions
+
+        Returns:
+            (mean, lower, upper) arrays shaped like predict()
+        """
+        output = self.evaluate(X, coverage=coverage, chunk_size=chunk_size)
+        return output.mean, output.lower, output.upper
+
+    def evaluate(self, X: np.ndarray, coverage: Optional[float] = DEFAULT_COVERAGE,
+                 contributions: bool = False, chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE) -> "ForestOutput":
+        """
+        Traverse the forest once and derive everything requested from the leaves
+
+        The interval bounds are empirical quantiles of the per-tree predictions;
+        contributions are gathered from the precomputed per-leaf path tables.
+
+        Args:
+            X: Raw (unscaled) inputs, shape (n_rows, n_features) or (n_features,)
+            coverage: Central share of the tree predictions the interval covers
+                      (None skips the interval)
+            contributions: Whether to return per-feature contributions
+            chunk_size: Rows traversed at once, to bound memory on large batches
+
+        Returns:
+            ForestOutput with mean, lower and upper shaped like predict() and
+            contributions of shape (n_rows, n_features[, n_outputs]); fields
+            that were not requested are None
+        """
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        mean = np.empty((len(X), self.n_outputs))
+        lower = np.empty_like(mean) if coverage is not None else None
+        upper = np.empty_like(mean) if coverage is not None else None
+        contribution = np.empty((len(X), self.n_features, self.n_outputs)) if contributions else None
+
+        step = chunk_size or max(len(X), 1)
+        for start in range(0, len(X), step):
+            rows = slice(start, start + step)
+            leaves = self.leaves(self.transform(X[rows]))
+            values = self.value[leaves]
+            mean[rows] = values.mean(axis=1)
+            if coverage is not None:
+                lower[rows], upper[rows] = np.quantile(values, [(1 - coverage) / 2, (1 + coverage) / 2], axis=1)
+            if contributions:
+                contribution[rows] = self.leaf_contributions[self.leaf_index[leaves]].mean(axis=1)
+
+        if self.n_outputs == 1:
+            mean = mean[:, 0]
+            lower = None if lower is None else lower[:, 0]
+            upper = None if upper is None else upper[:, 0]
+            contribution = None if contribution is None else contribution[:, :, 0]
+        return ForestOutput(mean, lower, upper, contribution)
+
+
+def is_fitted_forest(model) -> bool:
+    """Whether a model is a fitted tree ensemble that FlatForest can flatten"""
+    estimators = getattr(model, "estimators_", None)
+    return bool(estimators) and all(hasattr(estimator, "tree_") for estimator in estimators)
+
+
+def path_table_nbytes(model) -> int:
+    """
+    Memory needed to compile the path tables of a fitted forest, in bytes
+
+    The tables hold n_features x n_outputs float64 contributions per node while
+    being built, so their size grows with the node count (2^max_depth per tree
+    for unbounded trees) rather than with the training data.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    n_nodes = sum(tree.node_count for tree in trees)
+    return n_nodes * model.n_features_in_ * trees[0].value.shape[1] * np.dtype(np.float64).itemsize
@@ -0,0 +1,16 @@
+from typing import List
+
+# Kept free of numpy/pandas: the API imports it before the model code is loaded
+
+
+def normalise_items(values) -> List[str]:
+    """
+    Split a list or comma-separated string into stripped, lower-cased items
+
+    Empty items are dropped and repeated items kept once (in first-seen
+    order): listing an item twice does not mean more equipment or more
+    exposure. The encoder scores, and the API counts, these same items.
+    """
+    if isinstance(values, str):
+        values = values.split(",")
+    return list(dict.fromkeys(item for item in (str(value).strip().lower() for value in values) if item))
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+try:
+    import fcntl
+except ImportError:  # Windows: the pointer is still replaced atomically, just not locked
+    fcntl = None
+
+# Pointer to the served version, with the history of previously served ones
+CURRENT_FILE = "current.json"
+
+# Served versions kept in the pointer's history (how far rollback() can go back),
+# so the pointer stays small however many versions are published
+MODEL_HISTORY_SIZE = int(os.environ.get("MODEL_HISTORY_SIZE", 20))
+
+# Per-version metadata file (not part of the content hash)
+METADATA_FILE = "metadata.json"
+
+# Hex digits of the content hash used as the version id
+VERSION_ID_LENGTH = 16
+
+
+class ModelRegistry:
+    """
+    Versioned, content-hashed model artifacts
+
+    Every version is a directory named after the hash of its artifact files,
+    holding one uncompressed joblib file per artifact (so numpy arrays can be
+    memory-mapped on load) and a metadata.json with the file checksums.
+    Versions are written to a temporary directory and renamed into place, and
+    the served version is a small pointer file replaced atomically, so a crash
+    never leaves a torn model behind the pointer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def publish(self, artifacts: Dict[str, Any], metadata: Dict[str, Any]) -> str:
+        """
+        Write a new version (without serving it) and return its id
+
+        Args:
+            artifacts: Objects to store, by artifact name
+            metadata: JSON-serialisable description (rows, metrics, schema, ...)
+
+        Returns:
+            The version id; publishing identical artifacts again returns the existing version
+        """
+        os.makedirs(self.path, exist_ok=True)
+        staging = os.path.join(self.path, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            files = {}
+            for name, artifact in artifacts.items():
+                file_path = os.path.join(staging, f"{name}.joblib")
+                joblib.dump(artifact, file_path)
+                files[name] = _file_digest(file_path)
+
+            content = hashlib.sha256()
+            for name in sorted(files):
+                content.update(f"{name}:{files[name]}\n".encode())
+            version = content.hexdigest()[:VERSION_ID_LENGTH]
+
+            metadata = {
+                **metadata,
+                "version": version,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "files": files,
+            }
+            with open(os.path.join(staging, METADATA_FILE), "w") as f:
+                json.dump(metadata, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Identical content is already stored under the same id
+            target = os.path.join(self.path, version)
+            if not os.path.isdir(target):
+                os.rename(staging, target)
+            return version
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Metadata of every version, oldest first"""
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for name in os.listdir(self.path):
+            metadata_path = os.path.join(self.path, name, METADATA_FILE)
+            if not name.startswith(".") and os.path.exists(metadata_path):
+                with open(metadata_path) as f:
+                    entries.append(json.load(f))
+        return sorted(entries, key=lambda entry: entry["created_at"])
+
+    def metadata(self, version: str) -> Dict[str, Any]:
+        """Metadata of one version (KeyError if unknown)"""
+        metadata_path = os.path.join(self.path, os.path.basename(version), METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            raise KeyError(version)
+        with open(metadata_path) as f:
+            return json.load(f)
+
+    def verify(self, version: str) -> None:
+        """Check every artifact file of a version against its recorded checksum (ValueError if not)"""
+        for name, digest in self.metadata(version)["files"].items():
+            if _file_digest(self._artifact_path(version, name)) != digest:
+                raise ValueError(f"Artifact {name} of model version {version} is corrupted")
+
+    def load_artifact(self, version: str, name: str, mmap: bool = False) -> Any:
+        """Load one artifact; with mmap, its numpy arrays are read-only views of the file"""
+        return joblib.load(self._artifact_path(version, name), mmap_mode="r" if mmap else None)
+
+    def has_artifact(self, version: str, name: str) -> bool:
+        """Whether a version stores the named artifact"""
+        return name in self.metadata(version)["files"]
+
+    def current_version(self) -> Optional[str]:
+        """Version being served (None before the first one is set)"""
+        history = self._read_pointer()["history"]
+        return history[-1] if history else None
+
+    def previous_version(self) -> Optional[str]:
+        """Version rollback() would serve (None if there is none)"""
+        history = self._read_pointer()["history"]
+        return history[-2] if len(history) >= 2 else None
+
+    def set_current(self, version: str) -> None:
+        """Serve a version from now on (it must exist)"""
+        self.metadata(version)
+        with self._locked():
+            history = self._read_pointer()["history"]
+            if not history or history[-1] != version:
+                history.append(version)
+            self._write_pointer(history)
+
+    def rollback(self) -> str:
+        """Serve the previously served version again and return it (ValueError if there is none)"""
+        with self._locked():
+            history = self._read_pointer()["history"]
+            if len(history) < 2:
+                raise ValueError("No previous model version to roll back to")
+            history.pop()
+            self._write_pointer(history)
+            return history[-1]
+
+    def _artifact_path(self, version: str, name: str) -> str:
+        return os.path.join(self.path, os.path.basename(version), f"{name}.joblib")
+
+    def _read_pointer(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, CURRENT_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"history": []}
+
+    def _write_pointer(self, history: List[str]) -> None:
+        """Replace the pointer file atomically (write, fsync, rename), keeping the last MODEL_HISTORY_SIZE entries"""
+        history = history[-max(1, MODEL_HISTORY_SIZE):]
+        pointer_path = os.path.join(self.path, CURRENT_FILE)
+        staging = f"{pointer_path}.{uuid.uuid4().hex}.tmp"
+        with open(staging, "w") as f:
+            json.dump({"version": history[-1], "history": history}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staging, pointer_path)
+
+    @contextmanager
+    def _locked(self):
+        """Serialise pointer updates across processes (API workers and training jobs)"""
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+
+def _file_digest(path: str) -> str:
+    """SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
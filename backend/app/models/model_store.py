@@ -0,0 +1,28 @@
+import threading
+
+
+class ModelStore:
+    """
+    Holds the RiskModel currently being served
+
+    Request handlers read `current` once and use that model for the whole
+    request; swap() replaces it atomically for later requests, so in-flight
+    requests finish on the version they started with.
+    """
+
+    def __init__(self, model, version=None):
+        self._model = model
+        self.version = version  # registry version being served (None if unregistered)
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        """The model new requests should use"""
+        return self._model
+
+    def swap(self, model, version=None):
+        """Serve a new model (registry version) from now on and return the previous model"""
+        with self._lock:
+            previous, self._model = self._model, model
+            self.version = version
+        return previous
@@ -1,32 +1,99 @@
 import pandas as pd
 import numpy as np
-import joblib
 import os
 from typing import Dict, List, Union, Any
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error
-import random
+from app.models.feature_encoder import FeatureEncoder, row_uniforms
+from app.models.forest_kernel import DEFAULT_COVERAGE, FlatForest, ForestOutput, is_fitted_forest, path_table_nbytes
+from app.models.model_registry import ModelRegistry
+from app.models.risk_rules import RuleEngine
+from app.models.survey_features import survey_to_features
+from app.models.survey_schema import SurveyValidationError, validate_survey
+from app.models.counterfactual import (
+    DEFAULT_WORK_HOURS, DEFAULT_WORK_DAYS, equipment_subsets, build_grid
+)
+from app.utils.metrics import stage_timer
+from app.utils.prediction_cache import PredictionCache, feature_key
 
 # Path for saving the model
 MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "model_data")
 os.makedirs(MODEL_PATH, exist_ok=True)
 
-# Model file paths
+# Versioned model artifacts, one content-hashed directory per version
+MODEL_REGISTRY_PATH = os.path.join(MODEL_PATH, "registry")
+model_registry = ModelRegistry(MODEL_REGISTRY_PATH)
+
+# Single-model files written before the registry existed (still loaded when no version is served)
 MODEL_FILE = os.path.join(MODEL_PATH, "risk_model.joblib")
 SCALER_FILE = os.path.join(MODEL_PATH, "scaler.joblib")
 FEATURE_IMPORTANCE_FILE = os.path.join(MODEL_PATH, "feature_importance.joblib")
 
+# Seed for deterministic scoring: the synthetic risk's random variation is then
+# derived from the encoded features instead of drawn at random
+RISK_MODEL_SEED = int(os.environ["RISK_MODEL_SEED"]) if os.environ.get("RISK_MODEL_SEED") else None
+
+# Prediction cache settings (the cache is only used while scoring is deterministic)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 1024))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 300))
+
+# Forest hyperparameters used unless tuned ones are given (see app.models.tuning)
+DEFAULT_FOREST_PARAMS = {"n_estimators": 100, "max_depth": 10, "random_state": 42}
+
+# Trees added per incremental update
+MODEL_UPDATE_TREES = int(os.environ.get("MODEL_UPDATE_TREES", 20))
+
+# Trees kept after an incremental update, oldest evicted first
+MAX_FOREST_TREES = int(os.environ.get("MAX_FOREST_TREES", 200))
+
+# Incremental versions between full snapshots of the sklearn forest (the others store only their update)
+MODEL_SNAPSHOT_INTERVAL = int(os.environ.get("MODEL_SNAPSHOT_INTERVAL", 5))
+
+# An incremental update is rejected (a full training is needed) when its test RMSE exceeds the
+# last full training's by more than this factor
+MAX_INCREMENTAL_RMSE_RATIO = float(os.environ.get("MAX_INCREMENTAL_RMSE_RATIO", 1.5))
+
+# Largest path tables (per-leaf contributions) a forest may need to be flattened for serving
+MAX_PATH_TABLE_MB = float(os.environ.get("MAX_PATH_TABLE_MB", 1024))
+
+# Encoder columns the model is trained on
+TRAINING_FEATURES = [
+    "age", "work_experience", "work_hours_per_day", "work_days_per_week",
+    "mask_usage", "gloves_usage", "boots_usage", "protection_score",
+    "has_respiratory_conditions", "has_skin_conditions", "has_neurological_conditions"
+]
+
+# Encoder columns a multi-output model is trained on (the specific risks also depend on chemical exposure)
+MULTI_OUTPUT_FEATURES = TRAINING_FEATURES + ["chemical_risk_score"]
+
+# Scores predicted by a multi-output forest, in output order (a single-output forest predicts the first)
+RISK_OUTPUTS = ["overall_risk", "respiratory_risk", "skin_risk", "neurological_risk"]
+
+# Margin of error (+/- points) reported around the synthetic risk score
+SYNTHETIC_CONFIDENCE_MARGIN = 5.0
+
+# Decimals kept in reported scores: features are encoded as float32, whose rounding
+# (about 1e-5 on a 0-100 score) must not show in the API (99.99999952 instead of 100)
+SCORE_DECIMALS = 4
+
+# Importance scores reported while no trained model is loaded
+SYNTHETIC_FEATURE_IMPORTANCE = [
+    {"feature": "protection_score", "importance": 0.85},
+    {"feature": "chemical_risk_score", "importance": 0.78},
+    {"feature": "age", "importance": 0.72},
+    {"feature": "has_respiratory_conditions", "importance": 0.65},
+    {"feature": "work_hours_per_day", "importance": 0.58},
+    {"feature": "work_experience", "importance": 0.52},
+    {"feature": "socio_economic_status", "importance": 0.48},
+    {"feature": "employment_status", "importance": 0.42},
+    {"feature": "has_chronic_exposure", "importance": 0.38},
+    {"feature": "has_skin_conditions", "importance": 0.35}
+]
+
 class RiskModel:
-    def __init__(self, model=None, scaler=None, feature_names=None):
-        self.model = model if model is not None else RandomForestRegressor(
-            n_estimators=100, 
-            max_depth=10,
-            random_state=42
-        )
-        self.scaler = scaler if scaler is not None else StandardScaler()
+    def __init__(self, model=None, scaler=None, feature_names=None, seed=RISK_MODEL_SEED,
+                 cache_size=PREDICTION_CACHE_SIZE, cache_ttl=PREDICTION_CACHE_TTL, forest=None):
+        # sklearn forest and scaler (created by fit() when not given; serving only needs the flattened forest)
+        self.model = model
+        self.scaler = scaler
         self.feature_names = feature_names if feature_names is not None else []
         
         # Mapping dictionaries for categorical variables
@@ -62,16 +129,141 @@ class RiskModel:
             "skin": 1.5,
             "neurological": 1.8,
         }
+        
+        # Feature schema compiled once into a fixed float32 layout
+        self.encoder = FeatureEncoder(
+            self.categorical_mappings,
+            self.protection_effectiveness,
+            self.chemical_severity
+        )
+        
+        # Risk factor and recommendation rules compiled into vectorized predicates
+        self.rules = RuleEngine()
+        
+        # Seed for deterministic scoring (None keeps the random variation)
+        self.seed = seed
+        
+        # Cache of full prediction results, only used while scoring is deterministic
+        self.cache = PredictionCache(max_size=cache_size, ttl=cache_ttl)
+        
+        # Flattened trained forest used for serving (None until a model is fitted);
+        # an already flattened one (e.g. memory-mapped from the registry) is used as is
+        self._compile_forest(forest)
     
     def fit(self, X, y):
         """Train the model with features X and target y"""
+        # sklearn is only imported once a model is trained
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        
+        if self.model is None:
+            self.model = RandomForestRegressor(**DEFAULT_FOREST_PARAMS)
+        if self.scaler is None:
+            self.scaler = StandardScaler()
         if isinstance(X, pd.DataFrame):
             self.feature_names = X.columns.tolist()
             X = X.values
         X_scaled = self.scaler.fit_transform(X)
         self.model.fit(X_scaled, y)
+        self._compile_forest()
         return self
     
+    def add_trees(self, X, y, n_trees=MODEL_UPDATE_TREES, max_trees=None):
+        """
+        Grow the fitted forest with trees trained on a new batch only (warm start)
+        
+        The scaler fitted with the original model is kept, so the existing trees
+        keep seeing the inputs they were trained on.
+        
+        Args:
+            X: New batch features (DataFrame with the model's feature names, or array)
+            y: New batch target
+            n_trees: Number of trees to train on the batch
+            max_trees: Evict the oldest trees beyond this many (None keeps them all)
+            
+        Returns:
+            The update (see apply_forest_update), to be persisted instead of the whole forest
+        """
+        if not is_fitted_forest(self.model):
+            raise ValueError("Incremental updates need a trained forest")
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names].values
+        
+        # Warm start only fits the trees beyond the existing ones
+        existing = list(self.model.estimators_)
+        self.model.set_params(warm_start=True, n_estimators=len(existing) + n_trees)
+        try:
+            self.model.fit(self.scaler.transform(X), y)
+        finally:
+            self.model.set_params(warm_start=False)
+        new_trees = self.model.estimators_[len(existing):]
+        self.model.estimators_ = existing
+        
+        # Only trees that were there before the update are evicted
+        evicted = 0 if max_trees is None else min(len(existing), max(0, len(existing) + n_trees - max_trees))
+        update = {"estimators": new_trees, "evicted": evicted, "rows": len(X)}
+        self.apply_update(update)
+        return update
+    
+    def apply_update(self, update):
+        """Apply an incremental update to the forest and recompile it"""
+        apply_forest_update(self.model, update)
+        self._compile_forest()
+    
+    @property
+    def deterministic(self):
+        """Whether identical inputs always produce identical predictions"""
+        return self.forest is not None or self.seed is not None
+    
+    def _compile_forest(self, forest=None):
+        """Flatten the fitted forest (unless given flattened) and map its inputs onto the encoder columns"""
+        self.forest = None
+        self._model_inputs_source = None
+        self.global_importance = SYNTHETIC_FEATURE_IMPORTANCE
+        self.version = "synthetic" if self.seed is None else f"synthetic-seed-{self.seed}"
+        
+        # Cached predictions belong to the previous model
+        self.cache.clear()
+        
+        if forest is None:
+            if not is_fitted_forest(self.model) or len(self.feature_names or []) != self.model.n_features_in_:
+                return
+            # Deep forests can need far more memory for their path tables than for their trees
+            table_mb = path_table_nbytes(self.model) / 2**20
+            if table_mb > MAX_PATH_TABLE_MB:
+                raise ValueError(
+                    f"Forest too large to serve: its path tables need {table_mb:.0f} MB "
+                    f"(MAX_PATH_TABLE_MB is {MAX_PATH_TABLE_MB:.0f}); limit max_depth or n_estimators"
+                )
+            forest = FlatForest(self.model, self.scaler)
+        elif len(self.feature_names or []) != forest.n_features:
+            return
+        
+        self.forest = forest
+        self.version = f"forest-{self.forest.fingerprint}"
+        self._model_feature_index = {name: j for j, name in enumerate(self.feature_names)}
+        
+        # Global importances are fixed for a fitted model, so build them once here
+        self.global_importance = sorted(
+            (
+                {"feature": name, "importance": float(importance)}
+                for name, importance in zip(self.feature_names, self.forest.feature_importances)
+            ),
+            key=lambda entry: entry["importance"],
+            reverse=True
+        )
+        # Features with no encoder column are fed as 0
+        self._model_inputs_source = [name if name in self.encoder.index else None for name in self.feature_names]
+    
+    def _model_inputs(self, columns):
+        """Build the trained model's input matrix from encoded column arrays"""
+        n_rows = len(next(iter(columns.values())))
+        X = np.zeros((n_rows, len(self._model_inputs_source)))
+        for j, source in enumerate(self._model_inputs_source):
+            if source is not None:
+                X[:, j] = columns[source]
+        return X
+    
     def predict(self, features):
         """
         Predict risk based on input features
@@ -80,447 +272,481 @@ class RiskModel:
             features: Dict with feature values
             
         Returns:
-            Dict with risk scores and associated information
+            Dict with risk scores and associated information (shared with the
+            prediction cache when scoring is deterministic, so do not mutate it)
         """
-        # Process features for prediction
-        processed_features = self._process_features(features)
-        
-        # In a real model, we would scale and predict
-        # Here we're using a more comprehensive synthetic prediction
-        # to demonstrate the capabilities
+        return self.predict_many([features])[0]
+    
+    def predict_many(self, features_list):
+        """
+        Full predictions (as returned by predict) for several farmers at once
         
-        # Calculate risk based on feature combinations with some randomness
-        overall_risk = self._calculate_synthetic_risk(processed_features)
+        Every input gets exactly the result predict() would give it, but the
+        cache misses are scored together: one forest traversal for all of
+        them and one for all of their what-if scenarios. Used to coalesce
+        concurrent single-profile requests.
         
-        # Calculate specific health risks
-        respiratory_risk = self._calculate_respiratory_risk(processed_features, overall_risk)
-        skin_risk = self._calculate_skin_risk(processed_features, overall_risk)
-        neurological_risk = self._calculate_neurological_risk(processed_features, overall_risk)
+        Args:
+            features_list: List of feature dicts
+            
+        Returns:
+            List of result dicts, in input order (shared with the prediction
+            cache when scoring is deterministic, so do not mutate them)
+        """
+        # Encode features into the fixed float32 layout, one row per input
+        # (stage_timer feeds the per-stage latency histograms of /metrics)
+        with stage_timer("risk_model", "process_features"):
+            base_rows = np.empty((len(features_list), len(self.encoder.columns)), dtype=np.float32)
+            for i, features in enumerate(features_list):
+                self.encoder.encode(features, out=base_rows[i])
+        results = [None] * len(base_rows)
+        
+        # The encoded vector is canonical (equipment and chemical order does not
+        # matter) and fully determines the result, so it keys the cache;
+        # identical inputs in the same call are scored once
+        cache_keys = [None] * len(base_rows)
+        misses = []
+        duplicates = {}
+        for i, base_row in enumerate(base_rows):
+            if self.deterministic:
+                cache_keys[i] = feature_key(base_row.tobytes())
+                results[i] = self.cache.get(cache_keys[i])
+                if results[i] is not None:
+                    continue
+                if cache_keys[i] in duplicates:
+                    duplicates[cache_keys[i]].append(i)
+                    continue
+                duplicates[cache_keys[i]] = []
+            misses.append(i)
+        if not misses:
+            return results
+        
+        X = base_rows[misses]
+        columns = self.encoder.column_view(X)
+        
+        # Use the trained forest when one is loaded, otherwise the synthetic
+        # risk formula based on feature combinations with some randomness.
+        # The random variation is drawn once per row so the what-if scenarios share it.
+        with stage_timer("risk_model", "risk_scores"):
+            noise = self._draw_noise(X)
+            scores = self._score_columns(columns, noise, with_interval=True, with_contributions=True)
+        
+        # Risk factors and recommendations (rule bitmasks, turned into texts per row)
+        with stage_timer("risk_model", "recommendations"):
+            rule_matches = self.rules.evaluate(columns, scores["overall_risk"])
+            rule_texts = [self.rules.materialise(rule_matches, k) for k in range(len(misses))]
+        
+        # What-if scenarios of every row, scored in one pass
+        with stage_timer("risk_model", "what_if"):
+            processed = [self.encoder.to_dict(X[k]) for k in range(len(misses))]
+            what_if_scenarios = self._generate_what_if_scenarios_many(processed, X, noise)
+        
+        # Result dicts, stored in the cache
+        with stage_timer("risk_model", "assemble"):
+            contributions = scores["contributions"]
+            for k, i in enumerate(misses):
+                result = {
+                    "overall_risk": float(scores["overall_risk"][k]),
+                    "respiratory_risk": float(scores["respiratory_risk"][k]),
+                    "skin_risk": float(scores["skin_risk"][k]),
+                    "neurological_risk": float(scores["neurological_risk"][k]),
+                    "risk_factors": rule_texts[k]["risk_factors"],
+                    "recommendations": rule_texts[k]["recommendations"],
+                    # Feature importance, with this prediction's contributions when the forest is used
+                    "feature_importance": self._calculate_feature_importance(
+                        processed[k], None if contributions is None else contributions[k]
+                    ),
+                    # Confidence interval (spread of the tree predictions, or a fixed margin)
+                    "confidence_interval": scores["confidence_interval"][k].tolist(),
+                    "what_if_scenarios": what_if_scenarios[k]
+                }
+                results[i] = result
+                if cache_keys[i] is not None:
+                    self.cache.put(cache_keys[i], result)
+                    for j in duplicates[cache_keys[i]]:
+                        results[j] = result
         
-        # Generate risk factors based on features
-        risk_factors = self._generate_risk_factors(processed_features, overall_risk)
+        return results
+    
+    def predict_batch(self, data):
+        """
+        Predict risk scores for many farmers in one vectorized pass
         
-        # Generate recommendations based on risk factors
-        recommendations = self._generate_recommendations(processed_features, risk_factors)
+        Args:
+            data: DataFrame or dict of equal-length arrays, one entry per feature
+                  (same keys as the single-farmer features dict)
+            
+        Returns:
+            Dict of NumPy arrays with the overall, respiratory, skin and
+            neurological scores, plus an (n_rows, 2) confidence_interval
+            array, in input order, and the rule_matches bitmasks (pass them to
+            self.rules.materialise to get a row's risk factors and recommendations)
+        """
+        X = self.encoder.encode_frame(data)
+        columns = self.encoder.column_view(X)
+        scores = self._score_columns(columns, self._draw_noise(X), with_interval=True)
+        scores["rule_matches"] = self.rules.evaluate(columns, scores["overall_risk"])
+        return scores
+    
+    def what_if_grid(self, features, work_hours=None, work_days=None, subsets=None):
+        """
+        Score every combination of work hours, work days and equipment subset
+        for one profile in a single vectorized pass
         
-        # Calculate feature importance
-        feature_importance = self._calculate_feature_importance(processed_features)
+        Args:
+            features: Dict with the base profile's feature values
+            work_hours: Work hours per day to sweep (defaults to 4-12)
+            work_days: Work days per week to sweep (defaults to 3-7)
+            subsets: Equipment subsets to sweep (defaults to every subset of
+                     the known protective equipment)
+            
+        Returns:
+            Dict with the swept axes and one dense
+            (len(work_hours), len(work_days), len(subsets)) array per risk score
+        """
+        work_hours = DEFAULT_WORK_HOURS if work_hours is None else list(work_hours)
+        work_days = DEFAULT_WORK_DAYS if work_days is None else list(work_days)
+        subsets = equipment_subsets(self.protection_effectiveness) if subsets is None else [list(subset) for subset in subsets]
         
-        # Calculate confidence interval (mock)
-        confidence_margin = 5.0  # 5% margin of error
-        confidence_interval = [
-            max(0, overall_risk - confidence_margin),
-            min(100, overall_risk + confidence_margin)
-        ]
+        base_row = self.encoder.encode(features)
+        X = build_grid(self.encoder, base_row, work_hours, work_days, subsets)
         
-        # Generate what-if scenarios
-        what_if_scenarios = self._generate_what_if_scenarios(processed_features, overall_risk)
+        # Every scenario shares the random variation of the base profile
+        noise = np.repeat(self._draw_noise(base_row.reshape(1, -1)), len(X))
+        scores = self._score_columns(self.encoder.column_view(X), noise)
         
+        shape = (len(work_hours), len(work_days), len(subsets))
         return {
+            "work_hours_per_day": work_hours,
+            "work_days_per_week": work_days,
+            "equipment_subsets": [list(subset) for subset in subsets],
+            **{name: values.reshape(shape) for name, values in scores.items()}
+        }
+    
+    @property
+    def multi_output(self):
+        """Whether the trained forest predicts every risk score jointly"""
+        return self.forest is not None and self.forest.n_outputs == len(RISK_OUTPUTS)
+    
+    def _score_columns(self, columns, noise, with_interval=False, with_contributions=False):
+        """Compute the overall and specific risk scores for encoded column arrays"""
+        if self.multi_output:
+            return self._score_columns_jointly(columns, with_interval, with_contributions)
+        
+        if with_interval or with_contributions:
+            overall_risk, lower, upper, contributions = self._calculate_overall_risk_interval(
+                columns, noise, with_contributions=with_contributions
+            )
+        else:
+            overall_risk = self._calculate_overall_risk(columns, noise)
+        
+        scores = {
             "overall_risk": overall_risk,
-            "respiratory_risk": respiratory_risk,
-            "skin_risk": skin_risk,
-            "neurological_risk": neurological_risk,
-            "risk_factors": risk_factors,
-            "recommendations": recommendations,
-            "feature_importance": feature_importance,
-            "confidence_interval": confidence_interval,
-            "what_if_scenarios": what_if_scenarios
+            "respiratory_risk": self._calculate_respiratory_risk(columns, overall_risk),
+            "skin_risk": self._calculate_skin_risk(columns, overall_risk),
+            "neurological_risk": self._calculate_neurological_risk(columns, overall_risk),
         }
+        if with_interval:
+            scores["confidence_interval"] = np.column_stack([lower, upper])
+        scores = {name: _reported_scores(values) for name, values in scores.items()}
+        if with_contributions:
+            scores["contributions"] = contributions
+        return scores
+    
+    def _score_columns_jointly(self, columns, with_interval=False, with_contributions=False):
+        """Every risk score from one traversal of a multi-output forest"""
+        output = self.forest.evaluate(
+            self._model_inputs(columns),
+            coverage=DEFAULT_COVERAGE if with_interval else None,
+            contributions=with_contributions
+        )
+        mean = _reported_scores(np.clip(output.mean, 0, 100))
+        scores = {name: mean[:, k] for k, name in enumerate(RISK_OUTPUTS)}
+        
+        # The interval and contributions describe the overall risk
+        if with_interval:
+            scores["confidence_interval"] = _reported_scores(
+                np.clip(np.column_stack([output.lower[:, 0], output.upper[:, 0]]), 0, 100)
+            )
+        if with_contributions:
+            scores["contributions"] = output.contributions[:, :, 0]
+        return scores
     
     def _process_features(self, features):
         """Process and normalize input features"""
-        processed = {}
-        
-        # Numeric features
-        numeric_features = [
-            "age", "work_experience", "work_hours_per_day", 
-            "work_days_per_week", "protective_equipment_count",
-            "chemical_exposure_count", "number_of_children"
-        ]
-        
-        for feature in numeric_features:
-            if feature in features:
-                processed[feature] = float(features[feature])
-            else:
-                # Default values
-                defaults = {
-                    "age": 40,
-                    "work_experience": 10,
-                    "work_hours_per_day": 8,
-                    "work_days_per_week": 5,
-                    "protective_equipment_count": 0,
-                    "chemical_exposure_count": 0,
-                    "number_of_children": 2
-                }
-                processed[feature] = defaults[feature]
+        return self.encoder.to_dict(self.encoder.encode(features))
+    
+    def _calculate_overall_risk(self, features, noise):
+        """Overall risk from the trained forest if available, else the synthetic formula"""
+        if self.forest is not None:
+            predictions = self.forest.predict(self._model_inputs(features))
+            return np.clip(predictions[:, 0] if predictions.ndim == 2 else predictions, 0, 100)
+        return self._calculate_synthetic_risk(features, noise)
+    
+    def _calculate_overall_risk_interval(self, features, noise, with_contributions=False):
+        """
+        Overall risk with a confidence interval
         
-        # Binary features
-        binary_features = [
-            "has_respiratory_conditions", "has_skin_conditions", "has_chronic_exposure"
-        ]
+        With a trained forest the interval comes from the quantiles of the
+        per-tree predictions and the per-feature contributions from the leaf
+        path tables, all from the same traversal as the mean; the synthetic
+        formula gets a fixed margin and no contributions instead.
         
-        for feature in binary_features:
-            if feature in features:
-                # Convert to 1 or 0
-                processed[feature] = 1 if features[feature] in [True, 1, "1", "true", "True", "yes", "Yes"] else 0
-            else:
-                processed[feature] = 0
-        
-        # Categorical features
-        for feature, mapping in self.categorical_mappings.items():
-            if feature in features:
-                value = features[feature]
-                if value in mapping:
-                    processed[feature] = mapping[value]
-                else:
-                    # Default to first category if invalid
-                    processed[feature] = list(mapping.values())[0]
-            else:
-                # Default to first category if missing
-                processed[feature] = list(mapping.values())[0]
-        
-        # Process arrays of equipment and chemicals
-        if "protective_equipment" in features:
-            equipment_list = features["protective_equipment"]
-            if isinstance(equipment_list, str):
-                equipment_list = equipment_list.split(",")
-            
-            # Calculate protection score
-            protection_score = 0
-            for item in equipment_list:
-                item = item.strip().lower()
-                if item in self.protection_effectiveness:
-                    protection_score += self.protection_effectiveness[item]
-            
-            # Normalize to 0-10 scale
-            max_possible = sum(self.protection_effectiveness.values())
-            processed["protection_score"] = 10 * protection_score / max_possible if max_possible > 0 else 0
-        else:
-            processed["protection_score"] = 0
+        Returns:
+            ForestOutput of (overall_risk, lower, upper, contributions) arrays
+        """
+        if self.forest is not None:
+            output = self.forest.evaluate(self._model_inputs(features), contributions=with_contributions)
+            if self.multi_output:
+                output = ForestOutput(
+                    output.mean[:, 0], output.lower[:, 0], output.upper[:, 0],
+                    None if output.contributions is None else output.contributions[:, :, 0]
+                )
+            return output._replace(
+                mean=np.clip(output.mean, 0, 100),
+                lower=np.clip(output.lower, 0, 100),
+                upper=np.clip(output.upper, 0, 100)
+            )
+        
+        overall_risk = self._calculate_synthetic_risk(features, noise)
+        return ForestOutput(
+            overall_risk,
+            np.maximum(0, overall_risk - SYNTHETIC_CONFIDENCE_MARGIN),
+            np.minimum(100, overall_risk + SYNTHETIC_CONFIDENCE_MARGIN),
+            None
+        )
+    
+    def _draw_noise(self, X):
+        """
+        Small random variation for realistic effect (+/- 5%), one value per
+        encoded row. With a seed the variation is derived from the row's
+        features, so identical inputs always get identical scores.
+        """
+        if self.seed is None:
+            return (np.random.random(len(X)) * 10) - 5
+        return (row_uniforms(X, self.seed) * 10) - 5
+    
+    def _calculate_synthetic_risk(self, features, noise):
+        """
+        Calculate a synthetic risk score based on features
         
-        if "chemical_exposure" in features:
-            chemical_list = features["chemical_exposure"]
-            if isinstance(chemical_list, str):
-                chemical_list = chemical_list.split(",")
-            
-            # Calculate chemical risk score
-            chemical_risk = 0
-            for item in chemical_list:
-                item = item.strip().lower()
-                if item in self.chemical_severity:
-                    chemical_risk += self.chemical_severity[item]
+        Args:
+            features: Dict mapping feature names to equal-length column arrays
+            noise: Random variation per row (see _draw_noise)
             
-            # Normalize to 0-10 scale if there are chemicals, else 0
-            if chemical_list:
-                max_possible = sum(list(self.chemical_severity.values())[:len(chemical_list)])
-                processed["chemical_risk_score"] = 10 * chemical_risk / max_possible if max_possible > 0 else 0
-            else:
-                processed["chemical_risk_score"] = 0
-        else:
-            processed["chemical_risk_score"] = 0
-        
-        return processed
-
-    def _calculate_synthetic_risk(self, features):
-        """Calculate a synthetic risk score based on features"""
-        base_risk = 20  # Minimum risk
+        Returns:
+            Array of risk scores between 0 and 100
+        """
+        age = features["age"]
+        base_risk = np.full(len(age), 20.0)  # Minimum risk
         
         # Age factor
-        if features["age"] > 50:
-            base_risk += 10 + (features["age"] - 50) * 0.5
-        elif features["age"] > 40:
-            base_risk += 5 + (features["age"] - 40) * 0.5
+        base_risk += np.where(age > 50, 10 + (age - 50) * 0.5, np.where(age > 40, 5 + (age - 40) * 0.5, 0))
         
         # Work intensity
-        work_intensity = features["work_hours_per_day"] * features["work_days_per_week"] / 35.0  # Normalize to standard 35 hour week
-        if work_intensity > 1:
-            base_risk += (work_intensity - 1) * 15  # 15% per unit over standard
+        work_intensity = features["work_hours_per_day"] * features["work_days_per_week"] / 35.0
+        base_risk += np.where(work_intensity > 1, (work_intensity - 1) * 15, 0)
         
         # Experience factor (less experience = higher risk)
-        if features["work_experience"] < 5:
-            base_risk += (5 - features["work_experience"]) * 3
-        
-        # Protection factor (subtract from risk)
-        protection_effect = features["protection_score"] * 2.5  # Scale to 0-25 impact
-        base_risk -= protection_effect
-        
-        # Chemical exposure (add to risk)
-        chemical_effect = features["chemical_risk_score"] * 2  # Scale to 0-20 impact
-        base_risk += chemical_effect
-        
-        # Health conditions (add to risk)
-        if features["has_respiratory_conditions"]:
-            base_risk += 15
-        if features["has_skin_conditions"]:
-            base_risk += 10
-        if features["has_chronic_exposure"]:
-            base_risk += 12
-        
-        # Children factor (small addition - more children means less time for self-care)
-        if features["number_of_children"] > 3:
-            base_risk += (features["number_of_children"] - 3) * 2
-        
-        # Socioeconomic factor (lower status = higher risk)
-        if features["socio_economic_status"] == 0:  # 'bas'
-            base_risk += 10
-        elif features["socio_economic_status"] == 1:  # 'moyen'
-            base_risk += 5
-        
-        # Employment status factor (seasonal workers may have less stable conditions)
-        if features["employment_status"] == 0:  # 'saisonnière'
-            base_risk += 8
+        base_risk += np.where(features["work_experience"] < 5, (5 - features["work_experience"]) * 3, 0)
         
-        # Small random variation for realistic effect (+/- 5%)
-        random_factor = (random.random() * 10) - 5
-        base_risk += random_factor
+        # Protection and chemical exposure
+        base_risk -= features["protection_score"] * 2.5
+        base_risk += features["chemical_risk_score"] * 2
         
-        # Ensure risk is between 0 and 100
-        return max(0, min(100, base_risk))
-
-    def _calculate_respiratory_risk(self, features, overall_risk):
-        """Calculate respiratory-specific risk"""
-        base_respiratory_risk = overall_risk
-        
-        # Increase risk if respiratory conditions exist
-        if features["has_respiratory_conditions"]:
-            base_respiratory_risk += 15
-        
-        # Respiratory protection (mask) is especially important for this
-        has_mask = False
-        if "protective_equipment" in features:
-            equipment_list = features["protective_equipment"]
-            if isinstance(equipment_list, str):
-                equipment_list = equipment_list.split(",")
-            has_mask = "masque" in [item.strip().lower() for item in equipment_list]
-        
-        if not has_mask:
-            base_respiratory_risk += 10
-        
-        # Chemical impact on respiratory risk
-        chemical_impact = features["chemical_risk_score"] * 1.5
-        base_respiratory_risk += chemical_impact
-        
-        # Age effect on respiratory risk
-        if features["age"] > 60:
-            base_respiratory_risk += 8
-        elif features["age"] > 50:
-            base_respiratory_risk += 5
-        
-        # Ensure risk is between 0 and 100
-        return max(0, min(100, base_respiratory_risk))
-
-    def _calculate_skin_risk(self, features, overall_risk):
-        """Calculate skin-specific risk"""
-        base_skin_risk = overall_risk * 0.9  # Slightly lower than overall by default
+        # Health conditions
+        base_risk += np.where(features["has_respiratory_conditions"], 15, 0)
+        base_risk += np.where(features["has_skin_conditions"], 10, 0)
+        base_risk += np.where(features["has_chronic_exposure"], 12, 0)
         
-        # Increase risk if skin conditions exist
-        if features["has_skin_conditions"]:
-            base_skin_risk += 20
+        # Children factor
+        base_risk += np.where(features["number_of_children"] > 3, (features["number_of_children"] - 3) * 2, 0)
         
-        # Skin protection (gloves) is especially important for this
-        has_gloves = False
-        if "protective_equipment" in features:
-            equipment_list = features["protective_equipment"]
-            if isinstance(equipment_list, str):
-                equipment_list = equipment_list.split(",")
-            has_gloves = "gants" in [item.strip().lower() for item in equipment_list]
+        # Socioeconomic factor ('bas' = 0, 'moyen' = 1)
+        socio_economic_status = features["socio_economic_status"]
+        base_risk += np.select([socio_economic_status == 0, socio_economic_status == 1], [10, 5], 0)
         
-        if not has_gloves:
-            base_skin_risk += 15
+        # Employment status factor ('saisonnière' = 0)
+        base_risk += np.where(features["employment_status"] == 0, 8, 0)
         
-        # Chemical impact on skin risk
-        chemical_impact = features["chemical_risk_score"] * 1.2
-        base_skin_risk += chemical_impact
+        # Small random variation for realistic effect (+/- 5%)
+        base_risk += noise
         
-        # Ensure risk is between a and 100
-        return max(0, min(100, base_skin_risk))
-
+        return np.clip(base_risk, 0, 100)
+    
+    def _calculate_respiratory_risk(self, features, overall_risk):
+        """Calculate respiratory-specific risk"""
+        base_respiratory_risk = overall_risk + np.where(features["has_respiratory_conditions"], 15, 0)
+        base_respiratory_risk += (1 - features["mask_usage"]) * 10
+        base_respiratory_risk += features["chemical_risk_score"] * 1.5
+        base_respiratory_risk += np.where(features["age"] > 60, 8, np.where(features["age"] > 50, 5, 0))
+        return np.clip(base_respiratory_risk, 0, 100)
+    
+    def _calculate_skin_risk(self, features, overall_risk):
+        """Calculate skin-specific risk"""
+        base_skin_risk = overall_risk * 0.9 + np.where(features["has_skin_conditions"], 20, 0)
+        base_skin_risk += (1 - features["gloves_usage"]) * 15
+        base_skin_risk += features["chemical_risk_score"] * 1.2
+        return np.clip(base_skin_risk, 0, 100)
+    
     def _calculate_neurological_risk(self, features, overall_risk):
         """Calculate neurological-specific risk"""
-        base_neuro_risk = overall_risk * 0.8  # Lower than overall by default
-        
-        # Chemical impact is high for neurological risk
-        chemical_impact = features["chemical_risk_score"] * 2
-        base_neuro_risk += chemical_impact
-        
-        # Chronic exposure has big impact
-        if features["has_chronic_exposure"]:
-            base_neuro_risk += 20
-        
-        # Age effect on neurological risk
-        if features["age"] > 55:
-            base_neuro_risk += 10
-        
-        # Work intensity affects neurological risk
+        base_neuro_risk = overall_risk * 0.8 + features["chemical_risk_score"] * 2
+        base_neuro_risk += np.where(features["has_chronic_exposure"], 20, 0)
+        base_neuro_risk += np.where(features["age"] > 55, 10, 0)
         work_intensity = features["work_hours_per_day"] * features["work_days_per_week"] / 35.0
-        if work_intensity > 1.2:  # High intensity
-            base_neuro_risk += 8
-        
-        # Ensure risk is between 0 and 100
-        return max(0, min(100, base_neuro_risk))
-
-    def _generate_risk_factors(self, features, overall_risk):
-        """Generate risk factors based on features"""
-        risk_factors = []
-        
-        # Age risk factor
-        if features["age"] > 50:
-            risk_factors.append(f"Âge supérieur à 50 ans ({features['age']} ans)")
-        
-        # Work intensity risk factor
-        hours_per_week = features["work_hours_per_day"] * features["work_days_per_week"]
-        if hours_per_week > 40:
-            risk_factors.append(f"Temps de travail élevé ({hours_per_week} heures par semaine)")
-        
-        # Protection equipment risk factor
-        if features["protection_score"] < 5:
-            risk_factors.append("Utilisation insuffisante d'équipement de protection")
-        
-        # Chemical exposure risk factor
-        if features["chemical_risk_score"] > 5:
-            risk_factors.append("Exposition élevée à des produits chimiques")
-        
-        # Health condition risk factors
-        if features["has_respiratory_conditions"]:
-            risk_factors.append("Présence de troubles respiratoires préexistants")
-        if features["has_skin_conditions"]:
-            risk_factors.append("Antécédents de problèmes cutanés")
-        if features["has_chronic_exposure"]:
-            risk_factors.append("Exposition chronique aux produits agricoles")
-        
-        # Socioeconomic risk factor
-        if features["socio_economic_status"] == 0:  # 'bas'
-            risk_factors.append("Niveau socio-économique bas (accès limité aux ressources)")
-        
-        # Employment status risk factor
-        if features["employment_status"] == 0:  # 'saisonnière'
-            risk_factors.append("Statut d'emploi saisonnier (conditions de travail moins stables)")
-        
-        # Ensure we return at least some risk factors
-        if not risk_factors and overall_risk > 30:
-            risk_factors.append("Combinaison de facteurs de risque agricoles")
-        
-        return risk_factors
+        base_neuro_risk += np.where(work_intensity > 1.2, 8, 0)
+        return np.clip(base_neuro_risk, 0, 100)
 
-    def _generate_recommendations(self, features, risk_factors):
-        """Generate personalized recommendations based on risk factors"""
-        recommendations = []
-        
-        # Protective equipment recommendations
-        if "Utilisation insuffisante d'équipement de protection" in risk_factors:
-            recommendations.append("Utiliser plus régulièrement des équipements de protection, particulièrement un masque et des gants")
-        
-        # Chemical exposure recommendations
-        if "Exposition élevée à des produits chimiques" in risk_factors:
-            recommendations.append("Limiter l'exposition aux produits chimiques en suivant les instructions d'utilisation et en portant un équipement de protection approprié")
-        
-        # Work hours recommendations
-        hours_per_week = features["work_hours_per_day"] * features["work_days_per_week"]
-        if hours_per_week > 40:
-            recommendations.append(f"Réduire les heures de travail hebdomadaires (actuellement {hours_per_week}h) pour limiter la fatigue et l'exposition")
-        
-        # Health-based recommendations
-        if features["has_respiratory_conditions"]:
-            recommendations.append("Consulter régulièrement un médecin pour le suivi des troubles respiratoires")
-            recommendations.append("Porter un masque de protection respiratoire adapté lors de l'utilisation de produits chimiques")
-        
-        if features["has_skin_conditions"]:
-            recommendations.append("Utiliser des gants de protection pour éviter le contact direct avec les produits chimiques")
-            recommendations.append("Se laver soigneusement les mains et la peau exposée après le travail")
-        
-        # Age-based recommendations
-        if features["age"] > 55:
-            recommendations.append("Prévoir des pauses plus fréquentes pendant le travail")
-            recommendations.append("Éviter les tâches nécessitant des efforts physiques intenses")
-        
-        # Socioeconomic recommendations
-        if features["socio_economic_status"] == 0:  # 'bas'
-            recommendations.append("Se renseigner sur les programmes d'aide pour l'achat d'équipement de protection")
-        
-        # General recommendations
-        recommendations.append("Maintenir une bonne hydratation pendant le travail, surtout par temps chaud")
-        
-        return recommendations[:5]  # Limit to top 5 recommendations
-    
-    def _calculate_feature_importance(self, features):
-        """Calculate feature importance for visualization"""
-        # In a real model, we would extract this from the trained model
-        # Here we're providing synthetic importance scores
-        importance_scores = [
-            {"feature": "protection_score", "importance": 0.85},
-            {"feature": "chemical_risk_score", "importance": 0.78},
-            {"feature": "age", "importance": 0.72},
-            {"feature": "has_respiratory_conditions", "importance": 0.65},
-            {"feature": "work_hours_per_day", "importance": 0.58},
-            {"feature": "work_experience", "importance": 0.52},
-            {"feature": "socio_economic_status", "importance": 0.48},
-            {"feature": "employment_status", "importance": 0.42},
-            {"feature": "has_chronic_exposure", "importance": 0.38},
-            {"feature": "has_skin_conditions", "importance": 0.35}
-        ]
+    def _calculate_feature_importance(self, features, contributions=None):
+        """
+        Feature importance for visualization
         
-        return importance_scores
+        Args:
+            features: Processed feature dict
+            contributions: Per-feature contributions of this prediction (trained
+                           forest only), in the model's feature order
+            
+        Returns:
+            The cached global importances, each entry extended with this
+            prediction's contribution when contributions are given
+        """
+        if contributions is None:
+            return self.global_importance
+        
+        return [
+            {**entry, "contribution": float(contributions[self._model_feature_index[entry["feature"]]])}
+            for entry in self.global_importance
+        ]
     
-    def _generate_what_if_scenarios(self, features, overall_risk):
-        """Generate what-if scenarios for risk reduction"""
+    def _what_if_overrides(self, features):
+        """What-if scenarios for risk reduction that apply to a profile, as (label, feature overrides)"""
         scenarios = []
         
         # Add protective equipment scenario
         if features["protection_score"] < 8:
-            new_features = features.copy()
-            new_features["protection_score"] = 8
-            new_risk = self._calculate_synthetic_risk(new_features)
-            scenarios.append({
-                "label": "Avec protection complète",
-                "score": new_risk
-            })
+            scenarios.append(("Avec protection complète", {"protection_score": 8}))
         
         # Reduce work hours scenario
         if features["work_hours_per_day"] > 6:
-            new_features = features.copy()
-            new_features["work_hours_per_day"] = 6
-            new_risk = self._calculate_synthetic_risk(new_features)
-            scenarios.append({
-                "label": "Avec réduction des heures de travail",
-                "score": new_risk
-            })
-        
-        # Add mask specifically for respiratory protection
-        protective_equipment_list = []
-        if "protective_equipment" in features:
-            equipment_list = features["protective_equipment"]
-            if isinstance(equipment_list, str):
-                protective_equipment_list = equipment_list.split(",")
-            else:
-                protective_equipment_list = equipment_list
-        
-        if "masque" not in [item.strip().lower() for item in protective_equipment_list]:
-            new_features = features.copy()
-            new_features["protective_equipment"] = protective_equipment_list + ["masque"]
-            new_features["protection_score"] = features["protection_score"] + (self.protection_effectiveness["masque"] / sum(self.protection_effectiveness.values()) * 10)
-            new_risk = self._calculate_synthetic_risk(new_features)
-            scenarios.append({
-                "label": "Avec masque respiratoire",
-                "score": new_risk
-            })
+            scenarios.append(("Avec réduction des heures de travail", {"work_hours_per_day": 6}))
+        
+        # Add mask specifically for respiratory protection (worn all the time)
+        if features["mask_usage"] < 1:
+            mask_share = self.protection_effectiveness["masque"] / sum(self.protection_effectiveness.values()) * 10
+            scenarios.append(("Avec masque respiratoire", {
+                "mask_usage": 1,
+                "protection_score": features["protection_score"] + mask_share * (1 - features["mask_usage"])
+            }))
         
         # Reduce chemical exposure scenario
         if features["chemical_risk_score"] > 0:
-            new_features = features.copy()
-            new_features["chemical_risk_score"] = max(0, features["chemical_risk_score"] - 5)
-            new_risk = self._calculate_synthetic_risk(new_features)
-            scenarios.append({
-                "label": "Avec réduction de l'exposition chimique",
-                "score": new_risk
-            })
+            scenarios.append(("Avec réduction de l'exposition chimique", {
+                "chemical_risk_score": max(0, features["chemical_risk_score"] - 5)
+            }))
         
         return scenarios
+    
+    def _generate_what_if_scenarios_many(self, features_list, base_rows, noise):
+        """What-if scenarios of several profiles (rows of base_rows), all scored in one vectorized pass"""
+        scenarios = [self._what_if_overrides(features) for features in features_list]
+        counts = [len(entries) for entries in scenarios]
+        if not sum(counts):
+            return [[] for _ in scenarios]
+        
+        # One row per scenario, copied from its profile's base vector with the overrides applied
+        X = np.repeat(base_rows, counts, axis=0)
+        row = 0
+        for entries in scenarios:
+            for label, overrides in entries:
+                for name, value in overrides.items():
+                    X[row, self.encoder.index[name]] = value
+                row += 1
+        
+        scores = _reported_scores(self._calculate_overall_risk(self.encoder.column_view(X), np.repeat(noise, counts)))
+        
+        results = []
+        start = 0
+        for entries in scenarios:
+            results.append([
+                {"label": label, "score": float(score)}
+                for (label, overrides), score in zip(entries, scores[start:start + len(entries)])
+            ])
+            start += len(entries)
+        return results
+
+def _reported_scores(values):
+    """Scores as reported by the API: float64, rounded to SCORE_DECIMALS"""
+    return np.round(np.asarray(values, dtype=np.float64), SCORE_DECIMALS)
+
+def apply_forest_update(model, update):
+    """Drop an incremental update's evicted (oldest) trees from a fitted forest and append its new trees"""
+    model.estimators_ = list(model.estimators_[update["evicted"]:]) + list(update["estimators"])
+    model.n_estimators = len(model.estimators_)
+
+def load_model_version(version, with_estimator=False):
+    """
+    Load a registered model version
+    
+    The flattened forest of every version is memory-mapped, so loading takes
+    the same time however many updates led to it, and every process serving
+    it shares one physical copy of its arrays. It carries its own scaling, so
+    serving needs neither sklearn nor the sklearn objects. Only with_estimator
+    replays the updates since the last snapshot of the sklearn forest.
+    
+    Args:
+        version: Registry version id
+        with_estimator: Also load the sklearn forest and scaler (needed to update it incrementally)
+        
+    Returns:
+        RiskModel serving the version
+        
+    Raises:
+        ValueError: If an artifact is corrupted or the rebuilt forest differs from the one published
+    """
+    model_registry.verify(version)
+    feature_names = model_registry.load_artifact(version, "feature_names")
+    if model_registry.has_artifact(version, "forest"):
+        forest = model_registry.load_artifact(version, "forest", mmap=True)
+        if not with_estimator:
+            return RiskModel(feature_names=feature_names, forest=forest)
+        model = _load_estimator(version)
+        scaler = model_registry.load_artifact(version, "scaler")
+    else:
+        # Incremental versions published without their flattened forest
+        model = _load_estimator(version)
+        scaler = model_registry.load_artifact(version, "scaler")
+        forest = FlatForest(model, scaler)
+        fingerprint = model_registry.metadata(version).get("model_fingerprint")
+        if fingerprint is not None and fingerprint != f"forest-{forest.fingerprint}":
+            raise ValueError(f"Model version {version} does not rebuild into the forest it was published with")
+        if not with_estimator:
+            return RiskModel(feature_names=feature_names, forest=forest)
+    return RiskModel(model=model, scaler=scaler, feature_names=feature_names, forest=forest)
 
-def load_or_create_model():
-    """Load a saved model or create a new one if none exists"""
+def _load_estimator(version):
+    """sklearn forest of a version, rebuilt from its last snapshot for incremental versions"""
+    if model_registry.has_artifact(version, "estimator"):
+        return model_registry.load_artifact(version, "estimator")
+    parent = model_registry.metadata(version)["parent"]
+    model_registry.verify(parent)
+    model = _load_estimator(parent)
+    apply_forest_update(model, model_registry.load_artifact(version, "update"))
+    return model
+
+def load_or_create_model(with_estimator=False):
+    """Load the served model version or create a new one if none exists"""
+    version = model_registry.current_version()
+    if version is not None:
+        try:
+            return load_model_version(version, with_estimator=with_estimator)
+        except Exception as e:
+            print(f"Error loading model version {version}: {e}")
+    
+    # Models saved before the registry existed
     if os.path.exists(MODEL_FILE) and os.path.exists(SCALER_FILE):
         try:
+            import joblib
             model = joblib.load(MODEL_FILE)
             scaler = joblib.load(SCALER_FILE)
             feature_names = joblib.load(FEATURE_IMPORTANCE_FILE) if os.path.exists(FEATURE_IMPORTANCE_FILE) else None
@@ -531,91 +757,321 @@ def load_or_create_model():
     # If no model exists or loading failed, create a new one
     return RiskModel()
 
-def train_model(data):
-    """Train the model with the provided data"""
-    try:
-        # Extract features and target from data
-        # In a real scenario, you would have actual target values
-        # Here we'll simulate it based on your domain knowledge
-        
-        # Extract numeric features
-        X = pd.DataFrame({
-            'age': data['Age'] if 'Age' in data else np.random.randint(20, 70, len(data)),
-            'work_experience': data['Ancienneté agricole'] if 'Ancienneté agricole' in data else np.random.randint(1, 40, len(data)),
-            'work_hours_per_day': data['H travail / jour'] if 'H travail / jour' in data else np.random.uniform(4, 12, len(data)),
-            'work_days_per_week': data['J travail / Sem'] if 'J travail / Sem' in data else np.random.uniform(3, 7, len(data)),
-        })
-        
-        # Extract and encode categorical features
-        if 'Masque pour pesticides' in data:
-            X['mask_usage'] = data['Masque pour pesticides'].map({
-                'jamais': 0, 'parfois': 0.33, 'souvent': 0.67, 'toujours': 1
-            }).fillna(0)
-        else:
-            X['mask_usage'] = np.random.choice([0, 0.33, 0.67, 1], len(data))
-            
-        if 'Gants' in data:
-            X['gloves_usage'] = data['Gants'].map({
-                'jamais': 0, 'parfois': 0.33, 'souvent': 0.67, 'toujours': 1
-            }).fillna(0)
-        else:
-            X['gloves_usage'] = np.random.choice([0, 0.33, 0.67, 1], len(data))
-            
-        if 'Bottes' in data:
-            X['boots_usage'] = data['Bottes'].map({
-                'jamais': 0, 'parfois': 0.33, 'souvent': 0.67, 'toujours': 1
-            }).fillna(0)
-        else:
-            X['boots_usage'] = np.random.choice([0, 0.33, 0.67, 1], len(data))
-        
-        # Calculate a protection score
-        X['protection_score'] = (X['mask_usage'] + X['gloves_usage'] + X['boots_usage']) / 3 * 10
-        
-        # Add binary health condition features
-        X['has_respiratory_conditions'] = data.apply(
-            lambda row: 1 if row.get('Troubles cardio-respiratoires', '') != '' else 0, 
-            axis=1
-        )
-        
-        X['has_skin_conditions'] = data.apply(
-            lambda row: 1 if row.get('Troubles cutanés/phanères', '') != '' else 0, 
-            axis=1
-        )
-        
-        X['has_neurological_conditions'] = data.apply(
-            lambda row: 1 if row.get('Troubles neurologiques', '') != '' else 0, 
-            axis=1
-        )
-        
-        # Create a synthetic target variable based on domain knowledge
-        # Higher values = higher risk
-        y = 20 + \
-            (X['age'] > 50).astype(int) * 15 + \
-            (X['work_hours_per_day'] > 8).astype(int) * 10 + \
-            (X['work_days_per_week'] > 6).astype(int) * 10 + \
-            (10 - X['protection_score']) * 3 + \
-            X['has_respiratory_conditions'] * 15 + \
-            X['has_skin_conditions'] * 10 + \
-            X['has_neurological_conditions'] * 12
-            
-        # Cap the target between 0 and 100
-        y = np.clip(y, 0, 100)
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
-        # Create and train the model
-        risk_model = RiskModel()
-        risk_model.fit(X_train, y_train)
-        
-        # Save the model and scaler
-        joblib.dump(risk_model.model, MODEL_FILE)
-        joblib.dump(risk_model.scaler, SCALER_FILE)
-        joblib.dump(risk_model.feature_names, FEATURE_IMPORTANCE_FILE)
-        
-        return True
-    except Exception as e:
-        print(f"Error training model: {e}")
-        return False
+def publish_model(risk_model, metadata, update=None, parent=None, registry=None):
+    """
+    Register a trained model as a new version and serve it
+    
+    Args:
+        risk_model: Trained RiskModel
+        metadata: Training details (rows, metrics, ...) stored with the version
+        update: Incremental update to store instead of the whole sklearn forest
+                (a full snapshot is still stored every MODEL_SNAPSHOT_INTERVAL updates)
+        parent: Version the update applies to
+        registry: ModelRegistry to publish to (defaults to the served one)
+        
+    Returns:
+        The new version id
+    """
+    registry = registry if registry is not None else model_registry
+    # Every version stores its flattened forest, so serving loads it by memory-mapping alone
+    artifacts = {
+        "scaler": risk_model.scaler,
+        "feature_names": risk_model.feature_names,
+        "forest": risk_model.forest,
+    }
+    lineage = {"base_version": None, "updates_since_snapshot": 0}
+    if update is not None and parent is not None:
+        # The sklearn forest is only needed for the next update: store the delta, with
+        # a full snapshot every MODEL_SNAPSHOT_INTERVAL updates to bound the replay
+        parent_metadata = registry.metadata(parent)
+        lineage["base_version"] = parent_metadata.get("base_version") or parent
+        lineage["updates_since_snapshot"] = parent_metadata.get("updates_since_snapshot", 0) + 1
+        if lineage["updates_since_snapshot"] >= MODEL_SNAPSHOT_INTERVAL:
+            lineage["updates_since_snapshot"] = 0
+    else:
+        parent = None
+    if parent is not None and lineage["updates_since_snapshot"]:
+        artifacts["update"] = update
+    else:
+        artifacts["estimator"] = risk_model.model
+    
+    params = risk_model.model.get_params()
+    version = registry.publish(artifacts, {
+        **metadata,
+        **lineage,
+        "kind": "incremental" if parent else "full",
+        "parent": parent,
+        "model_fingerprint": risk_model.version,
+        "n_trees": risk_model.forest.n_trees,
+        "outputs": RISK_OUTPUTS[:risk_model.forest.n_outputs],
+        "params": {name: params[name] for name in ("max_depth", "min_samples_leaf", "max_features", "random_state")},
+        "feature_schema": {
+            "features": list(risk_model.feature_names),
+            "encoder_columns": list(risk_model.encoder.columns),
+        },
+    })
+    registry.set_current(version)
+    return version
+
+def build_training_data(data, encoder=None, multi_output=False, validation=None):
+    """
+    Build the training matrix and synthetic target from survey data
+    
+    Every chunk is validated against the survey codebook (see
+    app.models.survey_schema) before it is encoded, so a bad file is rejected
+    as soon as its first bad chunk is read, before any fitting.
+    
+    Args:
+        data: Survey DataFrame, or an iterable of DataFrame chunks (e.g. from
+              read_survey_chunks); each chunk is encoded and released in turn
+        encoder: FeatureEncoder to use (defaults to a fresh RiskModel's)
+        multi_output: Build the MULTI_OUTPUT_FEATURES matrix and one target
+                      column per RISK_OUTPUTS score instead of the overall risk only
+        validation: Optional dict filled with the validated rows and the
+                    (distinct) validation warnings
+        
+    Returns:
+        (X, y): DataFrame of training features and the target risk Series
+        (DataFrame with the RISK_OUTPUTS columns when multi_output)
+        
+    Raises:
+        SurveyValidationError: If a chunk fails validation
+    """
+    # Same survey mapping and encoder used for serving
+    encoder = encoder if encoder is not None else RiskModel().encoder
+    if validation is None:
+        validation = {}
+    validation.setdefault("rows", 0)
+    validation.setdefault("warnings", [])
+    if isinstance(data, pd.DataFrame):
+        data = [data]
+    parts = []
+    for chunk in data:
+        report = validate_survey(chunk)
+        validation["rows"] += report["rows"]
+        validation["warnings"] += [warning for warning in report["warnings"] if warning not in validation["warnings"]]
+        parts.append(_training_chunk(chunk, encoder, multi_output))
+    if not parts:
+        raise SurveyValidationError({"rows": 0, "errors": ["no survey rows"], "warnings": []})
+    if len(parts) == 1:
+        return parts[0]
+    return (
+        pd.concat([X for X, y in parts], ignore_index=True),
+        pd.concat([y for X, y in parts], ignore_index=True)
+    )
+
+def _training_chunk(data, encoder, multi_output=False):
+    """Training matrix and synthetic target(s) of one survey DataFrame"""
+    columns = encoder.column_view(encoder.encode_frame(survey_to_features(data)))
+    features = MULTI_OUTPUT_FEATURES if multi_output else TRAINING_FEATURES
+    X = pd.DataFrame({name: columns[name] for name in features})
+    
+    # Create a synthetic target variable based on domain knowledge
+    # Higher values = higher risk
+    y = 20 + \
+        (X['age'] > 50).astype(int) * 15 + \
+        (X['work_hours_per_day'] > 8).astype(int) * 10 + \
+        (X['work_days_per_week'] > 6).astype(int) * 10 + \
+        (10 - X['protection_score']) * 3 + \
+        X['has_respiratory_conditions'] * 15 + \
+        X['has_skin_conditions'] * 10 + \
+        X['has_neurological_conditions'] * 12
+        
+    # Cap the target between 0 and 100
+    y = np.clip(y, 0, 100)
+    if not multi_output:
+        return X, y
+    return X, pd.DataFrame({"overall_risk": y, **_specific_risk_targets(columns, y.to_numpy())})
+
+def _specific_risk_targets(columns, overall_risk):
+    """
+    Respiratory, skin and neurological training targets
+    
+    Built like the rule-based specific scores, but each one is driven by the
+    matching survey column (Troubles cardio-respiratoires / cutanés /
+    neurologiques, encoded as has_*_conditions).
+    """
+    age = columns["age"]
+    chemical_risk_score = columns["chemical_risk_score"]
+    work_intensity = columns["work_hours_per_day"] * columns["work_days_per_week"] / 35.0
+    
+    respiratory_risk = overall_risk + columns["has_respiratory_conditions"] * 15
+    respiratory_risk += (1 - columns["mask_usage"]) * 10
+    respiratory_risk += chemical_risk_score * 1.5
+    respiratory_risk += np.where(age > 60, 8, np.where(age > 50, 5, 0))
+    
+    skin_risk = overall_risk * 0.9 + columns["has_skin_conditions"] * 20
+    skin_risk += (1 - columns["gloves_usage"]) * 15
+    skin_risk += chemical_risk_score * 1.2
+    
+    neurological_risk = overall_risk * 0.8 + columns["has_neurological_conditions"] * 20
+    neurological_risk += chemical_risk_score * 2
+    neurological_risk += np.where(age > 55, 10, 0)
+    neurological_risk += np.where(work_intensity > 1.2, 8, 0)
+    
+    return {
+        "respiratory_risk": np.clip(respiratory_risk, 0, 100),
+        "skin_risk": np.clip(skin_risk, 0, 100),
+        "neurological_risk": np.clip(neurological_risk, 0, 100),
+    }
+
+def evaluation_metrics(risk_model, X_test, y_test):
+    """
+    Held-out RMSE of a trained model's forest
+    
+    Returns:
+        {"test_rmse": RMSE of the overall risk}, plus "test_rmse_by_output"
+        with the RMSE of every score for a multi-output model
+    """
+    from sklearn.metrics import mean_squared_error
+    
+    predictions = risk_model.forest.predict(X_test[risk_model.feature_names].values)
+    rmse = np.sqrt(mean_squared_error(y_test, predictions, multioutput="raw_values"))
+    metrics = {"test_rmse": float(rmse[0])}
+    if risk_model.multi_output:
+        metrics["test_rmse_by_output"] = {name: float(value) for name, value in zip(RISK_OUTPUTS, rmse)}
+    return metrics
+
+def train_model(data, progress=None, params=None, multi_output=False, registry=None):
+    """
+    Train the model with the provided data
+    
+    Args:
+        data: Survey DataFrame or iterable of DataFrame chunks
+        progress: Optional callback(stage, fraction) reporting training progress
+        params: Optional forest hyperparameters overriding DEFAULT_FOREST_PARAMS
+                (e.g. the best configuration found by app.models.tuning)
+        multi_output: Train one forest predicting every RISK_OUTPUTS score
+                      instead of the overall risk only
+        registry: ModelRegistry to publish to (defaults to the served one)
+        
+    Returns:
+        True once the model is trained and saved
+        
+    Raises:
+        SurveyValidationError: If the data fails validation (nothing is fitted)
+    """
+    if progress is None:
+        progress = lambda stage, fraction: None
+    progress("features", 0.1)
+    risk_model = RiskModel()
+    validation = {}
+    X, y = build_training_data(data, risk_model.encoder, multi_output=multi_output, validation=validation)
+    for warning in validation["warnings"]:
+        print(f"Survey data warning: {warning}")
+    
+    # sklearn is only imported once the data is validated, so bad files are rejected fast
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+    risk_model.model = RandomForestRegressor(**{**DEFAULT_FOREST_PARAMS, **(params or {})})
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+    
+    # Train the model
+    progress("fitting", 0.3)
+    risk_model.fit(X_train, y_train)
+    
+    # Evaluate on the held-out split
+    progress("evaluating", 0.8)
+    metrics = evaluation_metrics(risk_model, X_test, y_test)
+    print(f"Model trained on {len(X_train)} rows, test RMSE {metrics['test_rmse']:.3f} on {len(X_test)} rows")
+    
+    # Register the model as a new version and serve it
+    progress("saving", 0.9)
+    version = publish_model(risk_model, {
+        "rows": {"train": len(X_train), "test": len(X_test)},
+        "metrics": metrics,
+        "validation": validation,
+    }, registry=registry)
+    print(f"Saved model version {version}")
+    
+    return True
+
+def update_model(data, n_trees=MODEL_UPDATE_TREES, max_trees=MAX_FOREST_TREES, progress=None):
+    """
+    Update the saved model incrementally with a new survey batch
+    
+    Trees trained on the new batch only are added to the served forest and
+    registered as a new version with its parent version (see publish_model
+    for what it stores). Without a saved forest, a full training is run
+    instead. Incremental trees only ever see their own batch, so an update
+    whose held-out RMSE drifts more than MAX_INCREMENTAL_RMSE_RATIO above
+    the last full training's is rejected: the model needs a full training.
+    
+    Args:
+        data: New survey batch (DataFrame or iterable of DataFrame chunks)
+        n_trees: Number of trees to train on the batch
+        max_trees: Evict the oldest trees beyond this many (None keeps them all)
+        progress: Optional callback(stage, fraction) reporting training progress
+        
+    Returns:
+        True once the update is trained and saved
+        
+    Raises:
+        SurveyValidationError: If the batch fails validation (nothing is fitted)
+        ValueError: If the updated model drifted too far from the last full training (nothing is saved)
+    """
+    from sklearn.model_selection import train_test_split
+    
+    if progress is None:
+        progress = lambda stage, fraction: None
+    progress("loading model", 0.05)
+    parent = model_registry.current_version()
+    if parent is not None:
+        risk_model = load_model_version(parent, with_estimator=True)
+    else:
+        risk_model = load_or_create_model(with_estimator=True)
+    if risk_model.forest is None:
+        print("No trained model to update, training a full model instead")
+        return train_model(data, progress=progress)
+    
+    progress("features", 0.1)
+    validation = {}
+    X, y = build_training_data(
+        data, risk_model.encoder, multi_output=risk_model.multi_output, validation=validation
+    )
+    for warning in validation["warnings"]:
+        print(f"Survey data warning: {warning}")
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+    
+    # Add the new trees
+    progress("fitting", 0.3)
+    update = risk_model.add_trees(X_train, y_train, n_trees=n_trees, max_trees=max_trees)
+    
+    # Evaluate the updated forest on the batch's held-out split
+    progress("evaluating", 0.8)
+    metrics = evaluation_metrics(risk_model, X_test, y_test)
+    print(
+        f"Added {len(update['estimators'])} trees trained on {len(X_train)} rows "
+        f"(evicted {update['evicted']}, {risk_model.forest.n_trees} in total), "
+        f"test RMSE {metrics['test_rmse']:.3f} on {len(X_test)} rows"
+    )
+    
+    # Compare with the full training the forest was grown from
+    base = parent and (model_registry.metadata(parent).get("base_version") or parent)
+    base_rmse = base and model_registry.metadata(base).get("metrics", {}).get("test_rmse")
+    if base_rmse:
+        metrics["rmse_ratio_to_base"] = metrics["test_rmse"] / base_rmse
+        if metrics["rmse_ratio_to_base"] > MAX_INCREMENTAL_RMSE_RATIO:
+            raise ValueError(
+                f"Incremental update rejected: test RMSE {metrics['test_rmse']:.3f} is "
+                f"{metrics['rmse_ratio_to_base']:.1f}x that of the last full training ({base_rmse:.3f}), "
+                f"above MAX_INCREMENTAL_RMSE_RATIO ({MAX_INCREMENTAL_RMSE_RATIO}); run a full training"
+            )
+    
+    # Register the new version
+    progress("saving", 0.9)
+    version = publish_model(risk_model, {
+        "rows": {"train": len(X_train), "test": len(X_test)},
+        "metrics": metrics,
+        "validation": validation,
+        "update": {"added_trees": len(update["estimators"]), "evicted_trees": update["evicted"]},
+    }, update=update, parent=parent)
+    print(f"Saved model version {version}")
+    
+    return True
@@ -0,0 +1,145 @@
+import operator
+import numpy as np
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+# Comparison operators usable in rule conditions
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Risk factor rules, in output order: (key, condition, text).
+# A condition is (column, operator, value); text may use the template parameters.
+RISK_FACTOR_RULES = [
+    ("age_over_50", ("age", ">", 50), "Âge supérieur à 50 ans ({age} ans)"),
+    ("long_work_hours", ("hours_per_week", ">", 40), "Temps de travail élevé ({hours_per_week} heures par semaine)"),
+    ("low_protection", ("protection_score", "<", 5), "Utilisation insuffisante d'équipement de protection"),
+    ("high_chemical_exposure", ("chemical_risk_score", ">", 5), "Exposition élevée à des produits chimiques"),
+    ("respiratory_conditions", ("has_respiratory_conditions", "!=", 0), "Présence de troubles respiratoires préexistants"),
+    ("skin_conditions", ("has_skin_conditions", "!=", 0), "Antécédents de problèmes cutanés"),
+    ("chronic_exposure", ("has_chronic_exposure", "!=", 0), "Exposition chronique aux produits agricoles"),
+    ("low_socio_economic_status", ("socio_economic_status", "==", 0), "Niveau socio-économique bas (accès limité aux ressources)"),  # 'bas'
+    ("seasonal_employment", ("employment_status", "==", 0), "Statut d'emploi saisonnier (conditions de travail moins stables)"),  # 'saisonnière'
+]
+
+# Reported only when no other risk factor applies
+FALLBACK_RISK_FACTOR = ("agricultural_risk_combination", ("overall_risk", ">", 30), "Combinaison de facteurs de risque agricoles")
+
+# Recommendation rules, in output order: (key, condition, text); a None condition always applies
+RECOMMENDATION_RULES = [
+    ("wear_protection", ("protection_score", "<", 5), "Utiliser plus régulièrement des équipements de protection, particulièrement un masque et des gants"),
+    ("limit_chemical_exposure", ("chemical_risk_score", ">", 5), "Limiter l'exposition aux produits chimiques en suivant les instructions d'utilisation et en portant un équipement de protection approprié"),
+    ("reduce_work_hours", ("hours_per_week", ">", 40), "Réduire les heures de travail hebdomadaires (actuellement {hours_per_week}h) pour limiter la fatigue et l'exposition"),
+    ("respiratory_follow_up", ("has_respiratory_conditions", "!=", 0), "Consulter régulièrement un médecin pour le suivi des troubles respiratoires"),
+    ("respiratory_mask", ("has_respiratory_conditions", "!=", 0), "Porter un masque de protection respiratoire adapté lors de l'utilisation de produits chimiques"),
+    ("skin_gloves", ("has_skin_conditions", "!=", 0), "Utiliser des gants de protection pour éviter le contact direct avec les produits chimiques"),
+    ("skin_washing", ("has_skin_conditions", "!=", 0), "Se laver soigneusement les mains et la peau exposée après le travail"),
+    ("frequent_breaks", ("age", ">", 55), "Prévoir des pauses plus fréquentes pendant le travail"),
+    ("avoid_heavy_tasks", ("age", ">", 55), "Éviter les tâches nécessitant des efforts physiques intenses"),
+    ("equipment_assistance", ("socio_economic_status", "==", 0), "Se renseigner sur les programmes d'aide pour l'achat d'équipement de protection"),  # 'bas'
+    ("hydration", None, "Maintenir une bonne hydratation pendant le travail, surtout par temps chaud"),
+]
+
+# Recommendations returned per prediction
+MAX_RECOMMENDATIONS = 5
+
+
+class RuleMatches(NamedTuple):
+    risk_factors: np.ndarray  # int64 bitmask per row, bit i = RISK_FACTOR_RULES[i] (last bit = fallback)
+    recommendations: np.ndarray  # int64 bitmask per row, already limited to the first MAX_RECOMMENDATIONS
+    parameters: Dict[str, np.ndarray]  # template parameters per row
+
+
+class RuleEngine:
+    """
+    Risk factor and recommendation rules compiled into vectorized predicates
+
+    evaluate() turns encoded feature columns into one bitmask per row for the
+    risk factors and one for the recommendations; the French texts are only
+    built by materialise(), when a row is serialised.
+    """
+
+    def __init__(self, factor_rules: Sequence[Tuple] = RISK_FACTOR_RULES, fallback_rule: Tuple = FALLBACK_RISK_FACTOR,
+                 recommendation_rules: Sequence[Tuple] = RECOMMENDATION_RULES,
+                 max_recommendations: int = MAX_RECOMMENDATIONS):
+        self.factor_rules = list(factor_rules) + [fallback_rule]
+        self.recommendation_rules = list(recommendation_rules)
+        self.max_recommendations = max_recommendations
+        self.factor_keys = [key for key, condition, text in self.factor_rules]
+        self.recommendation_keys = [key for key, condition, text in self.recommendation_rules]
+
+        # Rules sharing a condition share one evaluated predicate
+        conditions = [condition for key, condition, text in self.factor_rules + self.recommendation_rules]
+        self._conditions = list(dict.fromkeys(condition for condition in conditions if condition is not None))
+        self._factor_conditions = [self._conditions.index(condition) for key, condition, text in self.factor_rules]
+        self._recommendation_conditions = [
+            None if condition is None else self._conditions.index(condition)
+            for key, condition, text in self.recommendation_rules
+        ]
+        self._factor_texts = [text for key, condition, text in self.factor_rules]
+        self._recommendation_texts = [text for key, condition, text in self.recommendation_rules]
+
+    @staticmethod
+    def template_parameters(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Per-row values the rule conditions and texts refer to besides the encoded columns"""
+        return {
+            "age": np.asarray(columns["age"], dtype=np.float64),
+            "hours_per_week": (
+                np.asarray(columns["work_hours_per_day"], dtype=np.float64) *
+                np.asarray(columns["work_days_per_week"], dtype=np.float64)
+            ),
+        }
+
+    def evaluate(self, columns: Dict[str, np.ndarray], overall_risk: np.ndarray) -> RuleMatches:
+        """
+        Evaluate every rule on encoded feature columns
+
+        Args:
+            columns: Encoded feature columns (FeatureEncoder.column_view)
+            overall_risk: Overall risk score per row
+
+        Returns:
+            RuleMatches with the risk factor and recommendation bitmasks
+        """
+        parameters = self.template_parameters(columns)
+        values = {**columns, **parameters, "overall_risk": np.asarray(overall_risk)}
+        n_rows = len(values["overall_risk"])
+        predicates = [
+            np.broadcast_to(OPERATORS[op](values[column], threshold), (n_rows,))
+            for column, op, threshold in self._conditions
+        ]
+
+        # Every rule but the fallback, which only applies when none of them did
+        factors = np.zeros(n_rows, dtype=np.int64)
+        for bit, condition in enumerate(self._factor_conditions[:-1]):
+            factors |= predicates[condition].astype(np.int64) << bit
+        fallback = (factors == 0) & predicates[self._factor_conditions[-1]]
+        factors |= fallback.astype(np.int64) << (len(self._factor_conditions) - 1)
+
+        # Recommendations, keeping only the first max_recommendations that apply
+        recommendations = np.zeros(n_rows, dtype=np.int64)
+        selected = np.zeros(n_rows, dtype=np.int64)
+        for bit, condition in enumerate(self._recommendation_conditions):
+            applies = np.ones(n_rows, dtype=bool) if condition is None else predicates[condition]
+            applies = applies & (selected < self.max_recommendations)
+            recommendations |= applies.astype(np.int64) << bit
+            selected += applies
+
+        return RuleMatches(factors, recommendations, parameters)
+
+    def materialise(self, matches: RuleMatches, row: int = 0) -> Dict[str, List[str]]:
+        """Build the risk factor and recommendation texts of one evaluated row"""
+        parameters = {name: float(values[row]) for name, values in matches.parameters.items()}
+        return {
+            "risk_factors": self._texts(self._factor_texts, int(matches.risk_factors[row]), parameters),
+            "recommendations": self._texts(self._recommendation_texts, int(matches.recommendations[row]), parameters),
+        }
+
+    @staticmethod
+    def _texts(texts: List[str], mask: int, parameters: Dict[str, float]) -> List[str]:
+        """Texts of the set bits of a bitmask, in rule order"""
+        return [text.format(**parameters) for bit, text in enumerate(texts) if mask >> bit & 1]
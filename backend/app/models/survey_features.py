@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from app.models.feature_encoder import USAGE_LEVELS
+
+# Survey columns copied directly onto RiskModel features
+SURVEY_FEATURE_COLUMNS = {
+    "Age": "age",
+    "Ancienneté agricole": "work_experience",
+    "H travail / jour": "work_hours_per_day",
+    "J travail / Sem": "work_days_per_week",
+    "Nb enfants": "number_of_children",
+    "Situation maritale": "marital_status",
+    "Niveau socio-économique": "socio_economic_status",
+    "Statut": "employment_status",
+}
+
+# Survey equipment-usage columns (jamais/parfois/souvent/toujours) and the usage input each one feeds
+SURVEY_EQUIPMENT_COLUMNS = {
+    "Masque pour pesticides": "mask_usage",
+    "Gants": "gloves_usage",
+    "Bottes": "boots_usage",
+    "Casquette/Mdhalla": "cap_usage",
+    "Manteau imperméable": "coat_usage",
+}
+
+# Survey health columns (free text describing the condition)
+SURVEY_CONDITION_COLUMNS = {
+    "Troubles cardio-respiratoires": "has_respiratory_conditions",
+    "Troubles cutanés/phanères": "has_skin_conditions",
+    "Troubles neurologiques": "has_neurological_conditions",
+}
+
+# Survey column listing the chemicals used
+SURVEY_CHEMICAL_COLUMN = "Produits chimiques utilisés"
+
+# Every survey column survey_to_features reads (file readers can skip the others)
+SURVEY_INPUT_COLUMNS = (
+    list(SURVEY_FEATURE_COLUMNS) + list(SURVEY_EQUIPMENT_COLUMNS) +
+    [SURVEY_CHEMICAL_COLUMN] + list(SURVEY_CONDITION_COLUMNS)
+)
+
+# Health answers meaning no condition was reported
+NO_CONDITION_VALUES = ["", "non spécifié", "non", "aucun"]
+
+# Chemical answer meaning no chemical is used
+NO_CHEMICAL = "aucun produit chimique"
+
+
+def _normalised_text(values: pd.Series) -> pd.Series:
+    """Stripped, lower-cased strings with missing values as empty strings (normalised once per distinct value)"""
+    codes, uniques = pd.factorize(values)
+    normalised = np.array([str(value).strip().lower() for value in uniques] + [""], dtype=object)
+    return pd.Series(normalised[codes], index=values.index)
+
+
+def survey_to_features(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Map survey columns onto RiskModel features with column-wise operations
+
+    This is the single feature definition for survey data: train_model and
+    the cohort scoring both pass its output through FeatureEncoder.encode_frame,
+    the same encoder that serves the API.
+
+    Args:
+        data: Survey DataFrame (e.g. fixed_female_farmers_data.xlsx)
+
+    Returns:
+        DataFrame with one RiskModel feature per column; survey columns that
+        are absent are left out, so the encoder defaults apply
+    """
+    features = pd.DataFrame(index=data.index)
+
+    for column, feature in SURVEY_FEATURE_COLUMNS.items():
+        if column in data:
+            features[feature] = data[column]
+
+    # Usage levels are mapped by the encoder; the count covers equipment worn at all
+    worn_levels = [level for level, share in USAGE_LEVELS.items() if share > 0]
+    equipment_count = pd.Series(0, index=data.index)
+    for column, feature in SURVEY_EQUIPMENT_COLUMNS.items():
+        if column in data:
+            levels = _normalised_text(data[column])
+            features[feature] = levels
+            equipment_count += levels.isin(worn_levels).to_numpy()
+    features["protective_equipment_count"] = equipment_count
+
+    if SURVEY_CHEMICAL_COLUMN in data:
+        chemicals = _normalised_text(data[SURVEY_CHEMICAL_COLUMN])
+        chemicals = chemicals.mask(chemicals == NO_CHEMICAL, "")
+        features["chemical_exposure"] = chemicals
+        features["chemical_exposure_count"] = chemicals.str.count(",") + chemicals.ne("")
+
+    for column, feature in SURVEY_CONDITION_COLUMNS.items():
+        if column in data:
+            features[feature] = (~_normalised_text(data[column]).isin(NO_CONDITION_VALUES)).astype(int)
+
+    return features
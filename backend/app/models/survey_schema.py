@@ -0,0 +1,184 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.models.survey_features import SURVEY_INPUT_COLUMNS
+
+# Encoding codebook describing the survey columns (types, category mappings, observed ranges)
+CODEBOOK_FILE = os.environ.get("SURVEY_CODEBOOK_FILE", os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir,
+    "1.cleaning_process", "2.Encoding", "female_farmers_codebook.json"
+)))
+
+# Columns the training target is built from; a file without them is rejected
+REQUIRED_SURVEY_COLUMNS = ["Age", "Ancienneté agricole", "H travail / jour", "J travail / Sem"]
+
+# Values outside these bounds are impossible answers and reject the file; values
+# outside the (narrower) range the codebook observed are only reported
+VALUE_BOUNDS = {
+    "Age": (10, 100),
+    "Ancienneté agricole": (0, 90),
+    "H travail / jour": (0, 24),
+    "J travail / Sem": (0, 7),
+    "Nb enfants": (0, 30),
+}
+
+# Share of missing answers in a required column above which the file is rejected
+MAX_MISSING_SHARE = float(os.environ.get("SURVEY_MAX_MISSING_SHARE", 0.5))
+
+# Offending values quoted per problem in a validation report
+REPORTED_EXAMPLES = 5
+
+
+class SurveyValidationError(ValueError):
+    """A survey file failed validation; report holds every error and warning found"""
+
+    def __init__(self, report: Dict[str, Any]):
+        super().__init__("Invalid survey data: " + "; ".join(report["errors"]))
+        self.report = report
+
+
+def load_codebook(path: str = CODEBOOK_FILE) -> Dict:
+    """Load the encoding codebook"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class SurveySchema:
+    """
+    Expected type, category domain and range of each survey column read for training
+
+    Built from the codebook's column types, encoding mappings and column
+    descriptions. Checks run column by column with vectorized numpy
+    operations, and categories are normalised once per distinct value, so
+    validating a chunk costs milliseconds even at 100k rows.
+    """
+
+    def __init__(self, codebook: Dict, required: List[str] = REQUIRED_SURVEY_COLUMNS):
+        self.required = list(required)
+        mappings = codebook.get("encoding_mappings", {})
+        self.columns = {}
+        for column in SURVEY_INPUT_COLUMNS:
+            column_type = codebook.get("column_types", {}).get(column)
+            description = codebook.get("column_descriptions", {}).get(column, {})
+            if column_type == "numerical" or column in VALUE_BOUNDS:
+                self.columns[column] = {
+                    "kind": "numerical",
+                    "observed": (description.get("min"), description.get("max")),
+                }
+            elif column_type == "ordinal_equipment":
+                self.columns[column] = {"kind": "categorical", "domain": list(mappings["ordinal_equipment"])}
+            elif column_type == "ordinal_categorical" and column in mappings.get("ordinal_categorical", {}):
+                self.columns[column] = {"kind": "categorical", "domain": list(mappings["ordinal_categorical"][column])}
+            else:
+                # Free-text answers (chemicals, health conditions) are only checked for presence
+                self.columns[column] = {"kind": "text"}
+
+    def validate(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Check column presence, dtype, category domains and value ranges
+
+        Args:
+            data: Survey DataFrame (or one chunk of it)
+
+        Returns:
+            Dict with rows, errors (problems that reject the data) and warnings
+        (reported only; worded without counts so chunks can be merged)
+        """
+        errors, warnings = [], []
+
+        missing = [column for column in self.required if column not in data]
+        if missing:
+            errors.append(f"missing required columns: {', '.join(missing)}")
+        absent = [column for column in self.columns if column not in data and column not in self.required]
+        if absent:
+            warnings.append(f"missing columns (encoder defaults used): {', '.join(absent)}")
+
+        for column, spec in self.columns.items():
+            if column not in data or spec["kind"] == "text":
+                continue
+            values = data[column]
+            if spec["kind"] == "numerical":
+                self._check_numerical(column, values, spec, errors, warnings)
+            else:
+                self._check_categorical(column, values, spec, errors)
+
+        return {"rows": len(data), "errors": errors, "warnings": warnings}
+
+    def _check_numerical(self, column, values, spec, errors, warnings):
+        """Dtype, missing share, hard bounds and codebook range of a numerical column"""
+        numbers = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors="coerce")
+        invalid = numbers.isna() & values.notna()
+        if invalid.any():
+            errors.append(f"{column}: {int(invalid.sum())} non-numeric values (e.g. {_examples(values[invalid])})")
+
+        missing_share = float(values.isna().mean()) if len(values) else 0.0
+        if column in self.required and missing_share > MAX_MISSING_SHARE:
+            errors.append(f"{column}: {missing_share:.0%} of the values are missing")
+
+        numbers = numbers.to_numpy(dtype=np.float64, na_value=np.nan)
+        if column in VALUE_BOUNDS:
+            low, high = VALUE_BOUNDS[column]
+            out_of_bounds = (numbers < low) | (numbers > high)
+            if out_of_bounds.any():
+                errors.append(
+                    f"{column}: {int(out_of_bounds.sum())} values outside [{low}, {high}] "
+                    f"(e.g. {_examples(pd.Series(numbers[out_of_bounds]))})"
+                )
+        low, high = spec["observed"]
+        if low is not None and high is not None:
+            unusual = (numbers < low) | (numbers > high)
+            if unusual.any():
+                warnings.append(f"{column}: values outside the surveyed range [{low:g}, {high:g}]")
+
+    def _check_categorical(self, column, values, spec, errors):
+        """Category domain of an ordinal column (compared like survey_to_features reads it)"""
+        # Only distinct values are normalised and checked; missing answers (code -1) are allowed
+        codes, uniques = pd.factorize(values)
+        allowed = set(spec["domain"]) | {""}
+        invalid_uniques = np.array([str(value).strip().lower() not in allowed for value in uniques] + [False])
+        invalid = invalid_uniques[codes]
+        if invalid.any():
+            errors.append(
+                f"{column}: {int(invalid.sum())} values outside {{{', '.join(spec['domain'])}}} "
+                f"(e.g. {_examples(values[invalid])})"
+            )
+
+
+def _examples(values: pd.Series) -> str:
+    """A few distinct offending values, for error messages"""
+    examples = pd.unique(values)[:REPORTED_EXAMPLES]
+    return ", ".join(repr(value.item() if isinstance(value, np.generic) else value) for value in examples)
+
+
+@lru_cache(maxsize=1)
+def default_schema() -> SurveySchema:
+    """Schema from CODEBOOK_FILE (required columns and VALUE_BOUNDS only when the codebook is not deployed)"""
+    if not os.path.exists(CODEBOOK_FILE):
+        print(f"Survey codebook not found at {CODEBOOK_FILE}, category domains are not validated")
+        return SurveySchema({})
+    return SurveySchema(load_codebook())
+
+
+def validate_survey(data: pd.DataFrame, schema: Optional[SurveySchema] = None) -> Dict[str, Any]:
+    """
+    Validate survey data before any feature building or fitting
+
+    Args:
+        data: Survey DataFrame (or one chunk of it)
+        schema: Schema to check against (defaults to the codebook's)
+
+    Returns:
+        The validation report (see SurveySchema.validate)
+
+    Raises:
+        SurveyValidationError: If the report has errors
+    """
+    schema = schema if schema is not None else default_schema()
+    report = schema.validate(data)
+    if report["errors"]:
+        raise SurveyValidationError(report)
+    return report
@@ -0,0 +1,164 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, NamedTuple, Optional
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+from sklearn.preprocessing import StandardScaler
+
+from app.models.forest_kernel import FlatForest, path_table_nbytes
+from app.models.risk_prediction import DEFAULT_FOREST_PARAMS, MAX_PATH_TABLE_MB, build_training_data
+
+# Forest hyperparameters searched by default (exhaustively, or sampled with n_iter). Depth is
+# bounded: the path tables used for serving grow with the node count (see MAX_PATH_TABLE_MB)
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [6, 10, 16],
+    "min_samples_leaf": [1, 5],
+    "max_features": [1.0, 0.5],
+}
+
+# Single-row predictions timed per candidate and fold (the median is reported)
+LATENCY_REPEATS = 50
+
+# Depth assumed for unbounded trees when estimating a candidate's cost
+UNBOUNDED_DEPTH_COST = 20
+
+
+class Fold(NamedTuple):
+    X_train: np.ndarray  # scaled training rows
+    y_train: np.ndarray
+    X_val: np.ndarray  # raw validation rows (scaled by the flattened forest, as when serving)
+    y_val: np.ndarray
+    scaler: StandardScaler
+
+
+def candidate_params(param_grid: Optional[Dict[str, List]] = None, n_iter: Optional[int] = None,
+                     seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Forest configurations to evaluate
+
+    Args:
+        param_grid: Values to search per hyperparameter (DEFAULT_PARAM_GRID by default)
+        n_iter: Sample this many configurations at random instead of the full grid
+        seed: Seed of the random search
+
+    Returns:
+        List of parameter dicts, each completed with DEFAULT_FOREST_PARAMS
+    """
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    if n_iter is not None and n_iter < len(ParameterGrid(param_grid)):
+        candidates = ParameterSampler(param_grid, n_iter=n_iter, random_state=seed)
+    else:
+        candidates = ParameterGrid(param_grid)
+    return [{**DEFAULT_FOREST_PARAMS, **params} for params in candidates]
+
+
+def make_folds(X: np.ndarray, y: np.ndarray, n_folds: int = 5, seed: int = 0) -> List[Fold]:
+    """Split and scale the data once; every candidate is then evaluated on the same folds"""
+    folds = []
+    for train_index, val_index in KFold(n_splits=n_folds, shuffle=True, random_state=seed).split(X):
+        scaler = StandardScaler().fit(X[train_index])
+        folds.append(Fold(
+            np.ascontiguousarray(scaler.transform(X[train_index])),
+            y[train_index],
+            X[val_index],
+            y[val_index],
+            scaler
+        ))
+    return folds
+
+
+def estimated_cost(params: Dict[str, Any]) -> float:
+    """Relative fit cost of a configuration (trees x depth x share of features tried per split)"""
+    depth = params.get("max_depth") or UNBOUNDED_DEPTH_COST
+    max_features = params.get("max_features", 1.0)
+    share = max_features if isinstance(max_features, float) else 1.0
+    return params.get("n_estimators", 100) * depth * share / params.get("min_samples_leaf", 1) ** 0.5
+
+
+def evaluate_candidate(params: Dict[str, Any], fold: Fold) -> Dict[str, float]:
+    """
+    Fit one configuration on one fold
+
+    Returns:
+        Dict with the validation rmse, fit_time_s and the median single-row
+        predict_latency_ms of the flattened forest used for serving (infinite
+        rmse and latency for forests too large to serve, see MAX_PATH_TABLE_MB)
+    """
+    # One core per fit: the parallelism comes from running candidates and folds side by side
+    model = RandomForestRegressor(**{**params, "n_jobs": 1})
+    start = time.perf_counter()
+    model.fit(fold.X_train, fold.y_train)
+    fit_time = time.perf_counter() - start
+
+    if path_table_nbytes(model) / 2**20 > MAX_PATH_TABLE_MB:
+        return {"rmse": float("inf"), "fit_time_s": fit_time, "predict_latency_ms": float("inf")}
+
+    forest = FlatForest(model, fold.scaler)
+    rmse = float(np.sqrt(np.mean((forest.predict(fold.X_val) - fold.y_val) ** 2)))
+
+    row = fold.X_val[:1]
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        forest.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    return {"rmse": rmse, "fit_time_s": fit_time, "predict_latency_ms": float(np.median(timings)) * 1000}
+
+
+def tune(data: pd.DataFrame, param_grid: Optional[Dict[str, List]] = None, n_iter: Optional[int] = None,
+         n_folds: int = 5, n_jobs: int = -1, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Cross-validated search over forest configurations
+
+    Every (candidate, fold) pair is one task on a process pool. Each forest is
+    fitted on a single core, so the pool never runs more fits than there are
+    workers, and tasks are dispatched most expensive first so the largest
+    forests do not end up running alone at the end of the search. The folds are
+    built once and shared by all tasks (joblib memory-maps large arrays).
+
+    Args:
+        data: Survey DataFrame
+        param_grid: Values to search per hyperparameter (DEFAULT_PARAM_GRID by default)
+        n_iter: Number of randomly sampled configurations (None = full grid)
+        n_folds: Number of cross-validation folds
+        n_jobs: Worker processes (-1 = all cores)
+        seed: Seed of the folds and of the random search
+
+    Returns:
+        Leaderboard sorted by mean RMSE: rank, params, rmse_mean, rmse_std,
+        fit_time_s and predict_latency_ms (means over the folds)
+    """
+    X, y = build_training_data(data)
+    folds = make_folds(X.values, y.to_numpy(dtype=np.float64), n_folds=n_folds, seed=seed)
+    candidates = candidate_params(param_grid, n_iter=n_iter, seed=seed)
+
+    tasks = [(i, k) for i in range(len(candidates)) for k in range(len(folds))]
+    tasks.sort(key=lambda task: estimated_cost(candidates[task[0]]), reverse=True)
+
+    n_jobs = min(effective_n_jobs(n_jobs), len(tasks))
+    results = Parallel(n_jobs=n_jobs, batch_size=1, pre_dispatch="n_jobs")(
+        delayed(evaluate_candidate)(candidates[i], folds[k]) for i, k in tasks
+    )
+
+    per_candidate = [[] for _ in candidates]
+    for (i, k), result in zip(tasks, results):
+        per_candidate[i].append(result)
+
+    leaderboard = []
+    for params, scores in zip(candidates, per_candidate):
+        rmse = np.array([score["rmse"] for score in scores])
+        leaderboard.append({
+            "params": params,
+            "rmse_mean": float(rmse.mean()),
+            "rmse_std": float(rmse.std()),
+            "fit_time_s": float(np.mean([score["fit_time_s"] for score in scores])),
+            "predict_latency_ms": float(np.mean([score["predict_latency_ms"] for score in scores])),
+        })
+    leaderboard.sort(key=lambda entry: (entry["rmse_mean"], entry["predict_latency_ms"]))
+    for rank, entry in enumerate(leaderboard, start=1):
+        entry["rank"] = rank
+    return leaderboard
@@ -0,0 +1,159 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# Workers per pool (threads or processes)
+COMPUTE_WORKERS = int(os.environ.get("COMPUTE_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Calls allowed to wait for a free worker before new ones are rejected with 503
+COMPUTE_QUEUE_SIZE = int(os.environ.get("COMPUTE_QUEUE_SIZE", 64))
+
+# Executor for text analysis: "thread" or "process" (model scoring always uses threads,
+# as the served model lives in this process)
+COMPUTE_EXECUTOR = os.environ.get("COMPUTE_EXECUTOR", "thread")
+
+# Recent calls the wait and service time percentiles are computed over
+STATS_WINDOW = 1024
+
+
+class ComputePoolFull(Exception):
+    """A compute pool's queue is full; retry_after is the suggested wait in seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Compute queue full, retry after {retry_after} s")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Run fn in a worker and return (start, end, result), timed on the system-wide monotonic clock"""
+    start = time.monotonic()
+    result = fn(*args, **kwargs)
+    return start, time.monotonic(), result
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted durations, in ms"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3
+
+
+class ComputePool:
+    """
+    Bounded executor for the CPU-bound part of request handlers
+
+    Handlers await run() instead of calling model or text code on the event
+    loop, so one slow call no longer stalls every other request. At most
+    max_workers calls run at once and max_queue more may wait; beyond that,
+    run() raises ComputePoolFull straight away, with a Retry-After estimate
+    from the recent service time, instead of letting the queue (and the
+    tail latency) grow without bound.
+    """
+
+    def __init__(self, name: str, max_workers: int = COMPUTE_WORKERS, max_queue: int = COMPUTE_QUEUE_SIZE,
+                 kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._failed = 0
+        self._waits = deque(maxlen=STATS_WINDOW)
+        self._service_times = deque(maxlen=STATS_WINDOW)
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on a worker and return its result
+
+        With a process executor, fn and its arguments must be picklable.
+
+        Raises:
+            ComputePoolFull: If max_workers calls are running and max_queue are waiting
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ComputePoolFull(self._retry_after())
+            executor = self._ensure_executor()
+            self._in_flight += 1
+            self._submitted += 1
+        submitted_at = time.monotonic()
+        try:
+            future = executor.submit(_timed_call, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+        # Accounted when the worker finishes, even if the awaiting request was cancelled
+        def finished(future):
+            with self._lock:
+                self._in_flight -= 1
+                if future.cancelled() or future.exception() is not None:
+                    self._failed += 1
+                    return
+                start, end, _ = future.result()
+                self._waits.append(max(0.0, start - submitted_at))
+                self._service_times.append(end - start)
+
+        future.add_done_callback(finished)
+        _, _, result = await asyncio.wrap_future(future)
+        return result
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained (at least 1)"""
+        service_time = sum(self._service_times) / len(self._service_times) if self._service_times else 0.0
+        return max(1, math.ceil(self._in_flight * service_time / self.max_workers))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, running calls, counters and recent wait/service time percentiles (ms)"""
+        with self._lock:
+            waits = sorted(self._waits)
+            service_times = sorted(self._service_times)
+            in_flight = self._in_flight
+            stats = {
+                "executor": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": min(in_flight, self.max_workers),
+                "queue_depth": max(0, in_flight - self.max_workers),
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "failed": self._failed,
+            }
+        for label, values in (("wait_ms", waits), ("service_ms", service_times)):
+            stats[label] = {
+                "p50": _percentile(values, 0.5),
+                "p99": _percentile(values, 0.99),
+                "max": values[-1] * 1e3 if values else None,
+            }
+        return stats
+
+    def shutdown(self):
+        """Stop the workers (waiting calls are cancelled)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,27 @@
+import json
+from typing import Any, Dict, Optional
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder is slower but produces the same JSON
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """JSON bytes of value, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def prediction_response(result: Dict[str, Any], percentile_in_cohort: Optional[float] = None) -> Response:
+    """
+    JSON response for a RiskModel.predict result
+
+    The model output always has the RiskScoreResponse shape (fields in the
+    same order), so it is dumped as it is instead of being validated against
+    the response model again.
+    """
+    return Response(content=dumps({**result, "percentile_in_cohort": percentile_in_cohort}), media_type="application/json")
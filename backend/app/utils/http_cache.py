@@ -0,0 +1,67 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from urllib.parse import urlencode
+
+from pydantic import BaseModel
+
+from app.models.list_items import normalise_items
+from app.utils.prediction_cache import feature_key
+
+
+def parse_query(model: Type[BaseModel], query_params, list_fields: Iterable[str]) -> BaseModel:
+    """
+    Build a model from query parameters
+
+    List fields may be repeated (?tasks=a&tasks=b), comma-separated
+    (?tasks=a,b) or both; empty items are dropped.
+
+    Raises:
+        pydantic.ValidationError: If the parameters do not fit the model
+    """
+    list_fields = set(list_fields)
+    fields: Dict[str, Any] = {}
+    for name in model.model_fields:
+        if name in list_fields:
+            values = query_params.getlist(name)
+            if values:
+                fields[name] = [item.strip() for value in values for item in value.split(",") if item.strip()]
+        elif name in query_params:
+            fields[name] = query_params[name]
+    return model.model_validate(fields)
+
+
+def canonical_query(data: BaseModel, list_fields: Iterable[str]) -> str:
+    """
+    Canonical query string of a model: parameters sorted by name, list items
+    normalised like the encoder does (stripped, lower-cased, repeats dropped),
+    sorted and comma-joined, and optional fields left at their default omitted
+
+    Requests for the same input then share one URL, so caches in front of the
+    API store each input once.
+    """
+    list_fields = set(list_fields)
+    params: List[Tuple[str, str]] = []
+    for name, field in type(data).model_fields.items():
+        value = getattr(data, name)
+        if not field.is_required() and value == field.default:
+            continue
+        if name in list_fields:
+            value = ",".join(sorted(normalise_items(value or [])))
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        params.append((name, str(value)))
+    return urlencode(sorted(params), safe=",")
+
+
+def strong_etag(*parts: bytes) -> str:
+    """Strong entity tag for a response fully determined by the given byte strings"""
+    return '"' + feature_key(b"\0".join(parts)).hex() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
@@ -0,0 +1,275 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Request latency buckets (seconds)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Internal stage buckets (seconds): stages of one prediction take microseconds to milliseconds
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 1.0)
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        # Buckets are inclusive upper bounds; the last slot is +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class _Metric(ABC):
+    """A metric family: one child per combination of label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self):
+        """Holder of the values of one combination of label values"""
+
+    def labels(self, *values: str):
+        """Child for the given label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for values, child in self._items():
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for values, child in self._items():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {repr(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by method, route and status code", ("method", "endpoint", "status")
+))
+HTTP_ERRORS = REGISTRY.register(Counter(
+    "http_request_errors_total", "HTTP requests that failed with a 5xx status or an unhandled exception",
+    ("method", "endpoint")
+))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route", ("method", "endpoint")
+))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "stage_duration_seconds", "Time spent in internal stages of prediction and text extraction",
+    ("component", "stage"), buckets=STAGE_BUCKETS
+))
+
+
+# Per-thread list set by collect_stages: stage timings go there instead of STAGE_LATENCY
+_collector = threading.local()
+
+
+class stage_timer:
+    """
+    Context manager timing a stage into stage_duration_seconds{component, stage}
+
+    Cheap enough to wrap each stage of a single prediction (two clock reads
+    and one bucket increment).
+    """
+
+    __slots__ = ("component", "stage", "start")
+
+    def __init__(self, component: str, stage: str):
+        self.component = component
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        collected = getattr(_collector, "stages", None)
+        if collected is not None:
+            collected.append((self.component, self.stage, elapsed))
+        else:
+            STAGE_LATENCY.labels(self.component, self.stage).observe(elapsed)
+        return False
+
+
+def collect_stages(fn: Callable, *args, **kwargs) -> Tuple[Any, List[Tuple[str, str, float]]]:
+    """
+    Run fn and return (result, stage timings recorded while it ran)
+
+    For work run in another process (a process compute pool), whose metrics
+    would otherwise stay there: the caller passes the timings to
+    record_stages in the serving process.
+    """
+    previous = getattr(_collector, "stages", None)
+    _collector.stages = []
+    try:
+        result = fn(*args, **kwargs)
+        return result, _collector.stages
+    finally:
+        _collector.stages = previous
+
+
+def record_stages(stages: List[Tuple[str, str, float]]):
+    """Add stage timings returned by collect_stages to stage_duration_seconds"""
+    for component, stage, elapsed in stages:
+        STAGE_LATENCY.labels(component, stage).observe(elapsed)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and errors and timing them per route
+
+    Requests are labelled with the route template (e.g. /training_jobs/{job_id}),
+    not the raw path, so the number of series stays bounded; requests that
+    match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_LATENCY.labels(method, endpoint).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, endpoint, str(status)).inc()
+            if status >= 500:
+                HTTP_ERRORS.labels(method, endpoint).inc()
+
+
+def metrics_response(registry: Optional[MetricsRegistry] = None):
+    """Response with the registry's metrics in the text exposition format"""
+    # Imported here: the stage timers are also loaded by text-analysis worker processes
+    from fastapi.responses import Response
+
+    return Response(content=(registry or REGISTRY).render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,107 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+# Longest time the first request of a batch waits for others to join it
+PREDICT_BATCH_WINDOW_MS = float(os.environ.get("PREDICT_BATCH_WINDOW_MS", 2))
+
+# Requests coalesced into one batch at most (a full batch is dispatched right away)
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", 64))
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls
+
+    submit() parks the caller on a future. The first item of a batch starts
+    a max_wait timer; the batch is dispatched when the timer fires or when
+    it reaches max_size items, whichever comes first. run_batch(key, items)
+    gets every item submitted under the same key (e.g. the model serving the
+    requests) and returns one result per item, which is handed back to each
+    caller. If it raises, the items of the batch are run again one by one, so
+    only the callers whose item fails get an exception. Everything runs on
+    the event loop, so no locking is needed.
+    """
+
+    def __init__(self, run_batch: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+                 max_size: int = PREDICT_BATCH_MAX_SIZE, max_wait: float = PREDICT_BATCH_WINDOW_MS / 1000):
+        self.run_batch = run_batch
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Queue an item for the next batch of its key and return its result"""
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+        if len(pending) >= self.max_size or self.max_wait <= 0:
+            self._dispatch(key)
+        elif len(pending) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_wait, self._dispatch, key)
+        return await future
+
+    def _dispatch(self, key: Hashable):
+        """Start running the pending batch of a key"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        # Keep a reference so the task is not garbage collected while it runs
+        task = asyncio.ensure_future(self._run(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            try:
+                results = await self.run_batch(key, [item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    results = [e]
+                else:
+                    # One bad item must not fail the others: isolate it by running each item alone
+                    results = await asyncio.gather(
+                        *(self._run_one(key, item) for item, _ in batch), return_exceptions=True
+                    )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        # Callers that gave up (e.g. disconnected) are skipped
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, asyncio.CancelledError):
+                future.cancel()
+            elif isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run_one(self, key: Hashable, item: Any) -> Any:
+        """Result of a batch made of a single item"""
+        results = await self.run_batch(key, [item])
+        return results[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch count and sizes so far"""
+        return {
+            "max_size": self.max_size,
+            "window_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
@@ -1,20 +1,11 @@
 import re
 import random
 from typing import List, Dict, Any, Set, Union
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+from app.utils.metrics import stage_timer
+from app.utils.stopwords import FRENCH_STOPWORDS
 
-# Download necessary NLTK data (uncomment if not already downloaded)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Word tokens (letters, digits and underscores, accents included)
+WORD_PATTERN = re.compile(r"\w+")
 
 # Define dictionaries of keywords for different categories
 CHEMICAL_KEYWORDS = {
@@ -91,9 +82,6 @@ PROTECTION_KEYWORDS = {
     'vêtements de protection': 7,
 }
 
-# French stopwords
-FRENCH_STOPWORDS = set(stopwords.words('french'))
-
 def extract_keywords(text: str, keyword_type: str = 'chemical') -> List[str]:
     """
     Extract keywords from text based on the specified type
@@ -152,104 +140,110 @@ def extract_features_from_text(
     """
     features = {}
     
-    # Extract age from text
-    age_match = re.search(r'\b(\d{1,2})\s*ans\b', general_description.lower())
-    if age_match:
-        features['age'] = int(age_match.group(1))
-    else:
-        features['age'] = 40  # Default age
+    # Work profile (each stage below is timed for /metrics)
+    with stage_timer("text_extraction", "work_profile"):
+        # Extract age from text
+        age_match = re.search(r'\b(\d{1,2})\s*ans\b', general_description.lower())
+        if age_match:
+            features['age'] = int(age_match.group(1))
+        else:
+            features['age'] = 40  # Default age
     
-    # Extract work experience from text
-    exp_match = re.search(r'\b(\d{1,2})\s*ans?\s*d\'(expérience|ancienneté)', general_description.lower())
-    if exp_match:
-        features['work_experience'] = int(exp_match.group(1))
-    else:
-        features['work_experience'] = 10  # Default experience
+        # Extract work experience from text
+        exp_match = re.search(r'\b(\d{1,2})\s*ans?\s*d\'(expérience|ancienneté)', general_description.lower())
+        if exp_match:
+            features['work_experience'] = int(exp_match.group(1))
+        else:
+            features['work_experience'] = 10  # Default experience
     
-    # Extract work hours from text
-    hours_match = re.search(r'\b(\d{1,2})\s*heures?\s*(par jour|\/jour)', general_description.lower())
-    if hours_match:
-        features['work_hours_per_day'] = int(hours_match.group(1))
-    else:
-        features['work_hours_per_day'] = 8  # Default hours
+        # Extract work hours from text
+        hours_match = re.search(r'\b(\d{1,2})\s*heures?\s*(par jour|\/jour)', general_description.lower())
+        if hours_match:
+            features['work_hours_per_day'] = int(hours_match.group(1))
+        else:
+            features['work_hours_per_day'] = 8  # Default hours
     
-    # Extract days per week from text
-    days_match = re.search(r'\b(\d{1})\s*(jours?|j)\s*(par semaine|\/semaine)', general_description.lower())
-    if days_match:
-        features['work_days_per_week'] = int(days_match.group(1))
-    else:
-        features['work_days_per_week'] = 5  # Default days
+        # Extract days per week from text
+        days_match = re.search(r'\b(\d{1})\s*(jours?|j)\s*(par semaine|\/semaine)', general_description.lower())
+        if days_match:
+            features['work_days_per_week'] = int(days_match.group(1))
+        else:
+            features['work_days_per_week'] = 5  # Default days
     
     # Extract chemicals from text
-    chemical_keywords = extract_keywords(chemicals_text, 'chemical')
-    features['chemical_exposure'] = chemical_keywords
-    features['chemical_exposure_count'] = len(chemical_keywords)
+    with stage_timer("text_extraction", "chemicals"):
+        chemical_keywords = extract_keywords(chemicals_text, 'chemical')
+        features['chemical_exposure'] = chemical_keywords
+        features['chemical_exposure_count'] = len(chemical_keywords)
     
     # Extract tasks from text
-    task_keywords = extract_keywords(tasks_text, 'task')
-    features['tasks'] = task_keywords
+    with stage_timer("text_extraction", "tasks"):
+        task_keywords = extract_keywords(tasks_text, 'task')
+        features['tasks'] = task_keywords
     
     # Extract health conditions from text
-    health_keywords = extract_keywords(health_text, 'health')
-    features['has_respiratory_conditions'] = any(
-        keyword in health_keywords for keyword in [
-            'asthme', 'toux', 'dyspnée', 'difficulté à respirer', 
-            'problèmes respiratoires', 'respiratoire'
-        ]
-    )
+    with stage_timer("text_extraction", "health"):
+        health_keywords = extract_keywords(health_text, 'health')
+        features['has_respiratory_conditions'] = any(
+            keyword in health_keywords for keyword in [
+                'asthme', 'toux', 'dyspnée', 'difficulté à respirer', 
+                'problèmes respiratoires', 'respiratoire'
+            ]
+        )
     
-    features['has_skin_conditions'] = any(
-        keyword in health_keywords for keyword in [
-            'cutané', 'peau', 'dermatite', 'éruption cutanée', 
-            'irritation cutanée'
-        ]
-    )
+        features['has_skin_conditions'] = any(
+            keyword in health_keywords for keyword in [
+                'cutané', 'peau', 'dermatite', 'éruption cutanée', 
+                'irritation cutanée'
+            ]
+        )
     
-    features['has_chronic_exposure'] = 'exposition chronique' in health_text.lower() or \
-                                       'exposition prolongée' in health_text.lower() or \
-                                       any(
-                                            re.search(
-                                                r'\b(depuis|pendant|il y a)\s+(\d+|plusieurs|longtemps)\s+(ans|années|mois)', 
-                                                health_text.lower()
-                                            )
-                                        )
+        features['has_chronic_exposure'] = 'exposition chronique' in health_text.lower() or \
+                                           'exposition prolongée' in health_text.lower() or \
+                                           re.search(
+                                               r'\b(depuis|pendant|il y a)\s+(\d+|plusieurs|longtemps)\s+(ans|années|mois)',
+                                               health_text.lower()
+                                           ) is not None
     
     # Extract protective equipment from text
-    protection_keywords = extract_keywords(protection_text, 'protection')
-    features['protective_equipment'] = protection_keywords
-    features['protective_equipment_count'] = len(protection_keywords)
+    with stage_timer("text_extraction", "protection"):
+        protection_keywords = extract_keywords(protection_text, 'protection')
+        features['protective_equipment'] = protection_keywords
+        features['protective_equipment_count'] = len(protection_keywords)
     
-    # Extract marital status from text if present
-    for status in ['célibataire', 'mariée', 'divorcée', 'veuve']:
-        if status in general_description.lower():
-            features['marital_status'] = status
-            break
-    else:
-        features['marital_status'] = 'mariée'  # Default value
+    # Household and employment
+    with stage_timer("text_extraction", "demographics"):
+        # Extract marital status from text if present
+        for status in ['célibataire', 'mariée', 'divorcée', 'veuve']:
+            if status in general_description.lower():
+                features['marital_status'] = status
+                break
+        else:
+            features['marital_status'] = 'mariée'  # Default value
     
-    # Extract number of children if present
-    children_match = re.search(r'\b(\d{1,2})\s*enfants?\b', general_description.lower())
-    if children_match:
-        features['number_of_children'] = int(children_match.group(1))
-    else:
-        features['number_of_children'] = 2  # Default value
+        # Extract number of children if present
+        children_match = re.search(r'\b(\d{1,2})\s*enfants?\b', general_description.lower())
+        if children_match:
+            features['number_of_children'] = int(children_match.group(1))
+        else:
+            features['number_of_children'] = 2  # Default value
     
-    # Extract socioeconomic status if present
-    for status in ['bas', 'moyen', 'bon']:
-        if f"niveau socio-économique {status}" in general_description.lower() or \
-           f"niveau économique {status}" in general_description.lower():
-            features['socio_economic_status'] = status
-            break
-    else:
-        features['socio_economic_status'] = 'moyen'  # Default value
+        # Extract socioeconomic status if present
+        for status in ['bas', 'moyen', 'bon']:
+            if f"niveau socio-économique {status}" in general_description.lower() or \
+               f"niveau économique {status}" in general_description.lower():
+                features['socio_economic_status'] = status
+                break
+        else:
+            features['socio_economic_status'] = 'moyen'  # Default value
     
-    # Extract employment status if present
-    for status in ['permanente', 'saisonnière']:
-        if status in general_description.lower():
-            features['employment_status'] = status
-            break
-    else:
-        features['employment_status'] = 'permanente'  # Default value
+        # Extract employment status if present
+        for status in ['permanente', 'saisonnière']:
+            if status in general_description.lower():
+                features['employment_status'] = status
+                break
+        else:
+            features['employment_status'] = 'permanente'  # Default value
     
     return features
 
@@ -267,7 +261,7 @@ def analyze_text(text: str) -> Dict[str, Any]:
         return {"factors": [], "correlations": []}
     
     # Tokenize and clean text
-    tokens = word_tokenize(text.lower())
+    tokens = WORD_PATTERN.findall(text.lower())
     tokens = [token for token in tokens if token.isalpha() and token not in FRENCH_STOPWORDS]
     
     # Extract all keywords
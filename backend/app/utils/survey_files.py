@@ -0,0 +1,64 @@
+import os
+import pandas as pd
+from typing import Iterator
+
+from app.models.survey_features import SURVEY_INPUT_COLUMNS
+
+# Rows parsed at a time from CSV, Parquet and Arrow files
+SURVEY_CHUNK_ROWS = int(os.environ.get("SURVEY_CHUNK_ROWS", 100_000))
+
+# File extensions read by read_survey_chunks (anything else is parsed as CSV)
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+
+def read_survey_chunks(path: str, chunk_rows: int = SURVEY_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Read a survey file as DataFrame chunks of at most chunk_rows rows
+
+    Only the columns used as model features are read. CSV is parsed chunk by
+    chunk, Parquet one batch at a time and Arrow IPC files are memory-mapped,
+    so memory use follows the chunk size rather than the file size. Excel
+    workbooks cannot be streamed and are read whole.
+
+    Args:
+        path: .xlsx/.xls, .parquet/.pq, .arrow/.feather/.ipc, or CSV file
+        chunk_rows: Rows per chunk
+
+    Yields:
+        DataFrame chunks with the survey's feature columns
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in EXCEL_EXTENSIONS:
+        data = pd.read_excel(path)
+        yield data[[column for column in data.columns if column in SURVEY_INPUT_COLUMNS]]
+
+    elif extension in PARQUET_EXTENSIONS:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [column for column in parquet_file.schema_arrow.names if column in SURVEY_INPUT_COLUMNS]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+
+    elif extension in ARROW_EXTENSIONS:
+        import pyarrow as pa
+
+        with pa.memory_map(path) as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                # Arrow IPC stream format (no footer)
+                source.seek(0)
+                batches = pa.ipc.open_stream(source)
+            for batch in batches:
+                table = pa.Table.from_batches([batch])
+                table = table.select([column for column in table.column_names if column in SURVEY_INPUT_COLUMNS])
+                for start in range(0, table.num_rows, chunk_rows):
+                    yield table.slice(start, chunk_rows).to_pandas()
+
+    else:
+        yield from pd.read_csv(path, usecols=lambda column: column in SURVEY_INPUT_COLUMNS, chunksize=chunk_rows)
@@ -0,0 +1,259 @@
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# Training processes running at once
+TRAINING_WORKERS = int(os.environ.get("TRAINING_WORKERS", 1))
+
+# Finished jobs kept for the status endpoint
+MAX_TRAINING_JOBS = 100
+
+# Progress queue of the current worker process (set by _init_worker)
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    """Pool initializer: keep the queue used to report progress to the API process"""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _reset_peak_memory():
+    """Reset the process's peak RSS so the next reading covers one job only (Linux)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_memory_mb() -> float:
+    """Peak RSS of this process in MB (since the last reset on Linux, since start elsewhere)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_training_job(job_id: str, file_path: str, incremental: bool = False,
+                     multi_output: bool = False) -> Dict[str, Any]:
+    """
+    Train a model from an uploaded file (runs in a pool process)
+
+    A full training replaces the saved model; an incremental one adds trees
+    trained on the file to it (see update_model), keeping its outputs. With
+    multi_output, a full training fits one forest predicting every risk score
+    (see train_model). The file is parsed in chunks
+    (see read_survey_chunks) while the features are built. Progress is
+    reported as (job_id, stage, fraction) tuples on the progress queue. The
+    uploaded file is removed once it has been read.
+
+    Returns:
+        Dict with success, error, rows, validation (the report of a rejected
+        file), duration_seconds and peak_memory_mb
+    """
+    from app.models.risk_prediction import train_model, update_model
+    from app.models.survey_schema import SurveyValidationError
+    from app.utils.survey_files import read_survey_chunks
+
+    def report(stage, fraction):
+        _progress_queue.put((job_id, stage, fraction))
+
+    def counted(chunks):
+        for chunk in chunks:
+            result["rows"] += len(chunk)
+            yield chunk
+
+    _reset_peak_memory()
+    start = time.perf_counter()
+    result = {"success": False, "error": None, "rows": 0, "validation": None}
+    report("loading", 0.0)
+    try:
+        chunks = counted(read_survey_chunks(file_path))
+        if incremental:
+            result["success"] = update_model(chunks, progress=report)
+        else:
+            result["success"] = train_model(chunks, progress=report, multi_output=multi_output)
+        if not result["success"]:
+            result["error"] = "Model training failed"
+    except SurveyValidationError as e:
+        # Rejected before any fitting; the report lists every problem found
+        result["error"] = str(e)
+        result["validation"] = e.report
+    except Exception as e:
+        result["error"] = f"Training error: {str(e)}"
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    result["duration_seconds"] = time.perf_counter() - start
+    result["peak_memory_mb"] = _peak_memory_mb()
+    return result
+
+
+class TrainingJobManager:
+    """
+    Queue of training jobs run on a process pool
+
+    Jobs run outside the API process, so training never blocks the event loop.
+    Each job's status, progress, duration and peak memory are tracked here;
+    on success `on_success` is called (from a background thread) to swap the
+    new model in, and its return value is recorded as the job's model version.
+    """
+
+    def __init__(self, on_success: Optional[Callable[[], Any]] = None, max_workers: int = TRAINING_WORKERS,
+                 max_jobs: int = MAX_TRAINING_JOBS):
+        self.on_success = on_success
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._queue = None
+
+    def _ensure_pool(self):
+        """Start the worker pool and the progress listener on first use"""
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            self._queue = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._queue,)
+            )
+            threading.Thread(target=self._listen, daemon=True).start()
+
+    def submit(self, file_path: str, incremental: bool = False, multi_output: bool = False) -> Dict[str, Any]:
+        """Queue a full or incremental training job on an uploaded file (the job deletes it) and return its status"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._ensure_pool()
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "mode": "incremental" if incremental else "full",
+                "multi_output": multi_output and not incremental,
+                "status": "queued",
+                "stage": None,
+                "progress": 0.0,
+                "submitted_at": _now(),
+                "started_at": None,
+                "finished_at": None,
+                "duration_seconds": None,
+                "peak_memory_mb": None,
+                "rows": None,
+                "validation": None,
+                "model_version": None,
+                "error": None,
+            }
+            self._forget_old_jobs()
+            future = self._executor.submit(run_training_job, job_id, file_path, incremental, multi_output)
+        future.add_done_callback(lambda future: self._finish(job_id, file_path, future))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Status of every tracked job, oldest first"""
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def _reset_pool(self):
+        """Drop a broken pool so the next submission starts a fresh one"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._queue.put(None)
+                self._executor = None
+
+    def shutdown(self):
+        """Stop the pool (running jobs are left to finish) and the progress listener"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._queue.put(None)
+
+    def _listen(self):
+        """Apply progress reports from the workers to the job records"""
+        while True:
+            message = self._queue.get()
+            if message is None:
+                return
+            job_id, stage, fraction = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] not in ("queued", "running"):
+                    continue
+                if job["status"] == "queued":
+                    job["status"] = "running"
+                    job["started_at"] = _now()
+                job["stage"] = stage
+                job["progress"] = fraction
+
+    def _finish(self, job_id: str, file_path: str, future):
+        """Record a job's outcome and swap in the new model on success"""
+        # The worker removes the upload, unless it died before getting to it
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+        try:
+            result = future.result()
+            error = result["error"]
+        except Exception as e:
+            # The worker process itself failed (e.g. it was killed)
+            result = {}
+            error = f"Training worker error: {str(e)}"
+            if isinstance(e, BrokenProcessPool):
+                self._reset_pool()
+
+        model_version = None
+        if error is None and self.on_success is not None:
+            try:
+                model_version = self.on_success()
+            except Exception as e:
+                error = f"Model reload error: {str(e)}"
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update({
+                "status": "failed" if error else "succeeded",
+                "stage": "done" if error is None else job["stage"],
+                "progress": 1.0 if error is None else job["progress"],
+                "finished_at": _now(),
+                "duration_seconds": result.get("duration_seconds"),
+                "peak_memory_mb": result.get("peak_memory_mb"),
+                "rows": result.get("rows"),
+                "validation": result.get("validation"),
+                "model_version": model_version,
+                "error": error,
+            })
+
+    def _forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond max_jobs"""
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in ("succeeded", "failed")]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+
+def _now() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat()
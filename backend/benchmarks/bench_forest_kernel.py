@@ -0,0 +1,67 @@
+"""
+Benchmark the flattened-forest inference kernel against sklearn's model.predict
+
+Trains a RandomForestRegressor with the production settings (100 trees,
+max_depth=10) on synthetic data, then times single-row and small-batch
+predictions through both paths and checks that they agree to within 1e-9.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_forest_kernel [--rows 5000] [--repeat 200]
+"""
+
+import argparse
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from app.models.forest_kernel import FlatForest
+
+BATCH_SIZES = [1, 8, 64, 512]
+
+
+def time_call(func, repeat):
+    """Median wall time of `repeat` calls, in microseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000, help="training rows")
+    parser.add_argument("--features", type=int, default=11, help="number of input features")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per batch size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X = rng.normal(40, 12, (args.rows, args.features))
+    y = X @ rng.random(args.features) + rng.normal(0, 5, args.rows)
+
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42)
+    model.fit(scaler.transform(X), y)
+
+    start = time.perf_counter()
+    forest = FlatForest(model, scaler)
+    print(f"Flattened {forest.n_trees} trees ({len(forest.value)} nodes) in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    print(f"{'batch':>6} {'sklearn (us)':>14} {'flat (us)':>12} {'speedup':>8} {'max |diff|':>12}")
+    for batch_size in BATCH_SIZES:
+        X_test = rng.normal(40, 12, (batch_size, args.features))
+
+        expected = model.predict(scaler.transform(X_test))
+        actual = forest.predict(X_test)
+        max_diff = np.abs(expected - actual).max()
+        assert max_diff <= 1e-9, f"flattened forest disagrees with sklearn by {max_diff}"
+
+        sklearn_us = time_call(lambda: model.predict(scaler.transform(X_test)), args.repeat)
+        flat_us = time_call(lambda: forest.predict(X_test), args.repeat)
+        print(f"{batch_size:>6} {sklearn_us:>14.1f} {flat_us:>12.1f} {sklearn_us / flat_us:>7.1f}x {max_diff:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
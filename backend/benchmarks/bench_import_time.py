@@ -0,0 +1,114 @@
+"""
+Benchmark the API's cold start: import time of app.main and warm-up time
+
+Runs a fresh interpreter with `-X importtime` for each repetition, importing
+app.main and then running its warm-up (model loading and one dummy
+prediction), and reports the median time of each phase with a per-package
+breakdown of the import time spent in it. Results can be saved as JSON and
+compared against a previous run to catch regressions.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_import_time [--repeat 5] [--top 10] [--output cold_start.json] [--baseline cold_start.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Marks the end of the import phase in the child's stderr
+PHASE_MARKER = "--- warm-up ---"
+
+# Run in the child interpreter: import app.main, then warm up, timing both
+CHILD_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+print({PHASE_MARKER!r}, file=sys.stderr, flush=True)
+app.main.warm_up()
+warmed_up = time.perf_counter()
+print(json.dumps({{"import": imported - start, "warm_up": warmed_up - imported}}))
+"""
+
+# Allowed slowdown against the baseline before a phase is reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def parse_importtime(lines: List[str]) -> Dict[str, float]:
+    """Self import time per top-level package, in seconds, from `-X importtime` output"""
+    per_package = defaultdict(float)
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        per_package[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return dict(per_package)
+
+
+def run_once() -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+    """One cold start in a fresh interpreter: phase times and per-package import times"""
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+        cwd=backend, capture_output=True, text=True, check=True
+    )
+    stderr = completed.stderr.splitlines()
+    split = stderr.index(PHASE_MARKER)
+    phases = json.loads(completed.stdout.strip().splitlines()[-1])
+    packages = {"import": parse_importtime(stderr[:split]), "warm_up": parse_importtime(stderr[split + 1:])}
+    return phases, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="cold starts measured (medians are reported)")
+    parser.add_argument("--top", type=int, default=10, help="packages listed per phase")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown reported as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.repeat)]
+    results = {}
+    for phase in ("import", "warm_up"):
+        package_names = set().union(*(packages[phase] for _, packages in runs))
+        results[phase] = {
+            "seconds": float(np.median([phases[phase] for phases, _ in runs])),
+            "packages": {
+                name: float(np.median([packages[phase].get(name, 0.0) for _, packages in runs]))
+                for name in package_names
+            },
+        }
+
+    for phase, label in (("import", "import app.main"), ("warm_up", "warm-up")):
+        print(f"{label}: {results[phase]['seconds'] * 1e3:.0f} ms (median of {args.repeat})")
+        ranked = sorted(results[phase]["packages"].items(), key=lambda item: item[1], reverse=True)
+        for name, seconds in ranked[:args.top]:
+            print(f"  {name:<24} {seconds * 1e3:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressed = False
+        for phase in ("import", "warm_up"):
+            before, after = baseline[phase]["seconds"], results[phase]["seconds"]
+            change = after / before - 1 if before else 0.0
+            flag = "REGRESSION" if change > args.tolerance else "ok"
+            regressed |= change > args.tolerance
+            print(f"{phase}: {before * 1e3:.0f} ms -> {after * 1e3:.0f} ms ({change:+.0%}) {flag}")
+        sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark incremental model updates against full retraining
+
+Simulates weekly survey waves drawn from the synthetic population model.
+After the first wave both strategies start from the same forest; for every
+later wave one retrains from scratch on the whole history, the other adds
+trees trained on the new wave only (RiskModel.add_trees), with the oldest
+trees evicted beyond --max-trees. As in update_model, an incremental model
+whose test RMSE drifts more than --max-rmse-ratio above its last full
+training is replaced by that wave's full retraining (kind "full"). Both are
+scored on the same held-out respondents, and the size of what each one
+persists is reported (full model vs update file).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_incremental_training [--waves 8] [--wave-rows 20000] [--trees 20] [--max-trees 200] [--max-rmse-ratio 1.5]
+"""
+
+import argparse
+import io
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from app.models.cohort import SURVEY_DATA_FILE
+from app.models.risk_prediction import (
+    DEFAULT_FOREST_PARAMS, MAX_FOREST_TREES, MAX_INCREMENTAL_RMSE_RATIO, RiskModel, build_training_data
+)
+from benchmarks.synthetic_population import PopulationModel, load_codebook
+
+
+def persisted_size(obj) -> int:
+    """Bytes joblib writes for obj"""
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    return buffer.tell()
+
+
+def rmse(model: RiskModel, X: pd.DataFrame, y: pd.Series) -> float:
+    """RMSE of the model's flattened forest on (X, y)"""
+    return float(np.sqrt(np.mean((model.forest.predict(X[model.feature_names].values) - y.to_numpy()) ** 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--waves", type=int, default=8, help="survey waves, the first one trains the initial model")
+    parser.add_argument("--wave-rows", type=int, default=20_000, help="respondents per wave")
+    parser.add_argument("--test-rows", type=int, default=20_000, help="held-out respondents")
+    parser.add_argument("--trees", type=int, default=20, help="trees added per incremental update")
+    parser.add_argument("--max-trees", type=int, default=MAX_FOREST_TREES, help="evict the oldest trees beyond this many")
+    parser.add_argument("--max-rmse-ratio", type=float, default=MAX_INCREMENTAL_RMSE_RATIO,
+                        help="retrain fully when the incremental RMSE exceeds the last full training's by this factor")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed of the waves")
+    args = parser.parse_args()
+
+    population = PopulationModel(pd.read_excel(SURVEY_DATA_FILE), load_codebook())
+    encoder = RiskModel().encoder
+
+    def wave(k, n_rows):
+        return build_training_data(population.sample(n_rows, np.random.default_rng([args.seed, k])), encoder)
+
+    X_test, y_test = wave(args.waves, args.test_rows)
+    X_history, y_history = wave(0, args.wave_rows)
+
+    start = time.perf_counter()
+    incremental = RiskModel(model=RandomForestRegressor(**DEFAULT_FOREST_PARAMS)).fit(X_history, y_history)
+    base_rmse = rmse(incremental, X_test, y_test)
+    print(f"Initial model: {args.wave_rows} rows in {time.perf_counter() - start:.1f} s, test RMSE {base_rmse:.3f}")
+
+    print(f"{'wave':>4} {'history':>9} {'full (s)':>9} {'incr (s)':>9} {'full RMSE':>10} {'incr RMSE':>10} "
+          f"{'kind':>11} {'trees':>6} {'full (KB)':>10} {'delta (KB)':>10}")
+    full_total = incremental_total = 0.0
+    retrains = 0
+    for k in range(1, args.waves):
+        X_wave, y_wave = wave(k, args.wave_rows)
+        X_history = pd.concat([X_history, X_wave], ignore_index=True)
+        y_history = pd.concat([y_history, y_wave], ignore_index=True)
+
+        start = time.perf_counter()
+        full = RiskModel(model=RandomForestRegressor(**DEFAULT_FOREST_PARAMS)).fit(X_history, y_history)
+        full_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        update = incremental.add_trees(X_wave, y_wave, n_trees=args.trees, max_trees=args.max_trees)
+        incremental_seconds = time.perf_counter() - start
+
+        full_total += full_seconds
+        incremental_total += incremental_seconds
+        full_rmse = rmse(full, X_test, y_test)
+        incremental_rmse = rmse(incremental, X_test, y_test)
+
+        # Drifted too far from the last full training: serve this wave's full retraining instead
+        kind = "incremental"
+        if incremental_rmse > args.max_rmse_ratio * base_rmse:
+            incremental, incremental_rmse, base_rmse, kind = full, full_rmse, full_rmse, "full"
+            incremental_total += full_seconds
+            retrains += 1
+        print(
+            f"{k:>4} {len(X_history):>9} {full_seconds:>9.2f} {incremental_seconds:>9.2f} "
+            f"{full_rmse:>10.3f} {incremental_rmse:>10.3f} {kind:>11} "
+            f"{incremental.forest.n_trees:>6} {persisted_size(full.model) / 1024:>10.0f} {persisted_size(update) / 1024:>10.0f}"
+        )
+
+    if args.waves > 1:
+        print(f"Total update time: full {full_total:.1f} s, incremental {incremental_total:.1f} s "
+              f"including {retrains} full retrainings ({full_total / incremental_total:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
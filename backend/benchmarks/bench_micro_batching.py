@@ -0,0 +1,100 @@
+"""
+Benchmark coalescing concurrent predictions with the micro-batching dispatcher
+
+Runs many concurrent single-profile predictions in-process (no HTTP), the
+way concurrent /predict_risk requests reach the model: once each calling
+RiskModel.predict on the compute pool, and once through a MicroBatcher that
+scores each batch with RiskModel.predict_many. Profiles are distinct, so
+the prediction cache does not hide the model cost. Reports throughput, the
+latency percentiles seen by the callers and the batch sizes formed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_micro_batching [--requests 5000] [--concurrency 256] [--window-ms 2] [--max-batch 64]
+"""
+
+import argparse
+import asyncio
+import time
+import numpy as np
+
+from app.models.risk_prediction import load_or_create_model
+from app.utils.compute_pool import ComputePool
+from app.utils.micro_batcher import MicroBatcher, PREDICT_BATCH_MAX_SIZE, PREDICT_BATCH_WINDOW_MS
+
+
+def make_profiles(n: int, seed: int):
+    """Distinct random profiles (feature dicts as built by the API)"""
+    rng = np.random.default_rng(seed)
+    equipment = ["masque", "gants", "bottes", "casquette", "manteau"]
+    chemicals = ["pesticides", "herbicides", "engrais chimiques", "insecticides"]
+    return [
+        {
+            "age": int(rng.integers(18, 80)),
+            "work_experience": int(rng.integers(0, 50)),
+            "work_hours_per_day": float(rng.uniform(3, 12)),
+            "work_days_per_week": int(rng.integers(1, 8)),
+            "protective_equipment": ",".join(rng.choice(equipment, rng.integers(0, 6), replace=False)),
+            "chemical_exposure": ",".join(rng.choice(chemicals, rng.integers(0, 5), replace=False)),
+            "has_respiratory_conditions": int(rng.random() < 0.3),
+            "has_skin_conditions": int(rng.random() < 0.3),
+        }
+        for _ in range(n)
+    ]
+
+
+async def run(call, profiles, concurrency: int):
+    """Issue every prediction with at most `concurrency` in flight; return (seconds, latencies)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(features):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(features)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(features) for features in profiles))
+    return time.perf_counter() - start, np.array(latencies)
+
+
+async def main_async(args):
+    risk_model = load_or_create_model()
+    pool = ComputePool("bench", max_queue=args.requests)
+    print(f"Model {risk_model.version}, {args.requests} requests, {args.concurrency} concurrent")
+
+    async def direct(features):
+        return await pool.run(risk_model.predict, features)
+
+    async def run_batch(model, features_list):
+        return await pool.run(model.predict_many, features_list)
+
+    batcher = MicroBatcher(run_batch, max_size=args.max_batch, max_wait=args.window_ms / 1000)
+
+    async def coalesced(features):
+        return await batcher.submit(risk_model, features)
+
+    # Fresh profiles for each mode, so neither is served from the cache
+    for label, call, seed in (("direct", direct, 1), ("micro-batched", coalesced, 2)):
+        risk_model.cache.clear()
+        seconds, latencies = await run(call, make_profiles(args.requests, seed), args.concurrency)
+        print(
+            f"{label:<14} {args.requests / seconds:>8.0f} req/s   "
+            f"p50 {np.percentile(latencies, 50) * 1e3:>7.2f} ms   p99 {np.percentile(latencies, 99) * 1e3:>7.2f} ms"
+        )
+    stats = batcher.stats()
+    print(f"Batches: {stats['batches']}, mean size {stats['mean_batch_size']:.1f}, largest {stats['largest_batch']}")
+    pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000, help="predictions issued per mode")
+    parser.add_argument("--concurrency", type=int, default=256, help="predictions in flight at once")
+    parser.add_argument("--window-ms", type=float, default=PREDICT_BATCH_WINDOW_MS, help="batching window")
+    parser.add_argument("--max-batch", type=int, default=PREDICT_BATCH_MAX_SIZE, help="largest batch")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
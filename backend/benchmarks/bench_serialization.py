@@ -0,0 +1,75 @@
+"""
+Benchmark the serialisation cost of one /predict_risk response
+
+Compares, per response: FastAPI's default path for a response_model
+(validating the result against RiskScoreResponse, jsonable_encoder and
+json.dumps), the stdlib json dump, and the dump used by the API
+(prediction_response: orjson when installed, skipping output validation).
+The outputs are checked to decode to the same JSON.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization [--profiles 200] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.main import RiskScoreResponse
+from app.models.risk_prediction import load_or_create_model
+from app.utils.fast_json import dumps, orjson, prediction_response
+from benchmarks.bench_micro_batching import make_profiles
+
+
+def per_response_us(serialise, results, repeat: int) -> float:
+    """Median time of serialise(result) over the results, in microseconds per response"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for result in results:
+            serialise(result)
+        timings.append((time.perf_counter() - start) / len(results))
+    return float(np.median(timings)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=200, help="distinct predictions serialised")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the predictions (median reported)")
+    args = parser.parse_args()
+
+    risk_model = load_or_create_model()
+    results = [
+        {**result, "percentile_in_cohort": 50.0}
+        for result in risk_model.predict_many(make_profiles(args.profiles, seed=0))
+    ]
+    adapter = TypeAdapter(RiskScoreResponse)
+
+    def validated(result):
+        return json.dumps(jsonable_encoder(adapter.validate_python(result)), ensure_ascii=False).encode()
+
+    def stdlib(result):
+        return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def served(result):
+        return prediction_response(result, result["percentile_in_cohort"]).body
+
+    for result in results[:20]:
+        expected = json.loads(validated(result))
+        if json.loads(stdlib(result)) != expected or json.loads(served(result)) != expected:
+            raise SystemExit("Serialisers disagree on a response")
+
+    print(f"Model {risk_model.version}, {len(results)} responses of ~{np.mean([len(dumps(r)) for r in results]):.0f} bytes")
+    for label, serialise in (
+        ("pydantic validation + json", validated),
+        ("stdlib json dump", stdlib),
+        (f"prediction_response ({'orjson' if orjson else 'json'})", served),
+    ):
+        print(f"{label:<28} {per_response_us(serialise, results, args.repeat):>8.1f} us/response")
+
+
+if __name__ == "__main__":
+    main()
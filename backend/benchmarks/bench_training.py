@@ -0,0 +1,203 @@
+"""
+Benchmark the training pipeline's time and memory across dataset sizes
+
+For every size, a synthetic population (benchmarks.synthetic_population) is
+written to Parquet, then trained on with train_model itself in a fresh
+interpreter, publishing to a temporary registry. Its stages are timed through
+its progress callback: streaming the file (load), validation, feature
+building, the train/test split and the lazy sklearn import (features), scaling, the forest fit and
+flattening it for serving (fitting), scoring the held-out split (evaluating)
+and publishing the version (saving). Each stage reports its wall time and
+its own peak RSS; results can be saved as JSON and compared against a
+previous run to catch a regression in any stage.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_training [--sizes 1000 10000 100000 1000000 10000000] [--data-dir bench_data] [--output training.json] [--baseline training.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+# Stages timed by the child, in pipeline order (train_model's progress stages, plus load)
+STAGES = ["load", "features", "fitting", "evaluating", "saving"]
+
+# Default dataset sizes (10^3 to 10^7 rows)
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# Allowed slowdown (or memory growth) against the baseline before a stage is reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Changes smaller than these are noise, whatever their ratio
+MIN_SECONDS_CHANGE = 0.05
+MIN_MEMORY_CHANGE_MB = 20.0
+
+
+def run_pipeline(path: str, n_estimators: int) -> Dict[str, Any]:
+    """
+    Run train_model on a survey file, publishing to a temporary registry (runs in the child interpreter)
+
+    The stages are the ones train_model reports to its progress callback;
+    reading the file is interleaved with feature building, so its time is
+    split out of that stage.
+
+    Returns:
+        Dict with rows, wall_seconds, peak_rss_mb, test_rmse and per-stage seconds and peak_rss_mb
+    """
+    from app.models.model_registry import ModelRegistry
+    from app.models.risk_prediction import train_model
+    from app.utils.survey_files import read_survey_chunks
+    from app.utils.training_jobs import _peak_memory_mb, _reset_peak_memory
+
+    stages = {}
+    current = None
+    stage_start = 0.0
+
+    def progress(stage, fraction):
+        nonlocal current, stage_start
+        now = time.perf_counter()
+        if current is not None:
+            stages[current] = {"seconds": now - stage_start, "peak_rss_mb": _peak_memory_mb()}
+        _reset_peak_memory()
+        current, stage_start = stage, now
+
+    load_seconds = 0.0
+    rows = 0
+
+    def timed(chunks):
+        nonlocal load_seconds, rows
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            load_seconds += time.perf_counter() - start
+            if chunk is None:
+                return
+            rows += len(chunk)
+            yield chunk
+
+    with tempfile.TemporaryDirectory() as registry_path:
+        registry = ModelRegistry(registry_path)
+        start = time.perf_counter()
+        train_model(timed(read_survey_chunks(path)), progress=progress,
+                    params={"n_estimators": n_estimators}, registry=registry)
+        progress(None, 1.0)
+        wall_seconds = time.perf_counter() - start
+        metrics = registry.metadata(registry.current_version())["metrics"]
+
+    stages["features"]["seconds"] -= load_seconds
+    stages["load"] = {"seconds": load_seconds, "peak_rss_mb": None}
+    return {
+        "rows": rows,
+        "wall_seconds": wall_seconds,
+        "peak_rss_mb": max(stage["peak_rss_mb"] or 0.0 for stage in stages.values()),
+        "test_rmse": metrics["test_rmse"],
+        "stages": {name: stages[name] for name in STAGES},
+    }
+
+
+def dataset(rows: int, data_dir: str, seed: int) -> str:
+    """Synthetic population file of the given size (generated once per data directory and seed)"""
+    path = os.path.join(data_dir, f"population_{rows}_seed{seed}.parquet")
+    if not os.path.exists(path):
+        import pandas as pd
+        from app.models.cohort import SURVEY_DATA_FILE
+        from benchmarks.synthetic_population import PopulationModel, generate, load_codebook
+
+        start = time.perf_counter()
+        os.makedirs(data_dir, exist_ok=True)
+        generate(PopulationModel(pd.read_excel(SURVEY_DATA_FILE), load_codebook()), rows, path, seed=seed)
+        print(f"Generated {rows} rows in {time.perf_counter() - start:.1f} s", flush=True)
+    return path
+
+
+def run_size(path: str, n_estimators: int) -> Dict[str, Any]:
+    """Run the pipeline on one file in a fresh interpreter, so peak memory covers that size only"""
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_training", "--child", path, "--trees", str(n_estimators)],
+        cwd=backend, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], tolerance: float) -> bool:
+    """Print every stage's change against the baseline and return whether any regressed"""
+    if baseline.get("params") != results["params"]:
+        print(f"Warning: baseline params {baseline.get('params')} differ from {results['params']}")
+
+    regressed = False
+    for size, result in results["sizes"].items():
+        before_size = baseline["sizes"].get(size)
+        if before_size is None:
+            continue
+        checks = [("wall", "seconds", before_size["wall_seconds"], result["wall_seconds"]),
+                  ("peak", "MB", before_size["peak_rss_mb"], result["peak_rss_mb"])]
+        for name in STAGES:
+            if name not in before_size["stages"]:
+                continue
+            before, after = before_size["stages"][name], result["stages"][name]
+            checks.append((name, "seconds", before["seconds"], after["seconds"]))
+            if before["peak_rss_mb"] is not None and after["peak_rss_mb"] is not None:
+                checks.append((f"{name} peak", "MB", before["peak_rss_mb"], after["peak_rss_mb"]))
+
+        for label, unit, before, after in checks:
+            change = after / before - 1 if before else 0.0
+            floor = MIN_SECONDS_CHANGE if unit == "seconds" else MIN_MEMORY_CHANGE_MB
+            flagged = change > tolerance and after - before > floor
+            regressed |= flagged
+            if flagged or label in ("wall", "peak"):
+                print(f"{size:>9} rows {label:<15} {before:>10.2f} -> {after:>10.2f} {unit:<7} ({change:+.0%}) "
+                      f"{'REGRESSION' if flagged else 'ok'}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="dataset sizes in rows")
+    parser.add_argument("--trees", type=int, default=None, help="forest size (default: DEFAULT_FOREST_PARAMS)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "bench_training"),
+                        help="where the synthetic datasets are generated and reused")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic datasets")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown or memory growth reported as a regression (default: 0.2)")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from app.models.risk_prediction import DEFAULT_FOREST_PARAMS
+    n_estimators = args.trees or DEFAULT_FOREST_PARAMS["n_estimators"]
+
+    if args.child:
+        print(json.dumps(run_pipeline(args.child, n_estimators)))
+        return
+
+    results = {"params": {**DEFAULT_FOREST_PARAMS, "n_estimators": n_estimators}, "sizes": {}}
+    print(f"{'rows':>9} {'wall (s)':>9} {'peak (MB)':>10} " + " ".join(f"{name:>9}" for name in STAGES))
+    for rows in args.sizes:
+        result = run_size(dataset(rows, args.data_dir, args.seed), n_estimators)
+        results["sizes"][str(rows)] = result
+        print(
+            f"{rows:>9} {result['wall_seconds']:>9.2f} {result['peak_rss_mb']:>10.0f} "
+            + " ".join(f"{result['stages'][name]['seconds']:>9.3f}" for name in STAGES),
+            flush=True
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(baseline, results, args.tolerance) else 0)
+
+
+if __name__ == "__main__":
+    main()
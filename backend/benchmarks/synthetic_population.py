@@ -0,0 +1,243 @@
+"""
+Generate a synthetic population of respondents for scale testing
+
+Fits a tree-structured dependency model (Chow-Liu tree) to the surveyed
+cohort: every column keeps its empirical marginal, and the strongest
+pairwise dependencies (by mutual information) are kept through smoothed
+conditional tables. Column kinds and category orders come from the
+encoding codebook. Rows are sampled chunk by chunk and streamed to a
+Parquet file, so memory stays bounded by the chunk size, and each chunk
+draws from its own seeded generator, so a given (seed, chunk size) always
+produces the same file.
+
+Usage (from the backend directory):
+    python -m benchmarks.synthetic_population --rows 1000000 [--output synthetic_population.parquet] [--seed 0]
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from app.models.cohort import SURVEY_DATA_FILE
+from app.models.survey_schema import CODEBOOK_FILE, load_codebook
+
+# Row identifier column, renumbered instead of sampled
+ID_COLUMN = "N°"
+
+# Quantile bins used to model the dependencies of numerical columns
+NUMERIC_BINS = 6
+
+# Pseudo-count pulling sparse conditional tables towards the marginal
+SMOOTHING = 1.0
+
+# Rows sampled and written per chunk
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+def _codebook_categories(codebook: Dict, column: str) -> Optional[List[str]]:
+    """Category order the codebook defines for a column, if any"""
+    column_type = codebook["column_types"].get(column)
+    mappings = codebook["encoding_mappings"]
+    if column_type == "binary":
+        mapping = mappings["binary"]
+    elif column_type == "ordinal_equipment":
+        mapping = mappings["ordinal_equipment"]
+    elif column_type == "ordinal_profession":
+        mapping = mappings["profession"]
+    elif column_type == "ordinal_categorical":
+        mapping = mappings["ordinal_categorical"].get(column)
+    else:
+        mapping = None
+    return sorted(mapping, key=mapping.get) if mapping else None
+
+
+class PopulationModel:
+    """
+    Chow-Liu tree over the survey columns
+
+    Each column is reduced to integer states (categories, or quantile bins
+    for numerical columns, with missing values as a state of their own).
+    Sampling walks the tree from the root, drawing each column's state from
+    its conditional table given its parent's state, then maps states back to
+    values: categories directly, bins by resampling observed values in the bin.
+    """
+
+    def __init__(self, data: pd.DataFrame, codebook: Dict, smoothing: float = SMOOTHING):
+        self.columns = [column for column in data.columns if column != ID_COLUMN]
+        self.dtypes = {column: data[column].dtype for column in self.columns}
+        self.numeric = [
+            column for column in self.columns
+            if codebook["column_types"].get(column) == "numerical" and pd.api.types.is_numeric_dtype(data[column])
+        ]
+
+        # Per column: the value each state stands for (None = missing), and observed values per numeric bin
+        self.state_values, self.bin_values = {}, {}
+        states = np.column_stack([self._fit_column(data[column], codebook) for column in self.columns])
+        self.n_states = [len(self.state_values[column]) for column in self.columns]
+
+        self.parent, self.order = self._chow_liu_tree(states)
+        self.cdf = [self._conditional_cdf(states, i, smoothing) for i in range(len(self.columns))]
+
+    def _fit_column(self, values: pd.Series, codebook: Dict) -> np.ndarray:
+        """Encode one column into integer states and remember how to map states back to values"""
+        column = values.name
+        missing = values.isna().to_numpy()
+
+        if column in self.numeric:
+            # Quantile bins, each holding the observed values that fall into it
+            observed = values[~missing].to_numpy(dtype=float)
+            edges = np.unique(np.quantile(observed, np.linspace(0, 1, NUMERIC_BINS + 1)[1:-1]))
+            codes = np.searchsorted(edges, values.to_numpy(dtype=float), side="right")
+            bins = [np.sort(observed[codes[~missing] == b]) for b in range(len(edges) + 1)]
+            self.bin_values[column] = bins
+            self.state_values[column] = [f"bin_{b}" for b in range(len(bins))] + [None]
+            codes[missing] = len(bins)
+            return codes
+
+        # Categories: codebook order first, then anything else observed
+        categories = _codebook_categories(codebook, column) or []
+        categories += sorted(set(values[~missing].astype(str)) - set(categories))
+        self.state_values[column] = categories + [None]
+        codes = pd.Categorical(values.astype(str).where(~missing), categories=categories).codes.astype(np.intp)
+        codes[missing] = len(categories)
+        return codes
+
+    def _chow_liu_tree(self, states: np.ndarray):
+        """
+        Maximum mutual-information spanning tree (Prim), rooted at the most connected column
+
+        Mutual information is bias-corrected (Miller-Madow) so that columns with
+        many sparse categories do not look dependent on everything in 80 rows.
+        """
+        n_rows, n_columns = states.shape
+        information = np.zeros((n_columns, n_columns))
+        for i in range(n_columns):
+            for j in range(i + 1, n_columns):
+                joint = np.zeros((self.n_states[i], self.n_states[j]))
+                np.add.at(joint, (states[:, i], states[:, j]), 1)
+                joint /= joint.sum()
+                outer = joint.sum(axis=1, keepdims=True) * joint.sum(axis=0, keepdims=True)
+                nonzero = joint > 0
+                raw = np.sum(joint[nonzero] * np.log(joint[nonzero] / outer[nonzero]))
+                bias = (self.n_states[i] - 1) * (self.n_states[j] - 1) / (2 * n_rows)
+                information[i, j] = information[j, i] = raw - bias
+
+        root = int(information.sum(axis=1).argmax())
+        parent = np.full(n_columns, -1)
+        best = information[root].copy()
+        best_parent = np.full(n_columns, root)
+        in_tree = np.zeros(n_columns, dtype=bool)
+        in_tree[root] = True
+        order = [root]
+        for _ in range(n_columns - 1):
+            candidate = int(np.where(in_tree, -np.inf, best).argmax())
+            parent[candidate] = best_parent[candidate]
+            in_tree[candidate] = True
+            order.append(candidate)
+            closer = information[candidate] > best
+            best[closer] = information[candidate, closer]
+            best_parent[closer] = candidate
+        return parent, order
+
+    def _conditional_cdf(self, states: np.ndarray, i: int, smoothing: float) -> np.ndarray:
+        """Cumulative state distribution of column i, one row per parent state (one row for the root)"""
+        marginal = np.bincount(states[:, i], minlength=self.n_states[i]) / len(states)
+        if self.parent[i] < 0:
+            return np.cumsum(marginal)[None, :]
+
+        p = self.parent[i]
+        counts = np.zeros((self.n_states[p], self.n_states[i]))
+        np.add.at(counts, (states[:, p], states[:, i]), 1)
+        conditional = (counts + smoothing * marginal) / (counts.sum(axis=1, keepdims=True) + smoothing)
+        return np.cumsum(conditional, axis=1)
+
+    def sample(self, n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+        """Draw n_rows synthetic respondents"""
+        states = np.empty((n_rows, len(self.columns)), dtype=np.intp)
+        for i in self.order:
+            cdf = self.cdf[i][states[:, self.parent[i]]] if self.parent[i] >= 0 else self.cdf[i]
+            u = rng.random((n_rows, 1))
+            states[:, i] = np.minimum((u >= cdf).sum(axis=1), self.n_states[i] - 1)
+
+        data = {}
+        for i, column in enumerate(self.columns):
+            data[column] = self._column_values(column, states[:, i], rng)
+        return pd.DataFrame(data)
+
+    def _column_values(self, column: str, states: np.ndarray, rng: np.random.Generator):
+        """Map sampled states back to values of the column's original type"""
+        if column in self.numeric:
+            bins = self.bin_values[column]
+            pool = np.concatenate(bins + [[np.nan]])
+            counts = np.array([len(b) for b in bins] + [1])
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            values = pool[starts[states] + (rng.random(len(states)) * counts[states]).astype(np.intp)]
+            # Nullable integers keep integer columns integral (and one Parquet type) when a value is missing
+            if pd.api.types.is_integer_dtype(self.dtypes[column]):
+                return pd.array(values, dtype="Int64")
+            return values
+
+        categories = self.state_values[column][:-1]
+        codes = np.where(states == len(categories), -1, states)
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def generate(model: PopulationModel, n_rows: int, output: str, seed: int = 0,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """
+    Stream n_rows synthetic respondents to a Parquet file, one row group per chunk
+
+    Args:
+        model: Fitted PopulationModel
+        n_rows: Number of respondents to generate
+        output: Destination .parquet file
+        seed: Base seed; chunk k draws from default_rng([seed, k])
+        chunk_size: Rows held in memory at once
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk, start in enumerate(range(0, n_rows, chunk_size)):
+            rng = np.random.default_rng([seed, chunk])
+            frame = model.sample(min(chunk_size, n_rows - start), rng)
+            frame.insert(0, ID_COLUMN, np.arange(start + 1, start + len(frame) + 1))
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="synthetic respondents to generate")
+    parser.add_argument("--output", default="synthetic_population.parquet", help="destination Parquet file")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows sampled per chunk")
+    parser.add_argument("--data", default=SURVEY_DATA_FILE, help="survey the model is fitted on")
+    parser.add_argument("--codebook", default=CODEBOOK_FILE, help="encoding codebook")
+    args = parser.parse_args()
+
+    model = PopulationModel(pd.read_excel(args.data), load_codebook(args.codebook))
+    edges = [
+        f"{model.columns[child]} <- {model.columns[parent]}"
+        for child, parent in enumerate(model.parent) if parent >= 0
+    ]
+    print(f"Fitted dependency tree over {len(model.columns)} columns, root {model.columns[model.order[0]]}")
+    print("  " + "\n  ".join(edges))
+
+    start = time.perf_counter()
+    generate(model, args.rows, args.output, seed=args.seed, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows} rows to {args.output} in {elapsed:.1f} s ({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
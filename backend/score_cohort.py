@@ -0,0 +1,49 @@
+"""
+Score every surveyed respondent and store the sorted score distribution
+
+The scores are stored per model (model_data/cohort_scores/<model>.npy);
+the API loads the file of the model it serves, whenever it loads a model,
+to report where a new prediction falls within the surveyed cohort
+(percentile_in_cohort).
+
+Usage (from the backend directory):
+    python score_cohort.py [--data PATH] [--output PATH] [--seed N]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from app.models.risk_prediction import RiskModel, load_or_create_model
+from app.models.cohort import SURVEY_DATA_FILE, cohort_key, score_cohort, save_cohort_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=SURVEY_DATA_FILE, help="Survey spreadsheet (.xlsx) or CSV file")
+    parser.add_argument("--output", default=None,
+                        help="Where to write the sorted scores (.npy; default: the file the API loads for this model)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed for the synthetic scorer, so the distribution is reproducible (default: 0)")
+    args = parser.parse_args()
+
+    if args.data.endswith('.xlsx') or args.data.endswith('.xls'):
+        data = pd.read_excel(args.data)
+    else:
+        data = pd.read_csv(args.data)
+
+    model = load_or_create_model()
+    if model.forest is None:
+        model = RiskModel(seed=args.seed)
+
+    scores = score_cohort(model, data)
+    output = save_cohort_scores(scores, cohort_key(model), args.output)
+
+    print(f"Scored {len(scores)} respondents with model {model.version}")
+    if len(scores):
+        q1, median, q3 = np.percentile(scores, [25, 50, 75])
+        print(f"Overall risk: min {scores[0]:.1f}, Q1 {q1:.1f}, median {median:.1f}, Q3 {q3:.1f}, max {scores[-1]:.1f}")
+    print(f"Saved sorted scores to {output}")
+
+
+if __name__ == "__main__":
+    main()
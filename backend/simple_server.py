@@ -4,6 +4,8 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional, Union
 import random
 import json
+from app.utils.metrics import MetricsMiddleware, metrics_response
+from app.utils.prediction_cache import PredictionCache, feature_key
 
 # Create the FastAPI app
 app = FastAPI(title="Agricultural Health Risk Prediction API")
@@ -21,6 +23,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts, errors and latency per route, exported by /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Define input schemas
 class StructuredInput(BaseModel):
     age: int
@@ -38,6 +43,21 @@ class StructuredInput(BaseModel):
     socio_economic_status: Optional[str] = "moyen"
     employment_status: Optional[str] = "permanente"
 
+# Deterministic mode: with RISK_MODEL_SEED set, the random variation is derived
+# from the canonicalised input and repeated requests are served from a cache
+RISK_MODEL_SEED = os.environ.get("RISK_MODEL_SEED")
+prediction_cache = PredictionCache(
+    max_size=int(os.environ.get("PREDICTION_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("PREDICTION_CACHE_TTL", 300))
+)
+
+def canonical_input(data: StructuredInput) -> str:
+    """Canonical JSON of a structured input (sorted keys and sorted equipment/chemical/task lists)"""
+    fields = data.model_dump()
+    for name in ("protective_equipment", "chemical_exposure", "tasks"):
+        fields[name] = sorted(fields[name] or [])
+    return json.dumps(fields, sort_keys=True, ensure_ascii=False)
+
 class FreeTextInput(BaseModel):
     general_description: str
     chemicals_text: str
@@ -55,10 +75,31 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Cache statistics endpoint
+@app.get("/cache_stats")
+async def cache_stats():
+    return {"deterministic": RISK_MODEL_SEED is not None, **prediction_cache.stats()}
+
+# Runtime metrics in the Prometheus text format
+@app.get("/metrics")
+async def metrics():
+    return metrics_response()
+
 # Endpoint for structured input prediction
 @app.post("/predict_risk")
 async def predict_risk(data: StructuredInput):
     try:
+        # In deterministic mode identical inputs get identical (cached) results
+        cache_key = None
+        rng = random
+        if RISK_MODEL_SEED is not None:
+            canonical = canonical_input(data)
+            cache_key = feature_key(canonical.encode("utf-8"))
+            cached = prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            rng = random.Random(f"{RISK_MODEL_SEED}:{canonical}")
+        
         # Calculate risk values based on input data
         # This is a simplified version using the input parameters to generate risk scores
         
@@ -167,10 +208,10 @@ async def predict_risk(data: StructuredInput):
         
         # Add random variation to make it more realistic
         def add_variation(value):
-            variation = random.uniform(-3, 3)
+            variation = rng.uniform(-3, 3)
             return max(10, min(100, value + variation))
             
-        return {
+        result = {
             "overall_risk": round(add_variation(overall_risk)),
             "respiratory_risk": round(add_variation(respiratory_risk)),
             "skin_risk": round(add_variation(skin_risk)),
@@ -182,6 +223,11 @@ async def predict_risk(data: StructuredInput):
             "what_if_scenarios": what_if_scenarios
         }
         
+        if cache_key is not None:
+            prediction_cache.put(cache_key, result)
+        
+        return result
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
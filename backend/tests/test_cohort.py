@@ -0,0 +1,29 @@
+import numpy as np
+
+from app import main
+from app.models import cohort
+from app.models.risk_prediction import RiskModel
+
+
+def test_cohort_scores_are_keyed_by_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(cohort, "COHORT_SCORES_DIR", str(tmp_path))
+    cohort.save_cohort_scores(np.array([10.0, 20.0, 30.0]), "forest-aaaa")
+
+    loaded = cohort.load_cohort_scores("forest-aaaa")
+    assert loaded.key == "forest-aaaa"
+    assert loaded.percentile(20.0) == 100.0 * 2 / 3
+    assert cohort.load_cohort_scores("forest-bbbb") is None
+
+
+def test_synthetic_models_share_cohort_scores():
+    assert cohort.cohort_key(RiskModel()) == cohort.cohort_key(RiskModel(seed=3)) == "synthetic"
+
+
+def test_no_percentile_against_another_models_cohort(monkeypatch):
+    risk_model = RiskModel(seed=0)
+    monkeypatch.setattr(main, "cohort_scores", cohort.CohortScores(np.array([1.0]), "forest-aaaa"))
+    assert main.cohort_for(risk_model) is None
+
+    scores = cohort.CohortScores(np.array([1.0]), "synthetic")
+    monkeypatch.setattr(main, "cohort_scores", scores)
+    assert main.cohort_for(risk_model) is scores
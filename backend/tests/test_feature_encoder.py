@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app.main import StructuredInput, structured_input_to_features
+from app.models.list_items import normalise_items
+from app.models.risk_prediction import RiskModel
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    return RiskModel(seed=0).encoder
+
+
+def profile(**overrides):
+    fields = {
+        "age": 40,
+        "work_experience": 10,
+        "work_hours_per_day": 8,
+        "protective_equipment": ["gants", "masque"],
+        "chemical_exposure": ["pesticides"],
+        "has_respiratory_conditions": False,
+    }
+    fields.update(overrides)
+    return StructuredInput(**fields)
+
+
+def encode(encoder, data):
+    return encoder.encode(structured_input_to_features(data)).copy()
+
+
+def test_normalise_items_strips_lowercases_and_deduplicates():
+    assert normalise_items(" Gants,gants, masque,,") == ["gants", "masque"]
+    assert normalise_items(["Pesticides", "pesticides "]) == ["pesticides"]
+
+
+def test_repeated_items_are_counted_once(encoder):
+    # Repeats (in any case) score like a single listing, counts included
+    single = encode(encoder, profile())
+    repeated = encode(encoder, profile(
+        protective_equipment=["gants", "Gants", "masque", " masque"],
+        chemical_exposure=["pesticides", "PESTICIDES"]
+    ))
+    np.testing.assert_array_equal(single, repeated)
+    assert single[encoder.index["protective_equipment_count"]] == 2
+    assert single[encoder.index["chemical_exposure_count"]] == 1
+
+
+def test_neurological_conditions_reach_the_encoder(encoder):
+    without = encode(encoder, profile(has_neurological_conditions=False))
+    with_condition = encode(encoder, profile(has_neurological_conditions=True))
+    offset = encoder.index["has_neurological_conditions"]
+    assert without[offset] == 0 and with_condition[offset] == 1
+    assert not np.array_equal(without, with_condition)
@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+BASE_QUERY = "age=40&chemical_exposure=pesticides&has_respiratory_conditions=true&work_experience=10&work_hours_per_day=8"
+
+
+def redirect_target(query):
+    response = TestClient(app).get(f"/risk?{query}", follow_redirects=False)
+    assert response.status_code == 308
+    assert response.headers["cache-control"].startswith("public")
+    return response.headers["location"]
+
+
+def test_list_items_are_normalised_in_the_canonical_url():
+    # Case, whitespace and repeats do not change the encoded features, so they share one URL
+    location = redirect_target(f"{BASE_QUERY}&protective_equipment=Gants,gants&protective_equipment=%20masque")
+    assert location == (
+        "/risk?age=40&chemical_exposure=pesticides&has_respiratory_conditions=true"
+        "&protective_equipment=gants,masque&work_experience=10&work_hours_per_day=8"
+    )
+    assert redirect_target(f"protective_equipment=masque,gants&{BASE_QUERY}") == location
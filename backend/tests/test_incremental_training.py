@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models import risk_prediction
+from app.models.cohort import SURVEY_DATA_FILE
+from app.models.model_registry import ModelRegistry
+from benchmarks.synthetic_population import PopulationModel, load_codebook
+
+
+@pytest.fixture(scope="module")
+def population():
+    return PopulationModel(pd.read_excel(SURVEY_DATA_FILE), load_codebook())
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    registry = ModelRegistry(str(tmp_path))
+    monkeypatch.setattr(risk_prediction, "model_registry", registry)
+    return registry
+
+
+def wave(population, k, n_rows=1500):
+    return population.sample(n_rows, np.random.default_rng([0, k]))
+
+
+def test_every_version_loads_its_published_forest(population, registry, monkeypatch):
+    monkeypatch.setattr(risk_prediction, "MODEL_SNAPSHOT_INTERVAL", 2)
+    monkeypatch.setattr(risk_prediction, "MAX_INCREMENTAL_RMSE_RATIO", float("inf"))
+    risk_prediction.train_model(wave(population, 0))
+    for k in (1, 2, 3):
+        risk_prediction.update_model(wave(population, k), n_trees=5)
+
+    versions = [entry["version"] for entry in registry.versions()]
+    stored = [
+        {name for name in ("forest", "estimator", "update") if registry.has_artifact(version, name)}
+        for version in versions
+    ]
+    # Every version is served from its own flattened forest; the sklearn forest is snapshotted every 2nd update
+    assert stored == [{"forest", "estimator"}, {"forest", "update"}, {"forest", "estimator"}, {"forest", "update"}]
+    for version in versions:
+        assert risk_prediction.load_model_version(version).version == registry.metadata(version)["model_fingerprint"]
+
+    # The update replayed on the last snapshot gives the published forest back
+    model = risk_prediction.load_model_version(versions[-1], with_estimator=True)
+    X = np.random.default_rng(0).random((10, model.forest.n_features))
+    assert np.allclose(model.forest.predict(X), model.model.predict(model.scaler.transform(X)))
+
+
+def test_drifted_update_is_rejected(population, registry, monkeypatch):
+    risk_prediction.train_model(wave(population, 0))
+    current = registry.current_version()
+
+    monkeypatch.setattr(risk_prediction, "MAX_INCREMENTAL_RMSE_RATIO", 0.0)
+    with pytest.raises(ValueError, match="full training"):
+        risk_prediction.update_model(wave(population, 1), n_trees=5)
+    assert registry.current_version() == current
+    assert len(registry.versions()) == 1
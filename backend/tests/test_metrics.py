@@ -0,0 +1,52 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app import main
+from app.utils.metrics import Counter, Histogram, MetricsRegistry, _Metric
+
+
+def parse(text):
+    return {family.name: family for family in text_string_to_metric_families(text)}
+
+
+def test_metric_kinds_must_define_their_children():
+    with pytest.raises(TypeError):
+        _Metric("abstract", "no child type")
+
+
+def test_rendered_metrics_parse_as_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests", ("path",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency", ("path",), buckets=(0.1, 1.0)))
+    label = 'a "quoted"\\path\nwith a newline'
+    requests.labels(label).inc()
+    requests.labels(label).inc(2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels(label).observe(value)
+
+    families = parse(registry.render())
+    assert families["requests"].type == "counter"
+    [sample] = families["requests"].samples
+    assert sample.labels == {"path": label} and sample.value == 3
+
+    assert families["latency_seconds"].type == "histogram"
+    samples = {(sample.name, sample.labels.get("le")): sample.value for sample in families["latency_seconds"].samples}
+    assert samples[("latency_seconds_bucket", "0.1")] == 2
+    assert samples[("latency_seconds_bucket", "1.0")] == 3
+    assert samples[("latency_seconds_bucket", "+Inf")] == 4
+    assert samples[("latency_seconds_count", None)] == 4
+    assert samples[("latency_seconds_sum", None)] == pytest.approx(3.65)
+
+
+def test_metrics_endpoint_parses_as_prometheus_text():
+    with TestClient(main.app) as client:
+        client.get("/health")
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    families = parse(response.text)
+    assert {"http_requests", "http_request_duration_seconds", "stage_duration_seconds"} <= set(families)
+    assert any(
+        sample.labels.get("endpoint") == "/health" and sample.value >= 1
+        for sample in families["http_requests"].samples
+    )
@@ -0,0 +1,45 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.utils.micro_batcher import MicroBatcher
+
+PROFILE = {
+    "age": 45,
+    "work_experience": 20,
+    "work_hours_per_day": 9,
+    "work_days_per_week": 6,
+    "protective_equipment": ["gants"],
+    "chemical_exposure": ["pesticides"],
+    "has_respiratory_conditions": False,
+}
+
+
+def test_failing_item_does_not_fail_its_batch():
+    async def run_batch(key, items):
+        if any(item < 0 for item in items):
+            raise ValueError("negative item")
+        return [item * 2 for item in items]
+
+    async def submit_all():
+        batcher = MicroBatcher(run_batch, max_size=8, max_wait=0.05)
+        results = await asyncio.gather(*(batcher.submit("model", item) for item in (1, -1, 3)),
+                                       return_exceptions=True)
+        return batcher, results
+
+    batcher, results = asyncio.run(submit_all())
+    assert batcher.batches == 1
+    assert results[0] == 2 and results[2] == 6
+    assert isinstance(results[1], ValueError)
+
+
+def test_null_fields_are_rejected_without_failing_concurrent_requests():
+    invalid = {**PROFILE, "work_days_per_week": None}
+    payloads = [PROFILE, invalid, PROFILE, invalid, PROFILE]
+    with TestClient(main.app) as client:
+        with ThreadPoolExecutor(len(payloads)) as pool:
+            responses = list(pool.map(lambda payload: client.post("/predict_risk", json=payload), payloads))
+    assert [response.status_code for response in responses] == [200, 422, 200, 422, 200]
+    assert all("overall_risk" in responses[i].json() for i in (0, 2, 4))
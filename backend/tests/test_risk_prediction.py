@@ -0,0 +1,17 @@
+from app.models.risk_prediction import SCORE_DECIMALS, RiskModel
+from benchmarks.bench_micro_batching import make_profiles
+
+
+def reported_values(result):
+    yield from (result[name] for name in ("overall_risk", "respiratory_risk", "skin_risk", "neurological_risk"))
+    yield from result["confidence_interval"]
+    yield from (scenario["score"] for scenario in result["what_if_scenarios"])
+
+
+def test_scores_do_not_carry_float32_rounding():
+    # Features are encoded as float32; reported scores are rounded float64
+    risk_model = RiskModel(seed=1)
+    for result in risk_model.predict_many(make_profiles(500, seed=1)):
+        for value in reported_values(result):
+            assert type(value) is float
+            assert value == round(value, SCORE_DECIMALS)
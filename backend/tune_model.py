@@ -0,0 +1,64 @@
+"""
+Cross-validated hyperparameter search for the risk forest
+
+Evaluates forest configurations with k-fold cross-validation on all cores
+and prints a leaderboard of RMSE, fit time and single-row predict latency.
+With --train, the model is then retrained with the best configuration and
+saved to model_data.
+
+Usage (from the backend directory):
+    python tune_model.py [--data PATH] [--folds 5] [--n-iter N] [--jobs -1] [--output leaderboard.json] [--train]
+"""
+import argparse
+import json
+import time
+import pandas as pd
+
+from app.models.cohort import SURVEY_DATA_FILE
+from app.models.risk_prediction import train_model
+from app.models.tuning import tune
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=SURVEY_DATA_FILE, help="Survey spreadsheet (.xlsx) or CSV file")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds (default: 5)")
+    parser.add_argument("--n-iter", type=int, default=None,
+                        help="Sample this many configurations instead of the full grid")
+    parser.add_argument("--jobs", type=int, default=-1, help="Worker processes (default: -1, all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the folds and the random search (default: 0)")
+    parser.add_argument("--output", default=None, help="Write the leaderboard to this JSON file")
+    parser.add_argument("--train", action="store_true", help="Retrain and save the model with the best configuration")
+    args = parser.parse_args()
+
+    if args.data.endswith('.xlsx') or args.data.endswith('.xls'):
+        data = pd.read_excel(args.data)
+    else:
+        data = pd.read_csv(args.data)
+
+    start = time.perf_counter()
+    leaderboard = tune(data, n_iter=args.n_iter, n_folds=args.folds, n_jobs=args.jobs, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Evaluated {len(leaderboard)} configurations x {args.folds} folds on {len(data)} rows in {elapsed:.1f} s")
+    print(f"{'rank':>4}  {'rmse':>13}  {'fit (s)':>8}  {'latency (ms)':>12}  params")
+    for entry in leaderboard:
+        params = {name: value for name, value in entry["params"].items() if name != "random_state"}
+        print(
+            f"{entry['rank']:>4}  {entry['rmse_mean']:>6.3f} ± {entry['rmse_std']:<5.3f}  "
+            f"{entry['fit_time_s']:>8.3f}  {entry['predict_latency_ms']:>12.3f}  {params}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(leaderboard, f, indent=2)
+        print(f"Saved leaderboard to {args.output}")
+
+    if args.train:
+        best = leaderboard[0]["params"]
+        train_model(data, params=best)
+        print(f"Trained and saved the model with {best}")
+
+
+if __name__ == "__main__":
+    main()